@@ -3,6 +3,320 @@ Eco Ventilation Fan Control for Home Assistant
 https://github.com/49jan/hass-ecovent
 """
 
+from datetime import timedelta
+import logging
+
+import voluptuous as vol
+from homeassistant.components.fan import ATTR_PERCENTAGE
+from homeassistant.const import (
+    ATTR_ENTITY_ID,
+    CONF_HOST,
+    CONF_PATH,
+    CONF_PORT,
+    EVENT_HOMEASSISTANT_STOP,
+)
+from homeassistant.core import Event, ServiceCall, SupportsResponse, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv, discovery
+
+from .const import (
+    MY_DOMAIN,
+    CONF_ZONES,
+    CONF_EXPORT,
+    CONF_FORMAT,
+    CONF_MAX_SIZE,
+    CONF_BACKUPS,
+    CONF_QUEUE_SIZE,
+    CONF_GATEWAY,
+    CONF_FLEET,
+    CONF_DEFAULT_FORMAT,
+    CONF_DEFAULT_MAX_SIZE,
+    CONF_DEFAULT_BACKUPS,
+    CONF_DEFAULT_QUEUE_SIZE,
+    CONF_DEFAULT_GATEWAY_HOST,
+    CONF_ALLOW_SETUP_WRITES,
+    CONF_DEFAULT_PORT,
+    CONF_RATE_LIMIT,
+    CONF_RATE_LIMIT_BURST,
+    CONF_DEFAULT_GLOBAL_RATE_LIMIT,
+    CONF_DEFAULT_GLOBAL_RATE_LIMIT_BURST,
+    DATA_CONFIG,
+    DATA_EXPORTER,
+    DATA_FLEET,
+    DATA_GATEWAY,
+    DATA_PROFILER,
+    DATA_RATE_LIMITER,
+    ATTR_ACTION,
+    ATTR_AIRFLOW,
+    ATTR_CONCURRENCY,
+    ATTR_DURATION,
+    ATTR_RETRIES,
+    ATTR_SLOW_EXCHANGE,
+    ATTR_WIFI_ENCRYPTION,
+    ATTR_WIFI_NAME,
+    ATTR_WIFI_PASSWORD,
+    ATTR_ZONE,
+    SERVICE_GET_FLEET_SNAPSHOT,
+    SERVICE_RUN_MAINTENANCE,
+    SERVICE_SET_ZONE,
+    SERVICE_START_PROFILING,
+)
+from .coordinator import async_get_coordinators
+from .export import FORMATS, EcoVentExporter
+from .fleet import FleetSnapshot
+from .gateway import EcoVentGateway
+from .lib.pyecovent import EcoVentClient, TokenBucket
+from .maintenance import ACTION_SET_WIFI, ACTIONS, MaintenanceJob
+from .profiling import EcoVentProfiler, profile_path
+from .zone import EcoVentZone
+
+LOG = logging.getLogger(__name__)
+
+CONFIG_SCHEMA = vol.Schema(
+    {
+        vol.Optional(MY_DOMAIN, default={}): vol.Schema(
+            {
+                vol.Optional(
+                    CONF_RATE_LIMIT, default=CONF_DEFAULT_GLOBAL_RATE_LIMIT
+                ): vol.All(vol.Coerce(float), vol.Range(min=0.1)),
+                vol.Optional(
+                    CONF_RATE_LIMIT_BURST, default=CONF_DEFAULT_GLOBAL_RATE_LIMIT_BURST
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                vol.Optional(CONF_ZONES, default={}): {
+                    cv.slug: cv.entities_domain("fan")
+                },
+                vol.Optional(CONF_EXPORT): vol.Schema(
+                    {
+                        vol.Optional(CONF_FORMAT, default=CONF_DEFAULT_FORMAT): vol.In(
+                            FORMATS
+                        ),
+                        vol.Optional(CONF_PATH): cv.string,
+                        vol.Optional(
+                            CONF_MAX_SIZE, default=CONF_DEFAULT_MAX_SIZE
+                        ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                        vol.Optional(
+                            CONF_BACKUPS, default=CONF_DEFAULT_BACKUPS
+                        ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                        vol.Optional(
+                            CONF_QUEUE_SIZE, default=CONF_DEFAULT_QUEUE_SIZE
+                        ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                    }
+                ),
+                vol.Optional(CONF_GATEWAY): vol.Schema(
+                    {
+                        vol.Optional(CONF_HOST, default=CONF_DEFAULT_GATEWAY_HOST): cv.string,
+                        vol.Optional(CONF_PORT, default=CONF_DEFAULT_PORT): cv.port,
+                        vol.Optional(CONF_ALLOW_SETUP_WRITES, default=False): cv.boolean,
+                    }
+                ),
+            }
+        )
+    },
+    extra=vol.ALLOW_EXTRA,
+)
+
+WIFI_OPTIONS = (ATTR_WIFI_NAME, ATTR_WIFI_PASSWORD, ATTR_WIFI_ENCRYPTION)
+
+
+def _wifi_options(data):
+    """Wi-Fi settings are required for set_wifi and only allowed there."""
+    given = [option for option in WIFI_OPTIONS if option in data]
+    if data[ATTR_ACTION] == ACTION_SET_WIFI and not given:
+        raise vol.Invalid(f"{ACTION_SET_WIFI} needs at least one of {', '.join(WIFI_OPTIONS)}")
+    if data[ATTR_ACTION] != ACTION_SET_WIFI and given:
+        raise vol.Invalid(f"{', '.join(given)} only apply to {ACTION_SET_WIFI}")
+    return data
+
+
+RUN_MAINTENANCE_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Required(ATTR_ACTION): vol.In(ACTIONS),
+            vol.Optional(ATTR_ENTITY_ID): cv.entity_ids,
+            vol.Optional(ATTR_CONCURRENCY, default=4): vol.All(
+                vol.Coerce(int), vol.Range(min=1, max=32)
+            ),
+            vol.Optional(ATTR_RETRIES, default=2): vol.All(
+                vol.Coerce(int), vol.Range(min=0, max=5)
+            ),
+            # Limited to the bytes the unit stores, one per character
+            vol.Optional(ATTR_WIFI_NAME): vol.All(
+                cv.string, vol.Length(max=EcoVentClient.value_sizes["wifi_name"])
+            ),
+            vol.Optional(ATTR_WIFI_PASSWORD): vol.All(
+                cv.string, vol.Length(max=EcoVentClient.value_sizes["wifi_pasword"])
+            ),
+            vol.Optional(ATTR_WIFI_ENCRYPTION): vol.In(
+                list(EcoVentClient.wifi_enc_types.values())
+            ),
+        }
+    ),
+    _wifi_options,
+)
+
 
 async def async_setup(hass, config):
+    conf = config.get(MY_DOMAIN, {})
+    data = hass.data.setdefault(MY_DOMAIN, {})
+    # Needed to load the other platforms of every fan
+    data[DATA_CONFIG] = config
+    # Shared by every ecovent fan, limits the traffic of the whole platform
+    data[DATA_RATE_LIMITER] = TokenBucket(
+        conf.get(CONF_RATE_LIMIT, CONF_DEFAULT_GLOBAL_RATE_LIMIT),
+        conf.get(CONF_RATE_LIMIT_BURST, CONF_DEFAULT_GLOBAL_RATE_LIMIT_BURST),
+    )
+
+    # Updated by the coordinator of every fan, read by the fleet sensors
+    fleet = data[DATA_FLEET] = FleetSnapshot(hass)
+    hass.async_create_task(
+        discovery.async_load_platform(hass, "sensor", MY_DOMAIN, {CONF_FLEET: True}, config)
+    )
+
+    async def async_get_fleet_snapshot(_call: ServiceCall):
+        return {
+            **fleet.export(),
+            "running": fleet.running(),
+            "mean_humidity": fleet.mean_humidity(),
+            "filters_due": fleet.filters_due(),
+            "max_rpm_imbalance": fleet.max_rpm_imbalance(),
+        }
+
+    hass.services.async_register(
+        MY_DOMAIN,
+        SERVICE_GET_FLEET_SNAPSHOT,
+        async_get_fleet_snapshot,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    if (export := conf.get(CONF_EXPORT)) is not None:
+        # Relative paths are in the configuration directory
+        path = hass.config.path(
+            export.get(CONF_PATH, f"{MY_DOMAIN}.{export[CONF_FORMAT]}")
+        )
+        exporter = data[DATA_EXPORTER] = EcoVentExporter(
+            path,
+            export[CONF_FORMAT],
+            export[CONF_MAX_SIZE] * 1024 * 1024,
+            export[CONF_BACKUPS],
+            export[CONF_QUEUE_SIZE],
+        )
+        exporter.start()
+
+        async def async_stop_export(_event: Event):
+            await hass.async_add_executor_job(exporter.stop)
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, async_stop_export)
+
+    if (gateway_conf := conf.get(CONF_GATEWAY)) is not None:
+        gateway = EcoVentGateway(
+            hass,
+            gateway_conf[CONF_HOST],
+            gateway_conf[CONF_PORT],
+            gateway_conf[CONF_ALLOW_SETUP_WRITES],
+        )
+        try:
+            await gateway.async_start()
+        except OSError as e:
+            LOG.error(
+                f"Cannot start the ecovent gateway on {gateway.host}:{gateway.port}: {str(e)}"
+            )
+        else:
+            data[DATA_GATEWAY] = gateway
+
+            @callback
+            def async_stop_gateway(_event: Event):
+                gateway.async_stop()
+
+            hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, async_stop_gateway)
+
+    async def async_run_maintenance(call: ServiceCall):
+        job = MaintenanceJob(
+            hass,
+            call.data[ATTR_ACTION],
+            {option: call.data[option] for option in WIFI_OPTIONS if option in call.data},
+            call.data[ATTR_CONCURRENCY],
+            call.data[ATTR_RETRIES],
+        )
+        return await job.async_run(
+            async_get_coordinators(hass, call.data.get(ATTR_ENTITY_ID))
+        )
+
+    hass.services.async_register(
+        MY_DOMAIN,
+        SERVICE_RUN_MAINTENANCE,
+        async_run_maintenance,
+        RUN_MAINTENANCE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def async_start_profiling(call: ServiceCall):
+        profiler = data.get(DATA_PROFILER)
+        if profiler is not None and profiler.running:
+            raise HomeAssistantError("Profiling of the ecovent fans is already running")
+        coordinators = [
+            coordinator
+            for coordinator in async_get_coordinators(hass).values()
+            if coordinator is not None
+        ]
+        profiler = data[DATA_PROFILER] = EcoVentProfiler(
+            hass,
+            coordinators,
+            call.data[ATTR_DURATION].total_seconds(),
+            call.data[ATTR_SLOW_EXCHANGE] / 1000,
+            profile_path(hass),
+        )
+        profiler.async_start()
+        return {"report": profiler.report_path, "profile": profiler.path + ".prof"}
+
+    hass.services.async_register(
+        MY_DOMAIN,
+        SERVICE_START_PROFILING,
+        async_start_profiling,
+        vol.Schema(
+            {
+                vol.Optional(ATTR_DURATION, default=timedelta(seconds=60)): vol.All(
+                    cv.time_period,
+                    vol.Range(min=timedelta(seconds=5), max=timedelta(hours=1)),
+                ),
+                vol.Optional(ATTR_SLOW_EXCHANGE, default=1000): vol.All(
+                    vol.Coerce(int), vol.Range(min=10)
+                ),
+            }
+        ),
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    zones = {
+        name: EcoVentZone(hass, name, entity_ids)
+        for name, entity_ids in conf.get(CONF_ZONES, {}).items()
+    }
+    if zones:
+
+        async def async_set_zone(call: ServiceCall):
+            zone = zones[call.data[ATTR_ZONE]]
+            members = await zone.async_write(
+                call.data.get(ATTR_PERCENTAGE), call.data.get(ATTR_AIRFLOW)
+            )
+            return {ATTR_ZONE: zone.name, "members": members}
+
+        hass.services.async_register(
+            MY_DOMAIN,
+            SERVICE_SET_ZONE,
+            async_set_zone,
+            vol.All(
+                vol.Schema(
+                    {
+                        vol.Required(ATTR_ZONE): vol.In(list(zones)),
+                        vol.Optional(ATTR_PERCENTAGE): vol.All(
+                            vol.Coerce(int), vol.Range(min=0, max=100)
+                        ),
+                        vol.Optional(ATTR_AIRFLOW): vol.In(
+                            list(EcoVentClient.airflows.values())
+                        ),
+                    }
+                ),
+                cv.has_at_least_one_key(ATTR_PERCENTAGE, ATTR_AIRFLOW),
+            ),
+            supports_response=SupportsResponse.OPTIONAL,
+        )
     return True
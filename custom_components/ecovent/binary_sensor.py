@@ -0,0 +1,90 @@
+"""Binary sensors of EcoVent fans, read from the shared poll of the fan platform"""
+
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Callable
+
+from homeassistant.components.binary_sensor import (
+    BinarySensorDeviceClass,
+    BinarySensorEntity,
+    BinarySensorEntityDescription,
+)
+from homeassistant.const import CONF_DEVICE_ID
+
+from .const import MY_DOMAIN, DATA_COORDINATORS
+from .coordinator import EcoVentCoordinator
+from .entity import EcoVentEntity
+
+
+@dataclass(frozen=True, kw_only=True)
+class EcoVentBinarySensorEntityDescription(BinarySensorEntityDescription):
+    """Binary sensor reading one decoded value of the fan."""
+
+    value_fn: Callable[[EcoVentCoordinator], bool | None]
+
+
+BINARY_SENSORS: tuple[EcoVentBinarySensorEntityDescription, ...] = (
+    EcoVentBinarySensorEntityDescription(
+        key="filter_replacement",
+        name="Filter replacement",
+        icon="mdi:air-filter",
+        device_class=BinarySensorDeviceClass.PROBLEM,
+        value_fn=lambda coordinator: (
+            coordinator.client.filter_replacement_status == "on"
+            if coordinator.client.filter_replacement_status is not None
+            else None
+        ),
+    ),
+    EcoVentBinarySensorEntityDescription(
+        key="alarm",
+        name="Alarm",
+        device_class=BinarySensorDeviceClass.PROBLEM,
+        value_fn=lambda coordinator: (
+            coordinator.client.alarm_status != "no"
+            if coordinator.client.alarm_status is not None
+            else None
+        ),
+    ),
+)
+
+# Only for fans with a humidity_boost controller
+CONTROLLER_BINARY_SENSORS: tuple[EcoVentBinarySensorEntityDescription, ...] = (
+    EcoVentBinarySensorEntityDescription(
+        key="humidity_boost",
+        name="Humidity boost",
+        icon="mdi:water-percent-alert",
+        device_class=BinarySensorDeviceClass.RUNNING,
+        value_fn=lambda coordinator: coordinator.controller.active,
+    ),
+)
+
+
+# pylint: disable=unused-argument
+async def async_setup_platform(hass, config, async_add_entities, discovery_info=None):
+    """Set up the binary sensors of a fan loaded by the fan platform."""
+    if discovery_info is None:
+        return
+    coordinator = hass.data[MY_DOMAIN][DATA_COORDINATORS][discovery_info[CONF_DEVICE_ID]]
+    descriptions = BINARY_SENSORS
+    if coordinator.controller is not None:
+        descriptions += CONTROLLER_BINARY_SENSORS
+    async_add_entities(
+        EcoVentBinarySensor(coordinator, description) for description in descriptions
+    )
+
+
+class EcoVentBinarySensor(EcoVentEntity, BinarySensorEntity):
+    """Binary sensor of one EcoVent unit"""
+
+    entity_description: EcoVentBinarySensorEntityDescription
+
+    def __init__(self, coordinator, description: EcoVentBinarySensorEntityDescription):
+        super().__init__(coordinator, description.key, description.name)
+        self.entity_description = description
+
+    @property
+    def is_on(self) -> bool | None:
+        return self.entity_description.value_fn(self.coordinator)
+
+    def visible_values(self):
+        return (self.available, self.is_on)
@@ -1,6 +1,9 @@
 
 MY_DOMAIN = "ecovent"
 
+# Platforms loaded for every fan, all of them read the poll of the fan platform
+PLATFORMS = ["sensor", "binary_sensor", "select", "number"]
+
 """ Service constants"""
 SERVICE_CLEAR_FILTER_REMINDER = "clear_filter_reminder"
 SERVICE_HUMIDITY_SENSOR_TURN_ON = "humidity_sensor_turn_on"
@@ -9,12 +12,68 @@ SERVICE_SET_HUMIDITY_SENSOR_TRESHOLD_PERCENTAGE = (
     "set_humidity_sensor_treshold_percentage"
 )
 SERVICE_SET_AIRFLOW = "set_airflow"
+SERVICE_GET_TELEMETRY = "get_telemetry"
+SERVICE_SET_ZONE = "set_zone"
+SERVICE_GET_SCHEDULE = "get_schedule"
+SERVICE_SET_SCHEDULE = "set_schedule"
+SERVICE_READ_PARAMETERS = "read_parameters"
+SERVICE_WRITE_PARAMETERS = "write_parameters"
+SERVICE_RUN_MAINTENANCE = "run_maintenance"
+SERVICE_START_PROFILING = "start_profiling"
+SERVICE_GET_FLEET_SNAPSHOT = "get_fleet_snapshot"
 
 """ Configuration constants"""
 CONF_DEFAULT_DEVICE_ID = "DEFAULT_DEVICEID"
 CONF_DEFAULT_NAME = "ecofanv2"
 CONF_DEFAULT_PORT = 4000
 CONF_DEFAULT_PASSWORD = "1111"
+CONF_FAST_SCAN_INTERVAL = "fast_scan_interval"
+CONF_MAX_SCAN_INTERVAL = "max_scan_interval"
+CONF_DEFAULT_FAST_SCAN_INTERVAL = 5  # seconds
+CONF_DEFAULT_MAX_SCAN_INTERVAL = 300  # seconds
+FAST_POLL_AFTER_COMMAND = 60  # seconds of fast polling after a command
+CONF_PAYLOAD_LIMIT = "payload_limit"
+CONF_HUMIDITY_BOOST = "humidity_boost"
+CONF_RATE_OF_RISE = "rate_of_rise"
+CONF_HYSTERESIS = "hysteresis"
+CONF_SPEED = "speed"
+CONF_WINDOW = "window"
+CONF_DEFAULT_RATE_OF_RISE = 2.0  # % humidity per minute
+CONF_DEFAULT_HYSTERESIS = 3.0  # % humidity
+CONF_DEFAULT_WINDOW = 120  # seconds
+CONF_ZONES = "zones"
+CONF_EXPORT = "export"
+CONF_FORMAT = "format"
+CONF_MAX_SIZE = "max_size"
+CONF_BACKUPS = "backups"
+CONF_QUEUE_SIZE = "queue_size"
+CONF_DEFAULT_FORMAT = "jsonl"
+CONF_DEFAULT_MAX_SIZE = 10  # MB per file
+CONF_DEFAULT_BACKUPS = 5
+CONF_DEFAULT_QUEUE_SIZE = 1000  # polls waiting to be written
+CONF_GATEWAY = "gateway"
+CONF_FLEET = "fleet"
+CONF_DEFAULT_GATEWAY_HOST = "127.0.0.1"
+CONF_ALLOW_SETUP_WRITES = "allow_setup_writes"
+CONF_RATE_LIMIT = "rate_limit"
+CONF_RATE_LIMIT_BURST = "rate_limit_burst"
+CONF_DEFAULT_RATE_LIMIT = 2.0  # requests per second and device
+CONF_DEFAULT_RATE_LIMIT_BURST = 5
+CONF_DEFAULT_GLOBAL_RATE_LIMIT = 20.0  # requests per second for all devices
+CONF_DEFAULT_GLOBAL_RATE_LIMIT_BURST = 40
+RATE_LIMIT_MAX_DELAY = 5  # seconds a request may wait before it is dropped
+BREAKER_FAILURE_THRESHOLD = 3  # failed exchanges before a fan is unavailable
+BREAKER_BACKOFF = 10  # seconds until the first probe of an unavailable fan
+BREAKER_MAX_BACKOFF = 600
+
+""" hass.data keys """
+DATA_RATE_LIMITER = "rate_limiter"
+DATA_COORDINATORS = "coordinators"
+DATA_CONFIG = "config"
+DATA_EXPORTER = "exporter"
+DATA_PROFILER = "profiler"
+DATA_GATEWAY = "gateway"
+DATA_FLEET = "fleet"
 
 """ Atributes constants """
 ATTR_AIRFLOW = "airflow"
@@ -26,6 +85,25 @@ ATTR_HUMIDITY = "humidity"
 ATTR_HUMIDITY_SENSOR_STATUS = "humidity_sensor_status"  #
 ATTR_HUMIDITY_SENSOR_TRESHOLD = "humidity_sensor_treshold"  #
 ATTR_MACHINE_HOURS = "machine_hours"  #
+ATTR_STALE = "stale"
+ATTR_RATE_LIMIT_DEFERRED = "rate_limit_deferred"
+ATTR_RATE_LIMIT_DROPPED = "rate_limit_dropped"
+ATTR_START = "start"
+ATTR_END = "end"
+ATTR_RESOLUTION = "resolution"
+ATTR_ZONE = "zone"
+ATTR_SLOTS = "slots"
+ATTR_PARAMETERS = "parameters"
+ATTR_ACTION = "action"
+ATTR_CONCURRENCY = "concurrency"
+ATTR_RETRIES = "retries"
+ATTR_WIFI_NAME = "wifi_name"
+ATTR_WIFI_PASSWORD = "wifi_password"
+ATTR_WIFI_ENCRYPTION = "wifi_encryption"
+ATTR_DURATION = "duration"
+ATTR_SLOW_EXCHANGE = "slow_exchange"
+ATTR_PROFILE = "profile"
+ATTR_SLOW_EXCHANGES = "slow_exchanges"
 
 """ PRESET MODES """
 PRESET_MODE_ON = "on"
@@ -0,0 +1,104 @@
+"""Boost of EcoVent fans while the humidity rises fast, decided on every poll"""
+
+from __future__ import annotations
+from collections import deque
+
+from .lib.pyecovent import DEFAULT_PROFILE, UnitProfile
+
+
+class HumidityBoostController:
+    """Rate of rise detector with hysteresis on the humidity of one fan.
+
+    The controller triggers when the humidity has risen by at least
+    `hysteresis` % and at `rate_of_rise` % per minute or faster within the
+    last `window` seconds. It releases once the humidity is back within
+    `hysteresis` % of the value the rise started from.
+
+    While triggered the fan runs in boost mode, or at `speed` % if given.
+    update() returns the parameters to write, all in one frame, and the
+    coordinator reports the outcome with written().
+    """
+
+    def __init__(
+        self,
+        rate_of_rise: float = 2.0,
+        hysteresis: float = 3.0,
+        speed: int | None = None,
+        window: float = 120.0,
+    ):
+        self.rate_of_rise = rate_of_rise
+        self.hysteresis = hysteresis
+        self.speed = speed
+        self.window = window
+        self.active = False
+        # Humidity the rise started from
+        self.baseline = None
+        self._samples: deque[tuple[float, int]] = deque()
+        self._restore: dict[str, str] = {}
+        # Metrics
+        self.triggers = 0
+        self.writes = 0
+        self.failed_writes = 0
+        self.last_latency = None
+
+    def update(
+        self,
+        stamp: float,
+        values: dict[str, int],
+        profile: UnitProfile = DEFAULT_PROFILE,
+    ) -> dict[str, str] | None:
+        """Add the values of a poll, returns the parameters to write, if any."""
+        humidity = values.get("humidity")
+        if humidity is None:
+            return None
+        samples = self._samples
+        samples.append((stamp, humidity))
+        while len(samples) > 2 and stamp - samples[0][0] > self.window:
+            samples.popleft()
+
+        if self.active:
+            if humidity <= self.baseline + self.hysteresis:
+                self.active = False
+                return self._release()
+            return None
+
+        low_stamp, low = min(samples, key=lambda sample: sample[1])
+        rise = humidity - low
+        elapsed = stamp - low_stamp
+        if elapsed <= 0 or rise < self.hysteresis:
+            return None
+        if rise / elapsed * 60 >= self.rate_of_rise:
+            self.active = True
+            self.baseline = low
+            self.triggers += 1
+            return self._trigger(values, profile)
+        return None
+
+    def written(self, ok: bool, latency: float) -> None:
+        """Record the outcome of a write, a failed one is retried with the next poll."""
+        self.last_latency = latency
+        if ok:
+            self.writes += 1
+            return
+        self.failed_writes += 1
+        self.active = not self.active
+
+    def _trigger(self, values: dict[str, int], profile: UnitProfile) -> dict[str, str]:
+        if self.speed is None:
+            return {"boost_status": "01"}
+        # Back to the previous state, speed and manual speed on release
+        self._restore = {
+            name: hex(values[name]).replace("0x", "").zfill(2)
+            for name in ("state", "speed", "man_speed")
+            if values.get(name) is not None
+        }
+        return {
+            "state": "01",
+            "man_speed": f"{profile.man_speed(self.speed):02x}",
+            "speed": "ff",
+        }
+
+    def _release(self) -> dict[str, str]:
+        if self.speed is None:
+            return {"boost_status": "00"}
+        return self._restore or None
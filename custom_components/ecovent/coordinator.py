@@ -0,0 +1,302 @@
+"""Shared poll of one EcoVent fan for all of its entities"""
+
+from __future__ import annotations
+import asyncio
+import logging
+import time
+from datetime import timedelta
+from typing import Callable
+
+from homeassistant.core import CALLBACK_TYPE, HassJob, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.event import async_call_later
+
+from .const import MY_DOMAIN, DATA_COORDINATORS, FAST_POLL_AFTER_COMMAND
+from .controller import HumidityBoostController
+from .export import EcoVentExporter
+from .fleet import FleetSnapshot
+from .lib.pyecovent import (
+    DeviceUnavailable,
+    EcoVentClient,
+    RateLimitExceeded,
+)
+from .statistics import EcoVentStatistics
+from .telemetry import Telemetry
+
+LOG = logging.getLogger(__name__)
+
+
+@callback
+def async_get_coordinators(
+    hass: HomeAssistant, entity_ids: list[str] | None = None
+) -> dict[str, EcoVentCoordinator | None]:
+    """Coordinator of every fan entity, of all ecovent fans by default.
+
+    None for entities that are not a loaded ecovent fan.
+    """
+    registry = er.async_get(hass)
+    coordinators = hass.data.get(MY_DOMAIN, {}).get(DATA_COORDINATORS, {})
+    if entity_ids is None:
+        entity_ids = [
+            entry.entity_id
+            for entry in registry.entities.values()
+            if entry.platform == MY_DOMAIN and entry.domain == "fan"
+        ]
+    result = {}
+    for entity_id in entity_ids:
+        entry = registry.async_get(entity_id)
+        result[entity_id] = (
+            coordinators.get(entry.unique_id)
+            if entry is not None and entry.platform == MY_DOMAIN
+            else None
+        )
+    return result
+
+
+class EcoVentCoordinator:
+    """Polls one fan and notifies the entities reading its decoded values.
+
+    Entities never talk to the fan for reading, so adding an entity does not
+    add any protocol traffic.
+
+    The poll interval follows the activity of the fan. While boost, a timer
+    mode or the humidity trigger is active, and for a minute after a command,
+    the fan is polled every `fast_scan_interval`. While none of the
+    `activity_fields` change the interval doubles up to `max_scan_interval`,
+    any change resets it to `scan_interval`.
+    """
+
+    # Read on every poll, they decide how soon the fan is polled again
+    activity_fields = (
+        "state",
+        "speed",
+        "man_speed",
+        "airflow",
+        "humidity",
+        "boost_status",
+        "timer_mode",
+        "humidity_status",
+    )
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        client: EcoVentClient,
+        name: str,
+        scan_interval: timedelta,
+        fast_scan_interval: timedelta | None = None,
+        max_scan_interval: timedelta | None = None,
+        controller: HumidityBoostController | None = None,
+        exporter: EcoVentExporter | None = None,
+        fleet: FleetSnapshot | None = None,
+    ):
+        self.hass = hass
+        self.client = client
+        self.name = name
+        self.scan_interval = scan_interval
+        self.fast_scan_interval = fast_scan_interval or scan_interval
+        self.max_scan_interval = max(max_scan_interval or scan_interval, scan_interval)
+        # Interval until the next poll, shown by the poll interval sensor
+        self.interval = scan_interval
+        self._activity = None
+        self._command_time = -FAST_POLL_AFTER_COMMAND
+        # Values restored at startup that the fan has not confirmed yet
+        self.stale = False
+        # Polls that did not change any entity state, set by the entities
+        self.suppressed_writes = 0
+        self.state_changed = False
+        # Recent values of every successful poll
+        self.telemetry = Telemetry()
+        self.statistics = EcoVentStatistics(hass, client.id, name)
+        # Optional humidity boost, decided after every poll
+        self.controller = controller
+        # Optional export of every poll, polls of this fan it had to drop
+        self.exporter = exporter
+        self.export_dropped = 0
+        # Row of this fan in the snapshot of all fans
+        self.fleet = fleet
+        # Set while profiling is on, results of the last profiling
+        self.profiler = None
+        self.profile_path = None
+        self.slow_exchanges = 0
+        self._listeners: list[CALLBACK_TYPE] = []
+        self._cancel_poll = None
+        self._cancel_probe = None
+        self._running = False
+        client.on_unavailable = lambda: hass.add_job(self._async_unavailable)
+
+    @property
+    def available(self) -> bool:
+        return self.client.available
+
+    @property
+    def device_id(self) -> str:
+        return self.client.id
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> Callable[[], None]:
+        self._listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def async_update_listeners(self) -> None:
+        self._async_update_fleet()
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    @callback
+    def async_start(self) -> None:
+        """Start polling, the first poll runs in the background."""
+        self._running = True
+        self.hass.async_create_background_task(
+            self.async_refresh(), f"ecovent first update {self.client.host}"
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        self._running = False
+        for cancel in (self._cancel_poll, self._cancel_probe):
+            if cancel is not None:
+                cancel()
+        self._cancel_poll = None
+        self._cancel_probe = None
+        self._async_update_fleet()
+
+    async def async_refresh(self, _now=None) -> None:
+        if self._cancel_poll is not None:
+            self._cancel_poll()
+            self._cancel_poll = None
+        try:
+            if await self.async_add_job(
+                self.client.update, self.activity_fields
+            ):
+                self.stale = False
+                now = time.time()
+                self.telemetry.add(now, self.client.values)
+                self.statistics.async_add(now, self.client.values)
+                if self.exporter is not None and not self.exporter.add(
+                    now, self.device_id, self.name, self.client.values
+                ):
+                    self.export_dropped += 1
+                if self.controller is not None:
+                    await self._async_control(now)
+        except (OSError, DeviceUnavailable, RateLimitExceeded) as e:
+            LOG.warning(f"Update of ecovent fan '{self.client.host}' failed: {str(e)}")
+        except Exception:  # pylint: disable=broad-except
+            LOG.exception(f"Unexpected error updating ecovent fan '{self.client.host}'")
+        finally:
+            # The fan is polled again whatever went wrong
+            self.interval = self._next_interval()
+            self._async_schedule_poll(self.interval)
+            self.state_changed = False
+            self.async_update_listeners()
+            if not self.state_changed:
+                self.suppressed_writes += 1
+
+    def async_add_job(self, target, *args) -> asyncio.Future:
+        """Run target in the executor, profiled while profiling is on."""
+        if self.profiler is not None:
+            return self.hass.async_add_executor_job(self.profiler.runcall, target, *args)
+        return self.hass.async_add_executor_job(target, *args)
+
+    async def async_run(self, target, *args):
+        """Send a command in the executor and show its result."""
+        self._command_time = time.monotonic()
+        try:
+            return await self.async_add_job(target, *args)
+        finally:
+            # Confirm the result of the command soon
+            self._async_schedule_poll(self.fast_scan_interval)
+            self.async_update_listeners()
+
+    async def async_write(self, frames: list[str], barrier=None) -> bool:
+        """Send the frames of client.write_frames in one batched exchange and show the result."""
+        return await self.async_run(self.client.exchange, frames, barrier)
+
+    async def _async_control(self, now: float) -> None:
+        """Let the controller decide on the new values and write its parameters right away."""
+        values = self.controller.update(now, self.client.values, self.client.profile)
+        if not values:
+            return
+        detected = time.monotonic()
+        ok = False
+        try:
+            ok = await self.async_add_job(self.client.write, values)
+        except (OSError, DeviceUnavailable, RateLimitExceeded) as e:
+            LOG.warning(
+                f"Humidity boost of ecovent fan '{self.client.host}' failed: {str(e)}"
+            )
+        self.controller.written(ok, time.monotonic() - detected)
+
+    def _next_interval(self) -> timedelta:
+        client = self.client
+        activity = tuple(getattr(client, "_" + name) for name in self.activity_fields)
+        changed = activity != self._activity
+        self._activity = activity
+
+        if (
+            client.boost_status == "on"
+            or client.timer_mode not in (None, "off")
+            or client.humidity_status == "on"
+            or time.monotonic() - self._command_time < FAST_POLL_AFTER_COMMAND
+            # A fast rise of the humidity can only be seen with fast polls
+            or self.controller is not None
+        ):
+            return self.fast_scan_interval
+        if changed:
+            return self.scan_interval
+        # Off or steady, back off towards the ceiling
+        return min(max(self.interval, self.scan_interval) * 2, self.max_scan_interval)
+
+    @callback
+    def _async_update_fleet(self) -> None:
+        if self.fleet is not None:
+            self.fleet.async_update(
+                self.device_id,
+                self.name,
+                self.client.values,
+                self._running and self.available,
+            )
+
+    @callback
+    def _async_schedule_poll(self, delay: timedelta) -> None:
+        if self._cancel_poll is not None:
+            self._cancel_poll()
+            self._cancel_poll = None
+        if not self._running:
+            return
+        self._cancel_poll = async_call_later(
+            self.hass,
+            delay,
+            HassJob(self.async_refresh, "ecovent poll", cancel_on_shutdown=True),
+        )
+
+    @callback
+    def _async_unavailable(self) -> None:
+        self.async_update_listeners()
+        self._async_schedule_probe()
+
+    @callback
+    def _async_schedule_probe(self) -> None:
+        if self._cancel_probe is None:
+            self._cancel_probe = async_call_later(
+                self.hass,
+                self.client.breaker.backoff,
+                HassJob(self._async_probe, "ecovent probe", cancel_on_shutdown=True),
+            )
+
+    async def _async_probe(self, _now) -> None:
+        self._cancel_probe = None
+        try:
+            await self.async_add_job(self.client.probe)
+        except Exception:  # pylint: disable=broad-except
+            LOG.exception(f"Unexpected error probing ecovent fan '{self.client.host}'")
+        if self.client.available:
+            await self.async_refresh()
+        elif self._running:
+            self._async_schedule_probe()
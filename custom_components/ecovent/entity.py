@@ -0,0 +1,59 @@
+"""Base entity for EcoVent fans"""
+
+from __future__ import annotations
+from typing import Any
+
+from homeassistant.core import callback
+from homeassistant.helpers.entity import Entity
+
+from .coordinator import EcoVentCoordinator
+from .lib.pyecovent import EcoVentClient
+
+
+class EcoVentEntity(Entity):
+    """Entity showing values decoded by the shared poll of one fan.
+
+    The state is only written when the value returned by `visible_values`
+    has changed since the last write.
+    """
+
+    _attr_should_poll = False
+    # Counters of the poll itself, their writes do not count as a changed state
+    _poll_counter = False
+
+    def __init__(self, coordinator: EcoVentCoordinator, key: str | None = None, name: str | None = None):
+        self.coordinator = coordinator
+        self._visible = None
+        if key is not None:
+            self._attr_unique_id = f"{coordinator.device_id}_{key}"
+            self._attr_name = f"{coordinator.name} {name}"
+
+    @property
+    def client(self) -> EcoVentClient:
+        return self.coordinator.client
+
+    @property
+    def available(self) -> bool:
+        """Return False while the fan does not answer."""
+        return self.coordinator.available
+
+    def visible_values(self) -> tuple[Any, ...]:
+        """Values shown in the state of the entity."""
+        return (self.available,)
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.async_add_listener(self._handle_coordinator_update)
+        )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only if a user visible value has changed."""
+        visible = self.visible_values()
+        if visible == self._visible:
+            return
+        self._visible = visible
+        if not self._poll_counter:
+            self.coordinator.state_changed = True
+        self.async_write_ha_state()
@@ -0,0 +1,132 @@
+"""Export of the values of every poll of all EcoVent fans to rotating files"""
+
+from __future__ import annotations
+import csv
+from datetime import datetime, timezone
+import io
+import json
+import logging
+import os
+import queue
+import threading
+
+from .lib.pyecovent import EcoVentClient
+
+LOG = logging.getLogger(__name__)
+
+FORMATS = ("jsonl", "csv")
+
+# Columns of the CSV files, every parameter with an integer value
+COLUMNS = ["time", "device_id", "name"] + [
+    name
+    for name, _ in EcoVentClient.params.values()
+    if EcoVentClient.value_sizes.get(name, 1) <= 4
+]
+
+# Records written to the file at once
+BATCH_SIZE = 500
+
+
+class EcoVentExporter:
+    """Appends the values of every poll to a file in a background thread.
+
+    add() never blocks: records are queued and written in batches by the
+    writer thread. When the queue is full the record is dropped and
+    counted. The file is renamed to `<path>.1` ... `<path>.<backups>` once it
+    is larger than `max_bytes`.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        file_format: str = "jsonl",
+        max_bytes: int = 10 * 1024 * 1024,
+        backups: int = 5,
+        queue_size: int = 1000,
+    ):
+        self.path = path
+        self.format = file_format
+        self.max_bytes = max_bytes
+        self.backups = backups
+        # Counted by the writer thread
+        self.written = 0
+        self.failed = 0
+        # Counted by the event loop
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(queue_size)
+        self._thread = threading.Thread(
+            target=self._run, name="ecovent export", daemon=True
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Write the queued records and end the writer thread, blocks."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(10)
+
+    def add(self, stamp: float, device_id: str, name: str, values: dict[str, int]) -> bool:
+        """Queue the values of a poll, returns False if they had to be dropped."""
+        try:
+            self._queue.put_nowait((stamp, device_id, name, dict(values)))
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    def _run(self) -> None:
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            while len(batch) < BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if None in batch:
+                running = False
+                batch = [record for record in batch if record is not None]
+            if not batch:
+                continue
+            try:
+                self._write(batch)
+                self.written += len(batch)
+            except OSError as e:
+                self.failed += len(batch)
+                LOG.warning(f"Export of ecovent values to '{self.path}' failed: {str(e)}")
+
+    def _write(self, batch: list) -> None:
+        if os.path.exists(self.path) and os.path.getsize(self.path) >= self.max_bytes:
+            self._rotate()
+        new = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        out = io.StringIO()
+        if self.format == "csv":
+            writer = csv.DictWriter(out, COLUMNS, extrasaction="ignore")
+            if new:
+                writer.writeheader()
+            for stamp, device_id, name, values in batch:
+                writer.writerow(
+                    {"time": _time(stamp), "device_id": device_id, "name": name, **values}
+                )
+        else:
+            for stamp, device_id, name, values in batch:
+                record = {"time": _time(stamp), "device_id": device_id, "name": name}
+                record.update(values)
+                out.write(json.dumps(record) + "\n")
+        with open(self.path, "a", encoding="utf-8", newline="") as file:
+            file.write(out.getvalue())
+
+    def _rotate(self) -> None:
+        if self.backups < 1:
+            os.remove(self.path)
+            return
+        for n in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{n}"):
+                os.replace(f"{self.path}.{n}", f"{self.path}.{n + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+
+def _time(stamp: float) -> str:
+    return datetime.fromtimestamp(stamp, timezone.utc).isoformat(timespec="seconds")
@@ -1,42 +1,66 @@
 """Eco Heat Recovery Ventilation Fan Control (e.g. Blauberg VENTO Expert A50-1 W)"""
 
 from __future__ import annotations
-import asyncio
-from email.policy import default
+import functools
 import logging
 import ipaddress
-import time
 from datetime import timedelta
+from typing import Any
 
 import voluptuous as vol
 from homeassistant.components.fan import (
     ATTR_PERCENTAGE,
-    ENTITY_ID_FORMAT,
     PLATFORM_SCHEMA,
     FanEntity,
     FanEntityFeature,
 )
 from homeassistant.const import (
     CONF_DEVICE_ID,
-    CONF_ENTITY_ID,
     CONF_IP_ADDRESS,
     CONF_NAME,
     CONF_PASSWORD,
     CONF_PORT,
+    CONF_SCAN_INTERVAL,
 )
-from homeassistant.core import callback
-from homeassistant.helpers import config_validation as cv, entity_platform
-from homeassistant.helpers.dispatcher import async_dispatcher_connect
-from homeassistant.helpers.entity import async_generate_entity_id
-from homeassistant.helpers.entity_component import EntityComponent
-from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.core import SupportsResponse
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv, discovery, entity_platform
+from homeassistant.helpers.restore_state import RestoredExtraData, RestoreEntity
+from homeassistant.util import dt as dt_util
 
 from .const import (
     MY_DOMAIN,
+    PLATFORMS,
     CONF_DEFAULT_DEVICE_ID,
     CONF_DEFAULT_NAME,
     CONF_DEFAULT_PASSWORD,
     CONF_DEFAULT_PORT,
+    CONF_FAST_SCAN_INTERVAL,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_PAYLOAD_LIMIT,
+    CONF_HUMIDITY_BOOST,
+    CONF_RATE_OF_RISE,
+    CONF_HYSTERESIS,
+    CONF_SPEED,
+    CONF_WINDOW,
+    CONF_DEFAULT_RATE_OF_RISE,
+    CONF_DEFAULT_HYSTERESIS,
+    CONF_DEFAULT_WINDOW,
+    CONF_DEFAULT_FAST_SCAN_INTERVAL,
+    CONF_DEFAULT_MAX_SCAN_INTERVAL,
+    CONF_RATE_LIMIT,
+    CONF_RATE_LIMIT_BURST,
+    CONF_DEFAULT_RATE_LIMIT,
+    CONF_DEFAULT_RATE_LIMIT_BURST,
+    DATA_CONFIG,
+    DATA_COORDINATORS,
+    DATA_EXPORTER,
+    DATA_FLEET,
+    DATA_RATE_LIMITER,
+    RATE_LIMIT_MAX_DELAY,
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_BACKOFF,
+    BREAKER_MAX_BACKOFF,
     ATTR_AIRFLOW,
     ATTR_AIRFLOW_MODES,
     ATTR_FILTER_REPLACEMENT_STATUS,
@@ -45,17 +69,99 @@ from .const import (
     ATTR_HUMIDITY_SENSOR_STATUS,
     ATTR_HUMIDITY_SENSOR_TRESHOLD,
     ATTR_MACHINE_HOURS,
+    ATTR_PARAMETERS,
+    ATTR_PROFILE,
+    ATTR_RATE_LIMIT_DEFERRED,
+    ATTR_RATE_LIMIT_DROPPED,
+    ATTR_END,
+    ATTR_RESOLUTION,
+    ATTR_SLOTS,
+    ATTR_SLOW_EXCHANGES,
+    ATTR_START,
+    ATTR_STALE,
     ATTR_UNIT_TYPE,
     PRESET_MODE_ON,
     SERVICE_CLEAR_FILTER_REMINDER,
+    SERVICE_GET_SCHEDULE,
+    SERVICE_GET_TELEMETRY,
+    SERVICE_READ_PARAMETERS,
+    SERVICE_SET_SCHEDULE,
+    SERVICE_WRITE_PARAMETERS,
     SERVICE_SET_AIRFLOW,
     SERVICE_HUMIDITY_SENSOR_TURN_ON,
     SERVICE_HUMIDITY_SENSOR_TURN_OFF,
     SERVICE_SET_HUMIDITY_SENSOR_TRESHOLD_PERCENTAGE,
 )
+from .controller import HumidityBoostController
+from .coordinator import EcoVentCoordinator
+from .entity import EcoVentEntity
+from .lib.pyecovent import CircuitBreaker, EcoVentClient, RateLimiter, TokenBucket
+from .telemetry import RESOLUTIONS
 
 LOG = logging.getLogger(__name__)
 
+SCAN_INTERVAL = timedelta(seconds=30)
+
+# Speeds of a period of the weekly schedule
+SCHEDULE_SPEEDS = {
+    name: number for number, name in EcoVentClient.speeds.items() if number <= 3
+}
+
+SCHEDULE_SLOT_SCHEMA = vol.Schema(
+    {
+        vol.Required("day"): vol.In(list(EcoVentClient.days_of_week.values())),
+        vol.Required("period"): vol.In(EcoVentClient.schedule_periods),
+        vol.Required("speed"): vol.In(list(SCHEDULE_SPEEDS)),
+        vol.Required("end"): cv.time,
+    }
+)
+
+# Parameters the fan answers to, the others can only be written
+READABLE_PARAMETERS = {param[0] for param in EcoVentClient.params.values()}
+
+
+def _parameter(value: Any) -> str:
+    """Name of a parameter given by name or number."""
+    try:
+        return EcoVentClient.param_name(value)
+    except ValueError as e:
+        raise vol.Invalid(str(e)) from e
+
+
+def _readable_parameter(value: Any) -> str:
+    name = _parameter(value)
+    if name not in READABLE_PARAMETERS:
+        raise vol.Invalid(f"Ecovent parameter '{name}' can only be written")
+    return name
+
+
+def _parameter_values(value: Any) -> dict[str, str]:
+    """Hex string written for every parameter, integers are sent little endian."""
+    if not isinstance(value, dict):
+        raise vol.Invalid("Expected a map of parameters to values")
+    values = {}
+    for key, raw in value.items():
+        name = _parameter(key)
+        if name in EcoVentClient.commands:
+            # commands like reset_alarms have no value
+            if raw not in (None, ""):
+                raise vol.Invalid(f"Ecovent command '{name}' takes no value")
+            values[name] = ""
+        elif raw is None:
+            raise vol.Invalid(f"Value of '{name}' is missing")
+        elif isinstance(raw, int) and not isinstance(raw, bool):
+            size = EcoVentClient.value_sizes.get(name, 1)
+            try:
+                values[name] = raw.to_bytes(size, "little").hex()
+            except OverflowError as e:
+                raise vol.Invalid(f"Value of '{name}' does not fit into {size} bytes") from e
+        else:
+            try:
+                values[name] = bytes.fromhex(str(raw)).hex()
+            except ValueError as e:
+                raise vol.Invalid(f"Value of '{name}' is neither a number nor hex") from e
+    return values
+
 PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend(
     {
         vol.Optional(CONF_NAME, default=CONF_DEFAULT_NAME): cv.string,
@@ -63,6 +169,40 @@ PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend(
         vol.Required(CONF_IP_ADDRESS): vol.All(ipaddress.ip_address, cv.string),
         vol.Optional(CONF_PORT, default=CONF_DEFAULT_PORT): cv.port,
         vol.Optional(CONF_PASSWORD, default=CONF_DEFAULT_PASSWORD): cv.string,
+        vol.Optional(CONF_RATE_LIMIT, default=CONF_DEFAULT_RATE_LIMIT): vol.All(
+            vol.Coerce(float), vol.Range(min=0.1)
+        ),
+        vol.Optional(
+            CONF_RATE_LIMIT_BURST, default=CONF_DEFAULT_RATE_LIMIT_BURST
+        ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+        vol.Optional(
+            CONF_FAST_SCAN_INTERVAL,
+            default=timedelta(seconds=CONF_DEFAULT_FAST_SCAN_INTERVAL),
+        ): cv.time_period,
+        vol.Optional(
+            CONF_MAX_SCAN_INTERVAL,
+            default=timedelta(seconds=CONF_DEFAULT_MAX_SCAN_INTERVAL),
+        ): cv.time_period,
+        # Largest value plus the parameter number must fit into one frame
+        vol.Optional(CONF_PAYLOAD_LIMIT): vol.All(
+            vol.Coerce(int), vol.Range(min=40, max=1024)
+        ),
+        vol.Optional(CONF_HUMIDITY_BOOST): vol.Schema(
+            {
+                vol.Optional(
+                    CONF_RATE_OF_RISE, default=CONF_DEFAULT_RATE_OF_RISE
+                ): vol.All(vol.Coerce(float), vol.Range(min=0.1)),
+                vol.Optional(
+                    CONF_HYSTERESIS, default=CONF_DEFAULT_HYSTERESIS
+                ): vol.All(vol.Coerce(float), vol.Range(min=1, max=30)),
+                vol.Optional(CONF_SPEED): vol.All(
+                    vol.Coerce(int), vol.Range(min=2, max=100)
+                ),
+                vol.Optional(
+                    CONF_WINDOW, default=timedelta(seconds=CONF_DEFAULT_WINDOW)
+                ): cv.time_period,
+            }
+        ),
     }
 )
 
@@ -74,12 +214,67 @@ async def async_setup_platform(hass, config, async_add_entities, discovery_info=
     device_ip_address = config.get(CONF_IP_ADDRESS)
     device_port = config.get(CONF_PORT)
     device_pass = config.get(CONF_PASSWORD)
-
-    fan = EcoVentFan(
-        hass, config, device_ip_address, device_pass, device_id, name, device_port
+    data = hass.data.setdefault(MY_DOMAIN, {})
+
+    rate_limiter = RateLimiter(
+        TokenBucket(
+            config.get(CONF_RATE_LIMIT, CONF_DEFAULT_RATE_LIMIT),
+            config.get(CONF_RATE_LIMIT_BURST, CONF_DEFAULT_RATE_LIMIT_BURST),
+        ),
+        shared=data.get(DATA_RATE_LIMITER),
+        max_delay=RATE_LIMIT_MAX_DELAY,
     )
-
-    async_add_entities([fan], update_before_add=True)
+    breaker = CircuitBreaker(
+        BREAKER_FAILURE_THRESHOLD, BREAKER_BACKOFF, BREAKER_MAX_BACKOFF
+    )
+    # The device search without a configured device ID talks to the fan
+    client = await hass.async_add_executor_job(
+        functools.partial(
+            EcoVentClient,
+            device_ip_address,
+            device_pass,
+            device_id,
+            device_port,
+            rate_limiter=rate_limiter,
+            breaker=breaker,
+            payload_limit=config.get(CONF_PAYLOAD_LIMIT),
+        )
+    )
+    controller = None
+    if (boost := config.get(CONF_HUMIDITY_BOOST)) is not None:
+        controller = HumidityBoostController(
+            boost[CONF_RATE_OF_RISE],
+            boost[CONF_HYSTERESIS],
+            boost.get(CONF_SPEED),
+            boost[CONF_WINDOW].total_seconds(),
+        )
+    coordinator = EcoVentCoordinator(
+        hass,
+        client,
+        name,
+        config.get(CONF_SCAN_INTERVAL, SCAN_INTERVAL),
+        config.get(CONF_FAST_SCAN_INTERVAL),
+        config.get(CONF_MAX_SCAN_INTERVAL),
+        controller,
+        data.get(DATA_EXPORTER),
+        data.get(DATA_FLEET),
+    )
+    data.setdefault(DATA_COORDINATORS, {})[client.id] = coordinator
+
+    # The first poll runs in the background, see EcoVentFan.async_added_to_hass
+    async_add_entities([EcoVentFan(coordinator)])
+
+    # All other entities of the fan read the same poll
+    for platform in PLATFORMS:
+        hass.async_create_task(
+            discovery.async_load_platform(
+                hass,
+                platform,
+                MY_DOMAIN,
+                {CONF_DEVICE_ID: client.id},
+                data.get(DATA_CONFIG, {}),
+            )
+        )
 
     # expose service call APIs
     # component = EntityComponent(LOG, MY_DOMAIN, hass)
@@ -115,181 +310,145 @@ async def async_setup_platform(hass, config, async_add_entities, discovery_info=
         SERVICE_CLEAR_FILTER_REMINDER, {}, "async_clear_filter_reminder"
     )
 
-    return True
-
-
-"""Library to handle communication with Wifi ecofan from TwinFresh / Blauberg"""
-import socket
-import sys
-import time
-import math
-from typing import Any
-
+    component.async_register_entity_service(
+        SERVICE_GET_TELEMETRY,
+        {
+            vol.Optional(ATTR_START): cv.datetime,
+            vol.Optional(ATTR_END): cv.datetime,
+            vol.Optional(ATTR_RESOLUTION): vol.In(RESOLUTIONS),
+        },
+        "async_get_telemetry",
+        supports_response=SupportsResponse.ONLY,
+    )
 
-class EcoVentFan(FanEntity):
-    """Class to communicate with the ecofan"""
+    component.async_register_entity_service(
+        SERVICE_READ_PARAMETERS,
+        {vol.Required(ATTR_PARAMETERS): vol.All(cv.ensure_list, [_readable_parameter])},
+        "async_read_parameters",
+        supports_response=SupportsResponse.ONLY,
+    )
+    component.async_register_entity_service(
+        SERVICE_WRITE_PARAMETERS,
+        {vol.Required(ATTR_PARAMETERS): _parameter_values},
+        "async_write_parameters",
+        supports_response=SupportsResponse.OPTIONAL,
+    )
 
-    HEADER = f"FDFD"
+    component.async_register_entity_service(
+        SERVICE_GET_SCHEDULE,
+        {},
+        "async_get_schedule",
+        supports_response=SupportsResponse.ONLY,
+    )
+    component.async_register_entity_service(
+        SERVICE_SET_SCHEDULE,
+        {vol.Required(ATTR_SLOTS): vol.All(cv.ensure_list, [SCHEDULE_SLOT_SCHEMA])},
+        "async_set_schedule",
+        supports_response=SupportsResponse.OPTIONAL,
+    )
 
-    func = {
-        "read": "01",
-        "write": "02",
-        "write_return": "03",
-        "inc": "04",
-        "dec": "05",
-        "resp": "06",
-    }
-    states = {0: "off", 1: "on", 2: "togle"}
-
-    speeds = {
-        0: "standby",
-        1: "low",
-        2: "medium",
-        3: "high",
-        0xFF: "manual",
-    }
+    return True
 
-    timer_modes = {0: "off", 1: "night", 2: "party"}
 
-    statuses = {0: "off", 1: "on"}
 
-    airflows = {0: "ventilation", 1: "heat_recovery", 2: "air_supply"}
+class EcoVentFan(EcoVentEntity, FanEntity, RestoreEntity):
+    """Fan entity of one EcoVent unit"""
 
-    alarms = {0: "no", 1: "alarm", 2: "warning"}
+    # Attributes that change with most polls or never, not written to the
+    # recorder with every state. Humidity and fan speeds have statistics.
+    _unrecorded_attributes = frozenset(
+        {
+            ATTR_AIRFLOW_MODES,
+            "device_id",
+            ATTR_UNIT_TYPE,
+            ATTR_HUMIDITY,
+            ATTR_FILTER_TIMER_COUNTDOWN,
+            ATTR_MACHINE_HOURS,
+            ATTR_RATE_LIMIT_DEFERRED,
+            ATTR_RATE_LIMIT_DROPPED,
+            ATTR_PROFILE,
+            ATTR_SLOW_EXCHANGES,
+        }
+    )
 
-    days_of_week = {
-        0: "all days",
-        1: "Monday",
-        2: "Tuesday",
-        3: "Wednesday",
-        4: "Thursday",
-        5: "Friday",
-        6: "Saturday",
-        7: "Sunday",
-        8: "Mon-Fri",
-        9: "Sat-Sun",
-    }
+    # Decoded values restored at startup until the first poll confirms them
+    snapshot_fields = (
+        "state",
+        "speed",
+        "man_speed",
+        "airflow",
+        "humidity",
+        "filter_replacement_status",
+        "filter_timer_countdown",
+    )
 
-    filters = {0: "filter replacement not required", 1: "replace filter"}
+    # Decoded values shown in the state, a poll only writes the state if one changed
+    visible_fields = (
+        "state",
+        "speed",
+        "man_speed",
+        "unit_type",
+        "airflow",
+        "humidity",
+        "humidity_status",
+        "humidity_treshold",
+        "filter_replacement_status",
+        "filter_timer_countdown",
+        "machine_hours",
+    )
 
-    unit_types = {
-        0x0300: "Vento Expert A50-1/A85-1/A100-1 W V.2",
-        0x0400: "Vento Expert Duo A30-1 W V.2",
-        0x0500: "Vento Expert A30 W V.2",
-        0x9999: "Unknown Type"
-    }
+    def __init__(self, coordinator: EcoVentCoordinator):
+        super().__init__(coordinator)
+        self._name = coordinator.name
 
-    wifi_operation_modes = {1: "client", 2: "ap"}
-
-    wifi_enc_types = {48: "Open", 50: "wpa-psk", 51: "wpa2_psk", 52: "wpa_wpa2_psk"}
-
-    wifi_dhcps = {0: "STATIC", 1: "DHCP", 2: "Invert"}
-
-    params = {
-        0x0001: ["state", states],
-        0x0002: ["speed", speeds],
-        0x0006: ["boost_status", statuses],
-        0x0007: ["timer_mode", timer_modes],
-        0x000B: ["timer_counter", None],
-        0x000F: ["humidity_sensor_state", states],
-        0x0014: ["relay_sensor_state", states],
-        0x0016: ["analogV_sensor_state", states],
-        0x0019: ["humidity_treshold", None],
-        0x0024: ["battery_voltage", None],
-        0x0025: ["humidity", None],
-        0x002D: ["analogV", None],
-        0x0032: ["relay_status", statuses],
-        0x0044: ["man_speed", None],
-        0x004A: ["fan1_speed", None],
-        0x004B: ["fan2_speed", None],
-        0x0064: ["filter_timer_countdown", None],
-        0x0066: ["boost_time", None],
-        0x006F: ["rtc_time", None],
-        0x0070: ["rtc_date", None],
-        0x0072: ["weekly_schedule_state", states],
-        0x0077: ["weekly_schedule_setup", None],
-        0x007C: ["device_search", None],
-        0x007D: ["device_password", None],
-        0x007E: ["machine_hours", None],
-        0x0083: ["alarm_status", alarms],
-        0x0085: ["cloud_server_state", states],
-        0x0086: ["firmware", None],
-        0x0088: ["filter_replacement_status", statuses],
-        0x0094: ["wifi_operation_mode", wifi_operation_modes],
-        0x0095: ["wifi_name", None],
-        0x0096: ["wifi_pasword", None],
-        0x0099: ["wifi_enc_type", wifi_enc_types],
-        0x009A: ["wifi_freq_chnnel", None],
-        0x009B: ["wifi_dhcp", wifi_dhcps],
-        0x009C: ["wifi_assigned_ip", None],
-        0x009D: ["wifi_assigned_netmask", None],
-        0x009E: ["wifi_main_gateway", None],
-        0x00A3: ["curent_wifi_ip", None],
-        0x00B7: ["airflow", airflows],
-        0x00B8: ["analogV_treshold", None],
-        0x00B9: ["unit_type", unit_types],
-        0x0302: ["night_mode_timer", None],
-        0x0303: ["party_mode_timer", None],
-        0x0304: ["humidity_status", statuses],
-        0x0305: ["analogV_status", statuses],
-    }
+        # HA attribute
+        self._attr_preset_modes = [PRESET_MODE_ON]
+        self._attr_preset_mode = None
+        self._attributes = None
+        self._attributes_visible = None
 
-    write_only_params = {
-        0x0065: ["filter_timer_reset", None],
-        0x0077: ["weekly_schedule_setup", None],
-        0x0080: ["reset_alarms", None],
-        0x0087: ["factory_reset", None],
-        0x00A0: ["wifi_apply_and_quit", None],
-        0x00A2: ["wifi_discard_and_quit", None],
-    }
+        # Set HA unique_id
+        self._attr_unique_id = coordinator.device_id
 
-    # ========================== HA implementation ==========================
+        LOG.info(f"Created EcoVent fan controller '{self.client.host}'")
 
-    def __init__(
-        self,
-        hass,
-        conf,
-        host,
-        password="1111",
-        fan_id="DEFAULT_DEVICEID",
-        name="ecofanv2",
-        port=4000,
-    ):
-
-        self.hass = hass
-        self._name = name
-        self._host = host
-        self._port = port
-        self._type = "02"
-        self._id = fan_id
-        self._pwd_size = 0
-        self._password = password
+    async def async_added_to_hass(self) -> None:
+        """Once entity has been added to HASS, restore the last known state."""
+        await super().async_added_to_hass()
 
-        # HA attribute
-        self._attr_preset_modes = [PRESET_MODE_ON]
-        self._state = self.states[0]
-        self._speed = self.speeds[0]  # Initialize speed
+        last_data = await self.async_get_last_extra_data()
+        if last_data is not None:
+            self.restore_snapshot(last_data.as_dict())
 
-        if fan_id == "DEFAULT_DEVICEID":
-            try:
-                self.get_param("device_search")
-                self._id = self.device_search
-            except Exception as e:
-                LOG.error(
-                    f"An error occurred while establishing the ecovent IP '{str(host)}' - a device ID is not found. Try restarting HA or check your configuration."
-                )
-                raise e
+        # Show the restored state right away, confirm it without delaying startup
+        self.async_write_ha_state()
+        self.coordinator.async_start()
+        self.async_on_remove(self.coordinator.async_stop)
 
-        # Set HA unique_id
-        self._attr_unique_id = self._id
+    @property
+    def extra_restore_state_data(self) -> RestoredExtraData:
+        """Decoded values stored by HA on shutdown."""
+        return RestoredExtraData(self.snapshot)
 
-        self.update()
+    @property
+    def snapshot(self) -> dict[str, str | None]:
+        return {name: getattr(self.client, "_" + name) for name in self.snapshot_fields}
 
-        LOG.info(f"Created EcoVent fan controller '{self._host}'")
+    def restore_snapshot(self, snapshot: dict[str, str | None]) -> None:
+        for name in self.snapshot_fields:
+            if snapshot.get(name) is not None:
+                setattr(self.client, "_" + name, snapshot[name])
+        self.coordinator.stale = True
 
-    async def async_added_to_hass(self) -> None:
-        """Once entity has been added to HASS, subscribe to state changes."""
-        await super().async_added_to_hass()
+    def visible_values(self) -> tuple[Any, ...]:
+        return (
+            self.available,
+            self.coordinator.stale,
+            self.preset_mode,
+            self.client.rate_limiter.deferred,
+            self.client.rate_limiter.dropped,
+            self.coordinator.profile_path,
+        ) + tuple(getattr(self.client, "_" + name) for name in self.visible_fields)
 
     # pylint: disable=arguments-differ
     async def async_turn_on(
@@ -298,20 +457,16 @@ class EcoVentFan(FanEntity):
         preset_mode: str | None = None,
         **kwargs,
     ) -> None:
-        """Turn on the fan."""
-        if self.state == "off":
-
-            if percentage is not None:
-                if percentage < 2:
-                    percentage = 33  # Set to LOW
-                await self.async_set_percentage(percentage)
-
-            if preset_mode is None:
-                await self.async_set_preset_mode(PRESET_MODE_ON)  # Set to defalut
-            else:
-                await self.async_set_preset_mode(preset_mode)
-
-            self.turn_on_ventilation()
+        """Turn on the fan, the client skips writes that would not change it."""
+        if percentage is None:
+            await self.async_set_preset_mode(preset_mode or PRESET_MODE_ON)
+            return
+        if percentage < 2:
+            # Set to LOW
+            percentage = self.client.profile.percentage(1)
+        # Turns the fan on in the same write as the speed
+        self._attr_preset_mode = preset_mode or PRESET_MODE_ON
+        await self.async_set_percentage(percentage)
 
     def turn_on(
         self,
@@ -320,28 +475,29 @@ class EcoVentFan(FanEntity):
         **kwargs,
     ) -> None:
         """Turn on the fan."""
-        if self.state == "off":
-            if percentage is not None and percentage >= 2:
-                self.set_man_speed_percent(percentage)
-            self.turn_on_ventilation()
+        if percentage is not None and percentage >= 2:
+            self.client.set_man_speed_percent(percentage, True)
+        else:
+            self.client.turn_on_ventilation()
 
     async def async_turn_off(self, **kwargs):
         """Turn the entity off."""
-        if self.state == "on":
-            self.turn_off_ventilation()
+        await self.coordinator.async_run(self.client.turn_off_ventilation)
 
     # override orignial entity method
     def turn_off(self, **kwargs: Any) -> None:
         """Turn the entity off."""
-        if self.state == "on":
-            self.turn_off_ventilation()
+        self.client.turn_off_ventilation()
+
+    async def async_set_preset_mode(self, preset_mode: str) -> None:
+        await self.coordinator.async_run(self.set_preset_mode, preset_mode)
 
     def set_preset_mode(self, preset_mode: str) -> None:
         LOG.info(f"Set async_set_preset_mode to: {preset_mode}")
         self._attr_preset_mode = preset_mode
 
         if preset_mode == PRESET_MODE_ON:
-            self.turn_on_ventilation()
+            self.client.turn_on_ventilation()
         else:
             self.turn_off()
 
@@ -351,41 +507,115 @@ class EcoVentFan(FanEntity):
         if percentage < 2:
             await self.async_turn_off()
         else:
-            self.set_man_speed_percent(percentage)
-            self.turn_on_ventilation()
+            # Manual speed and turning on in one write
+            await self.coordinator.async_run(
+                self.client.set_man_speed_percent, percentage, True
+            )
 
     async def async_set_airflow(self, airflow: str):
         """Set the airflow of the fan."""
-        self._airflow = airflow
-        self.set_airflow(await self.get_airflow_number_by_name(airflow))
+        await self.coordinator.async_run(
+            self.client.set_airflow, await self.get_airflow_number_by_name(airflow)
+        )
 
     async def get_airflow_number_by_name(self, airflow: str):
-        return list(self.airflows.values()).index(airflow)
+        return list(self.client.airflows.values()).index(airflow)
 
     async def async_humidity_sensor_turn_on(self):
-        request = "000F"
-        value = "01"
-        if self.humidity_sensor_state == "off":
-            self.do_func(self.func["write_return"], request, value)
+        await self.coordinator.async_run(
+            self.client.write_changes, {"humidity_sensor_state": "01"}
+        )
 
     async def async_humidity_sensor_turn_off(self):
-        request = "000F"
-        value = "00"
-        if self.humidity_sensor_state == "on":
-            self.do_func(self.func["write_return"], request, value)
+        await self.coordinator.async_run(
+            self.client.write_changes, {"humidity_sensor_state": "00"}
+        )
 
     async def async_set_humidity_sensor_treshold_percentage(self, percentage: int):
-        if percentage >= 40 and percentage <= 80:
-            request = "0019"
-            value = hex(percentage).replace("0x", "").zfill(2)
-            self.do_func(self.func["write_return"], request, value)
-            # DO WE NEED IT? self.humidity_treshold = percentage
+        if self.client.profile.valid("humidity_treshold", percentage):
+            await self.coordinator.async_run(
+                self.client.write_changes, {"humidity_treshold": f"{percentage:02x}"}
+            )
+
+    async def async_get_telemetry(self, start=None, end=None, resolution=None):
+        """Recent values of the fan from memory, the last hour by default."""
+        end = dt_util.as_utc(end).timestamp() if end else dt_util.utcnow().timestamp()
+        start = dt_util.as_utc(start).timestamp() if start else end - 3600
+        return self.coordinator.telemetry.window(start, end, resolution)
+
+    async def async_read_parameters(self, parameters):
+        """Read the given parameters in one exchange, returns their decoded values."""
+        answered = await self.coordinator.async_add_job(
+            functools.partial(self.client.refresh, parameters, max_age=0)
+        )
+        if not answered:
+            raise HomeAssistantError(f"EcoVent fan '{self.client.host}' did not answer")
+        return {ATTR_PARAMETERS: {name: getattr(self.client, name) for name in parameters}}
+
+    async def async_write_parameters(self, parameters):
+        """Write the given hex values in one exchange, returns the values the fan confirmed.
+
+        Commands are sent afterwards without waiting, the fan does not answer them.
+        """
+        commands = [name for name in parameters if name in EcoVentClient.commands]
+        values = {
+            name: value for name, value in parameters.items() if name not in commands
+        }
+        answered = True
+        if values:
+            answered = await self.coordinator.async_run(self.client.write, values)
+        if commands:
+            await self.coordinator.async_run(self.client.command, commands)
+        return {
+            "answered": answered,
+            ATTR_PARAMETERS: {
+                name: getattr(self.client, name)
+                for name in parameters
+                if name in READABLE_PARAMETERS
+            },
+        }
+
+    async def async_get_schedule(self):
+        """Read all slots of the weekly schedule at once."""
+        if not await self.coordinator.async_add_job(self.client.read_schedule):
+            raise HomeAssistantError(f"EcoVent fan '{self.client.host}' did not answer")
+        speeds = EcoVentClient.speeds
+        return {
+            ATTR_SLOTS: [
+                {
+                    "day": self.client.days_of_week[day],
+                    "period": period,
+                    "speed": speeds.get(speed, speed),
+                    "end": f"{hours:02d}:{minutes:02d}",
+                }
+                for (day, period), (speed, hours, minutes) in sorted(
+                    self.client.schedule.items()
+                )
+            ]
+        }
+
+    async def async_set_schedule(self, slots):
+        """Write the given slots of the weekly schedule, only those that changed."""
+        days = {name: number for number, name in self.client.days_of_week.items()}
+        values = {
+            (days[slot["day"]], slot["period"]): (
+                SCHEDULE_SPEEDS[slot["speed"]],
+                slot["end"].hour,
+                slot["end"].minute,
+            )
+            for slot in slots
+        }
+        written = await self.coordinator.async_run(self.client.write_schedule, values)
+        if written is None:
+            raise HomeAssistantError(f"EcoVent fan '{self.client.host}' did not answer")
+        return {"written": written}
 
     async def async_clear_filter_reminder(self):
-        # !!!! NOT TESTED YET !!!!!
-        if self.filter_replacement_status == "on":
-            request = "0065"
-            self.do_func(self.func["write"], request)
+        if self.client.filter_replacement_status == "on":
+            # A plain write, the unit does not answer it
+            await self.coordinator.async_run(
+                self.client.command, ["filter_timer_reset"]
+            )
 
     async def async_set_direction(self, direction: str):
         """Set the direction of the fan."""
@@ -397,25 +627,39 @@ class EcoVentFan(FanEntity):
 
     @property
     def extra_state_attributes(self):
-        """Return optional state attributes."""
-        data: dict[str, float | str | None] = self.state_attributes
+        """Return optional state attributes, rebuilt only after a visible change."""
+        if self._attributes is not None and self._attributes_visible is self._visible:
+            return self._attributes
 
-        data[ATTR_AIRFLOW_MODES] = self.airflows
-        data["device_id"] = self.id
-        data[ATTR_UNIT_TYPE] = self.unit_type
+        client = self.client
+        data: dict[str, float | str | None] = {}
 
-        data[ATTR_AIRFLOW] = self.airflow
-        data[ATTR_HUMIDITY] = self.humidity
+        data[ATTR_AIRFLOW_MODES] = client.airflows
+        data["device_id"] = client.id
+        data[ATTR_UNIT_TYPE] = client.unit_type
 
-        data[ATTR_HUMIDITY_SENSOR_STATUS] = self.humidity_status
-        data[ATTR_HUMIDITY_SENSOR_TRESHOLD] = self.humidity_treshold
+        data[ATTR_AIRFLOW] = client.airflow
+        data[ATTR_HUMIDITY] = client.humidity
 
-        # data["night_mode_timer"] = self.night_mode_timer
+        data[ATTR_HUMIDITY_SENSOR_STATUS] = client.humidity_status
+        data[ATTR_HUMIDITY_SENSOR_TRESHOLD] = client.humidity_treshold
 
-        data[ATTR_FILTER_REPLACEMENT_STATUS] = self.filter_replacement_status
-        data[ATTR_FILTER_TIMER_COUNTDOWN] = self.filter_timer_countdown
-        data[ATTR_MACHINE_HOURS] = self.machine_hours
+        # data["night_mode_timer"] = client.night_mode_timer
 
+        data[ATTR_FILTER_REPLACEMENT_STATUS] = client.filter_replacement_status
+        data[ATTR_FILTER_TIMER_COUNTDOWN] = client.filter_timer_countdown
+        data[ATTR_MACHINE_HOURS] = client.machine_hours
+        data[ATTR_STALE] = self.coordinator.stale
+
+        data[ATTR_RATE_LIMIT_DEFERRED] = client.rate_limiter.deferred
+        data[ATTR_RATE_LIMIT_DROPPED] = client.rate_limiter.dropped
+        if self.coordinator.profile_path is not None:
+            # Results of the last ecovent.start_profiling
+            data[ATTR_PROFILE] = self.coordinator.profile_path
+            data[ATTR_SLOW_EXCHANGES] = self.coordinator.slow_exchanges
+
+        self._attributes = data
+        self._attributes_visible = self._visible
         return data
 
     @property
@@ -423,776 +667,35 @@ class EcoVentFan(FanEntity):
         return FanEntityFeature.SET_SPEED | FanEntityFeature.PRESET_MODE | FanEntityFeature.TURN_ON | FanEntityFeature.TURN_OFF
 
     @property
-    def is_on(self) -> bool:
+    def is_on(self) -> bool | None:
         """Return true if the entity is on."""
+        if self.state is None:
+            return None
         return self.state != "off"
-    
-    @property 
+
+    @property
     def percentage(self) -> int | None:
         """Return the current speed percentage."""
         if self.state == "off":
             return 0
-        elif hasattr(self, '_speed'):
-            if self._speed == "low":
-                return 33
-            elif self._speed == "medium":
-                return 66
-            elif self._speed == "high":
-                return 100
-            elif self._speed == "standby":
-                return 1
+        speed = self.client.speed
+        if speed == "standby":
+            return 1
+        if speed == "manual":
+            # Decoded with the speed curve of the profile, also when restored
+            man_speed = self.client.man_speed
+            return int(man_speed.split()[0]) if man_speed is not None else None
+        if speed is not None:
+            number = next(
+                number for number, name in self.client.speeds.items() if name == speed
+            )
+            return self.client.profile.percentage(number)
         return None
 
-    # ========================== HA implementation ==========================
-
-    def connect(self):
-        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        self.socket.settimeout(4)
-        self.socket.connect((self._host, self._port))
-        return self.socket
-
-    def str2hex(self, str_msg):
-        return "".join("{:02x}".format(ord(c)) for c in str_msg)
-
-    def hex2str(self, hex_msg):
-        return "".join(
-            chr(int("0x" + hex_msg[i : (i + 2)], 16)) for i in range(0, len(hex_msg), 2)
-        )
-
-    def hexstr2tuple(self, hex_msg):
-        return [int(hex_msg[i : (i + 2)], 16) for i in range(0, len(hex_msg), 2)]
-
-    def chksum(self, hex_msg):
-        checksum = hex(sum(self.hexstr2tuple(hex_msg))).replace("0x", "").zfill(4)
-        byte_array = bytearray.fromhex(checksum)
-        chksum = hex(byte_array[1]).replace("0x", "").zfill(2) + hex(
-            byte_array[0]
-        ).replace("0x", "").zfill(2)
-        return f"{chksum}"
-
-    def get_size(self, str):
-        return hex(len(str)).replace("0x", "").zfill(2)
-
-    def get_header(self):
-        id_size = self.get_size(self._id)
-        pwd_size = self.get_size(self._password)
-        id = self.str2hex(self._id)
-        password = self.str2hex(self._password)
-        str = f"{self._type}{id_size}{id}{pwd_size}{password}"
-        return str
-
-    def get_params_index(self, value):
-        for i in self.params:
-            if self.params[i][0] == value:
-                return i
-
-    def get_write_only_params_index(self, value):
-        for i in self.write_only_params:
-            if self.write_only_params[i][0] == value:
-                return i
-
-    def get_params_values(self, idx, value):
-        index = self.get_params_index(idx)
-        if index != None:
-            if self.params[index][1] != None:
-                for i in self.params[index][1]:
-                    if self.params[index][1][i] == value:
-                        return [index, i]
-            return [index, None]
-        else:
-            return [None, None]
-
-    def send(self, data):
-        self.socket = self.connect()
-        payload = self.get_header() + data
-        payload = self.HEADER + payload + self.chksum(payload)
-        return self.socket.sendall(bytes.fromhex(payload))
-
-    def receive(self):
-        try:
-            response = self.socket.recv(4096)
-            return response
-        except socket.timeout:
-            return None
-
-    def do_func(self, func, param, value=""):
-        out = ""
-        parameter = ""
-        for i in range(0, len(param), 4):
-            n_out = ""
-            out = param[i : (i + 4)]
-            if out == "0077" and value == "":
-                value = "0101"
-            if value != "":
-                val_bytes = int(len(value) / 2)
-            else:
-                val_bytes = 0
-            if out[:2] != "00":
-                n_out = "ff" + out[:2]
-            if val_bytes > 1:
-                n_out += "fe" + hex(val_bytes).replace("0x", "").zfill(2) + out[2:4]
-            else:
-                n_out += out[2:4]
-            parameter += n_out + value
-            if out == "0077":
-                value = ""
-        data = func + parameter
-        self.send(data)
-        response = self.receive()
-        if response:
-            self.parse_response(response)
-            self.socket.close()
-
-    def update(self):
-        request = ""
-        for param in self.params:
-            request += hex(param).replace("0x", "").zfill(4)
-        self.do_func(self.func["read"], request)
-
-    def set_param(self, param, value):
-        valpar = self.get_params_values(param, value)
-        if valpar[0] != None:
-            if valpar[1] != None:
-                self.do_func(
-                    self.func["write_return"],
-                    hex(valpar[0]).replace("0x", "").zfill(4),
-                    hex(valpar[1]).replace("0x", "").zfill(2),
-                )
-            else:
-                self.do_func(
-                    self.func["write_return"],
-                    hex(valpar[0]).replace("0x", "").zfill(4),
-                    value,
-                )
-
-    def get_param(self, param):
-        idx = self.get_params_index(param)
-        if idx != None:
-            self.do_func(self.func["read"], hex(idx).replace("0x", "").zfill(4))
-
-    # def set_state_on(self):
-    def turn_on_ventilation(self):
-        request = "0001"
-        value = "01"
-        if self.state == "off":
-            self.do_func(self.func["write_return"], request, value)
-
-    # def set_state_off(self):
-    def turn_off_ventilation(self):
-        request = "0001"
-        value = "00"
-        if self.state == "on":
-            self.do_func(self.func["write_return"], request, value)
-
-    def set_speed(self, speed: int):
-        if speed >= 1 and speed <= 3:
-            request = "0002"
-            value = hex(speed).replace("0x", "").zfill(2)
-            self.do_func(self.func["write_return"], request, value)
-
-    def set_man_speed_percent(self, speed: int):
-        if speed >= 2 and speed <= 100:
-            request = "0044"
-            value = math.ceil(255 / 100 * speed)
-            value = hex(value).replace("0x", "").zfill(2)
-            self.do_func(self.func["write_return"], request, value)
-            request = "0002"
-            value = "ff"
-            self.do_func(self.func["write_return"], request, value)
-
-    def set_man_speed(self, speed):
-        if speed >= 14 and speed <= 255:
-            request = "0044"
-            value = speed
-            value = hex(value).replace("0x", "").zfill(2)
-            self.do_func(self.func["write_return"], request, value)
-            request = "0002"
-            value = "ff"
-            self.do_func(self.func["write_return"], request, value)
-
-    def set_airflow(self, val):
-        if val >= 0 and val <= 2:
-            request = "00b7"
-            value = hex(val).replace("0x", "").zfill(2)
-            self.do_func(self.func["write_return"], request, value)
-
-    def parse_response(self, data):
-        pointer = 20
-        # discard header bytes
-        length = len(data) - 2
-        pwd_size = data[pointer]
-        pointer += 1
-        password = data[pointer:pwd_size]
-        pointer += pwd_size
-        function = data[pointer]
-        pointer += 1
-        # from here parsing of parameters begin
-        payload = data[pointer:length]
-        response = bytearray()
-        ext_function = 0
-        value_counter = 1
-        high_byte_value = 0
-        parameter = 1
-        for p in payload:
-            if parameter and p == 0xFF:
-                ext_function = 0xFF
-                # print ( "def ext:" + hex(0xff) )
-            elif parameter and p == 0xFE:
-                ext_function = 0xFE
-                # print ( "def ext:" + hex(0xfe) )
-            elif parameter and p == 0xFD:
-                ext_function = 0xFD
-                # print ( "dev ext:" + hex(0xfd) )
-            else:
-                if ext_function == 0xFF:
-                    high_byte_value = p
-                    ext_function = 1
-                elif ext_function == 0xFE:
-                    value_counter = p
-                    ext_function = 2
-                elif ext_function == 0xFD:
-                    None
-                else:
-                    if parameter == 1:
-                        # print ("appending: " + hex(high_byte_value))
-                        response.append(high_byte_value)
-                        parameter = 0
-                    else:
-                        value_counter -= 1
-                    response.append(p)
-
-            if value_counter <= 0:
-                parameter = 1
-                value_counter = 1
-                high_byte_value = 0
-                setattr(
-                    self,
-                    self.params[int(response[:2].hex(), 16)][0],
-                    response[2:].hex(),
-                )
-                response = bytearray()
-
     @property
     def name(self):
         return self._name
 
-    @property
-    def host(self):
-        return self._host
-
-    @host.setter
-    def host(self, ip):
-        try:
-            socket.inet_aton(ip)
-            self._host = ip
-        except socket.error:
-            sys.exit()
-
-    @property
-    def id(self):
-        return self._id
-
-    @id.setter
-    def id(self, id):
-        self._id = id
-
-    @property
-    def password(self):
-        return self._password
-
-    @password.setter
-    def password(self, pwd):
-        self._password = pwd
-
-    @property
-    def port(self):
-        return self._port
-
     @property
     def state(self):
-        return self._state
-
-    @state.setter
-    def state(self, val):
-        self._state = self.states[int(val)]
-
-    @property
-    def speed(self):
-        return self._speed
-
-    @speed.setter
-    def speed(self, input):
-        val = int(input, 16)
-        self._speed = self.speeds[val]
-
-    @property
-    def boost_status(self):
-        return self._boost_status
-
-    @boost_status.setter
-    def boost_status(self, input):
-        val = int(input, 16)
-        self._boost_status = self.statuses[val]
-
-    @property
-    def timer_mode(self):
-        return self._timer_mode
-
-    @timer_mode.setter
-    def timer_mode(self, input):
-        val = int(input, 16)
-        self._timer_mode = self.timer_modes[val]
-
-    @property
-    def timer_counter(self):
-        return self._timer_counter
-
-    @timer_counter.setter
-    def timer_counter(self, input):
-        val = int(input, 16).to_bytes(3, "big")
-        self._timer_counter = (
-            str(val[2]) + "h " + str(val[1]) + "m " + str(val[0]) + "s "
-        )
-
-    @property
-    def humidity_sensor_state(self):
-        return self._humidity_sensor_state
-
-    @humidity_sensor_state.setter
-    def humidity_sensor_state(self, input):
-        val = int(input, 16)
-        self._humidity_sensor_state = self.states[val]
-
-    @property
-    def relay_sensor_state(self):
-        return self._relay_sensor_state
-
-    @relay_sensor_state.setter
-    def relay_sensor_state(self, input):
-        val = int(input, 16)
-        self._relay_sensor_state = self.states[val]
-
-    @property
-    def analogV_sensor_state(self):
-        return self._analogV_sensor_state
-
-    @analogV_sensor_state.setter
-    def analogV_sensor_state(self, input):
-        val = int(input, 16)
-        self._analogV_sensor_state = self.states[val]
-
-    @property
-    def humidity_treshold(self):
-        return self._humidity_treshold
-
-    @humidity_treshold.setter
-    def humidity_treshold(self, input):
-        val = int(input, 16)
-        self._humidity_treshold = str(val) + " %"
-
-    @property
-    def battery_voltage(self):
-        return self._battery_voltage
-
-    @battery_voltage.setter
-    def battery_voltage(self, input):
-        val = int.from_bytes(
-            int(input, 16).to_bytes(2, "big"), byteorder="little", signed=False
-        )
-        self._battery_voltage = str(val) + " mV"
-
-    @property
-    def humidity(self):
-        return self._humidity
-
-    @humidity.setter
-    def humidity(self, input):
-        val = int(input, 16)
-        self._humidity = str(val) + " %"
-
-    @property
-    def analogV(self):
-        return self._analogV
-
-    @analogV.setter
-    def analogV(self, input):
-        val = int(input, 16)
-        self._analogV = str(val)
-
-    @property
-    def relay_status(self):
-        return self._relay_status
-
-    @relay_status.setter
-    def relay_status(self, input):
-        val = int(input, 16)
-        self._relay_status = self.statuses[val]
-
-    @property
-    def man_speed(self):
-        return self._man_speed
-
-    @man_speed.setter
-    def man_speed(self, input):
-        val = int(input, 16)
-        if val >= 0 and val <= 255:
-            percentage = int(val / 255 * 100)
-            self._man_speed = str(percentage) + " %"
-
-            # HA implementation
-            self._attr_percentage = percentage
-
-    @property
-    def fan1_speed(self):
-        return self._fan1_speed
-
-    @fan1_speed.setter
-    def fan1_speed(self, input):
-        val = int.from_bytes(
-            int(input, 16).to_bytes(2, "big"), byteorder="little", signed=False
-        )
-        self._fan1_speed = str(val) + " rpm"
-
-    @property
-    def fan2_speed(self):
-        return self._fan2_speed
-
-    @fan2_speed.setter
-    def fan2_speed(self, input):
-        val = int.from_bytes(
-            int(input, 16).to_bytes(2, "big"), byteorder="little", signed=False
-        )
-        self._fan2_speed = str(val) + " rpm"
-
-    @property
-    def filter_timer_countdown(self):
-        return self._filter_timer_countdown
-
-    @filter_timer_countdown.setter
-    def filter_timer_countdown(self, input):
-        result = ""
-        try:
-            val = int(input, 16).to_bytes(3, "big")
-            result = str(val[2]) + "d " + str(val[1]) + "h " + str(val[0]) + "m "
-        except Exception as e:
-            LOG.error(
-                f"Cannot parse filter_timer_countdown value '{str(input)}': '{str(e)}'"
-            )
-            result = "Unknown value"
-
-        self._filter_timer_countdown = result
-
-    @property
-    def boost_time(self):
-        return self._boost_time
-
-    @boost_time.setter
-    def boost_time(self, input):
-        val = int(input, 16)
-        self._boost_time = str(val) + " m"
-
-    @property
-    def rtc_time(self):
-        return self._rtc_time
-
-    @rtc_time.setter
-    def rtc_time(self, input):
-        val = int(input, 16).to_bytes(3, "big")
-
-        self._rtc_time = str(val[2]) + "h " + str(val[1]) + "m " + str(val[0]) + "s "
-
-    @property
-    def rtc_date(self):
-        return self._rtc_date
-
-    @rtc_date.setter
-    def rtc_date(self, input):
-        val = int(input, 16).to_bytes(4, "big")
-        self._rtc_date = (
-            str(val[1])
-            + " 20"
-            + str(val[3])
-            + "-"
-            + str(val[2]).zfill(2)
-            + "-"
-            + str(val[0]).zfill(2)
-        )
-
-    @property
-    def weekly_schedule_state(self):
-        return self._weekly_schedule_state
-
-    @weekly_schedule_state.setter
-    def weekly_schedule_state(self, val):
-        self._weekly_schedule_state = self.states[int(val)]
-
-    @property
-    def weekly_schedule_setup(self):
-        return self._weekly_schedule_setup
-
-    @weekly_schedule_setup.setter
-    def weekly_schedule_setup(self, input):
-        val = int(input, 16).to_bytes(6, "big")
-        self._weekly_schedule_setup = (
-            self.days_of_week[val[0]]
-            + "/"
-            + str(val[1])
-            + ": to "
-            + str(val[5])
-            + "h "
-            + str(val[4])
-            + "m "
-            + self.speeds[val[2]]
-        )
-
-    @property
-    def device_search(self):
-        return self._device_search
-
-    @device_search.setter
-    def device_search(self, val):
-        self._device_search = self.hex2str(val)
-
-    @property
-    def device_password(self):
-        return self._device_password
-
-    @device_password.setter
-    def device_password(self, val):
-        self._device_password = self.hex2str(val)
-
-    @property
-    def machine_hours(self):
-        return self._machine_hours
-
-    @machine_hours.setter
-    def machine_hours(self, input):
-        result = ""
-        try:
-            val = int(input, 16).to_bytes(4, "big")
-            result = (
-                str(int.from_bytes(val[2:3], "big"))
-                + "d "
-                + str(val[1])
-                + "h "
-                + str(val[0])
-                + "m "
-            )
-        except Exception as e:
-            LOG.error(f"Cannot parse machine_hours value '{str(input)}': '{str(e)}'")
-            result = "Unknown value"
-
-        self._machine_hours = result
-
-    @property
-    def alarm_status(self):
-        return self._alarm_status
-
-    @alarm_status.setter
-    def alarm_status(self, input):
-        val = int(input, 16)
-        self._alarm_status = self.alarms[val]
-
-    @property
-    def cloud_server_state(self):
-        return self._cloud_server_state
-
-    @cloud_server_state.setter
-    def cloud_server_state(self, input):
-        val = int(input, 16)
-        self._cloud_server_state = self.states[val]
-
-    @property
-    def firmware(self):
-        return self._firmware
-
-    @firmware.setter
-    def firmware(self, input):
-        val = int(input, 16).to_bytes(6, "big")
-        self._firmware = (
-            str(val[0])
-            + "."
-            + str(val[1])
-            + " "
-            + str(int.from_bytes(val[4:6], byteorder="little", signed=False))
-            + "-"
-            + str(val[3]).zfill(2)
-            + "-"
-            + str(val[2]).zfill(2)
-        )
-
-    @property
-    def filter_replacement_status(self):
-        return self._filter_replacement_status
-
-    @filter_replacement_status.setter
-    def filter_replacement_status(self, input):
-        val = int(input, 16)
-        self._filter_replacement_status = self.statuses[val]
-
-    @property
-    def wifi_operation_mode(self):
-        return self._wifi_operation_mode
-
-    @wifi_operation_mode.setter
-    def wifi_operation_mode(self, input):
-        val = int(input, 16)
-        self._wifi_operation_mode = self.wifi_operation_modes[val]
-
-    @property
-    def wifi_name(self):
-        return self._wifi_name
-
-    @wifi_name.setter
-    def wifi_name(self, input):
-        self._wifi_name = self.hex2str(input)
-
-    @property
-    def wifi_pasword(self):
-        return self._wifi_pasword
-
-    @wifi_pasword.setter
-    def wifi_pasword(self, input):
-        self._wifi_pasword = self.hex2str(input)
-
-    @property
-    def wifi_enc_type(self):
-        return self._wifi_enc_type
-
-    @wifi_enc_type.setter
-    def wifi_enc_type(self, input):
-        val = int(input, 16)
-        self._wifi_enc_type = self.wifi_enc_types[val]
-
-    @property
-    def wifi_freq_chnnel(self):
-        return self._wifi_freq_chnnel
-
-    @wifi_freq_chnnel.setter
-    def wifi_freq_chnnel(self, input):
-        val = int(input, 16)
-        self._wifi_freq_chnnel = str(val)
-
-    @property
-    def wifi_dhcp(self):
-        return self._wifi_dhcp
-
-    @wifi_dhcp.setter
-    def wifi_dhcp(self, input):
-        val = int(input, 16)
-        self._wifi_dhcp = self.wifi_dhcps[val]
-
-    @property
-    def wifi_assigned_ip(self):
-        return self._wifi_assigned_ip
-
-    @wifi_assigned_ip.setter
-    def wifi_assigned_ip(self, input):
-        val = int(input, 16).to_bytes(4, "big")
-        self._wifi_assigned_ip = (
-            str(val[0]) + "." + str(val[1]) + "." + str(val[2]) + "." + str(val[3])
-        )
-
-    @property
-    def wifi_assigned_netmask(self):
-        return self._wifi_assigned_netmask
-
-    @wifi_assigned_netmask.setter
-    def wifi_assigned_netmask(self, input):
-        val = int(input, 16).to_bytes(4, "big")
-        self._wifi_assigned_netmask = (
-            str(val[0]) + "." + str(val[1]) + "." + str(val[2]) + "." + str(val[3])
-        )
-
-    @property
-    def wifi_main_gateway(self):
-        return self._wifi_main_gateway
-
-    @wifi_main_gateway.setter
-    def wifi_main_gateway(self, input):
-        val = int(input, 16).to_bytes(4, "big")
-        self._wifi_main_gateway = (
-            str(val[0]) + "." + str(val[1]) + "." + str(val[2]) + "." + str(val[3])
-        )
-
-    @property
-    def curent_wifi_ip(self):
-        return self._curent_wifi_ip
-
-    @curent_wifi_ip.setter
-    def curent_wifi_ip(self, input):
-        val = int(input, 16).to_bytes(4, "big")
-        self._curent_wifi_ip = (
-            str(val[0]) + "." + str(val[1]) + "." + str(val[2]) + "." + str(val[3])
-        )
-
-    @property
-    def airflow(self):
-        return self._airflow
-
-    @airflow.setter
-    def airflow(self, input):
-        val = int(input, 16)
-        self._airflow = self.airflows[val]
-
-    @property
-    def analogV_treshold(self):
-        return self._analogV_treshold
-
-    @analogV_treshold.setter
-    def analogV_treshold(self, input):
-        val = int(input, 16)
-        self._analogV_treshold = str(val) + " %"
-
-    @property
-    def unit_type(self):
-        return self._unit_type
-
-    @unit_type.setter
-    def unit_type(self, input):
-        try:
-            val = int(input, 16)
-            self._unit_type = self.unit_types[val]
-        except Exception as e:
-            LOG.info(f"Cannot parse unit_type value '{str(input)}': '{str(e)}'")
-            self._unit_type = self.unit_types[0x9999]
-
-    @property
-    def night_mode_timer(self):
-        return self._night_mode_timer
-
-    @night_mode_timer.setter
-    def night_mode_timer(self, input):
-        val = int(input, 16).to_bytes(2, "big")
-        self._night_mode_timer = (
-            str(val[1]).zfill(2) + "h " + str(val[0]).zfill(2) + "m"
-        )
-
-    @property
-    def party_mode_timer(self):
-        return self._party_mode_timer
-
-    @party_mode_timer.setter
-    def party_mode_timer(self, input):
-        val = int(input, 16).to_bytes(2, "big")
-        self._party_mode_timer = (
-            str(val[1]).zfill(2) + "h " + str(val[0]).zfill(2) + "m"
-        )
-
-    @property
-    def humidity_status(self):
-        return self._humidity_status
-
-    @humidity_status.setter
-    def humidity_status(self, input):
-        val = int(input, 16)
-        self._humidity_status = self.statuses[val]
-
-    @property
-    def analogV_status(self):
-        return self._analogV_status
-
-    @analogV_status.setter
-    def analogV_status(self, input):
-        val = int(input, 16)
-        self._analogV_status = self.statuses[val]
+        return self.client.state
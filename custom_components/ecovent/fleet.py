@@ -0,0 +1,149 @@
+"""Latest values of all EcoVent fans in columns, for fleet-wide sensors and dashboards"""
+
+from __future__ import annotations
+from array import array
+from typing import Any, Callable
+
+from homeassistant.core import CALLBACK_TYPE, HassJob, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+# Integer columns of the snapshot, one row per fan
+COLUMNS = (
+    "state",
+    "speed",
+    "man_speed",
+    "humidity",
+    "fan1_speed",
+    "fan2_speed",
+    "filter_days_left",
+    "filter_replacement",
+    "alarm",
+)
+# Value of a column the fan has not answered yet
+MISSING = -1
+
+# Seconds the listeners are notified after a change at most, however many
+# fans are polled in between
+NOTIFY_DELAY = 1
+
+
+def _row(values: dict[str, int]) -> tuple[int, ...]:
+    """Values of one fan in the order of COLUMNS."""
+    countdown = values.get("filter_timer_countdown")
+    return (
+        values.get("state", MISSING),
+        values.get("speed", MISSING),
+        values.get("man_speed", MISSING),
+        values.get("humidity", MISSING),
+        values.get("fan1_speed", MISSING),
+        values.get("fan2_speed", MISSING),
+        # minutes, hours and days, one byte each
+        countdown >> 16 if countdown is not None else MISSING,
+        values.get("filter_replacement_status", MISSING),
+        values.get("alarm_status", MISSING),
+    )
+
+
+class FleetSnapshot:
+    """One array per column with a row for every fan, updated in place by every poll.
+
+    Rows are never removed, fans that are unavailable or no longer set up
+    are marked in `available` and left out of the aggregates. Listeners are
+    notified at most once every NOTIFY_DELAY seconds.
+    """
+
+    def __init__(self, hass: HomeAssistant):
+        self.hass = hass
+        self.devices: list[str] = []
+        self.names: list[str] = []
+        self.available = array("b")
+        self.columns = {name: array("i") for name in COLUMNS}
+        self._columns = tuple(self.columns.values())
+        self._rows: dict[str, int] = {}
+        self._listeners: list[CALLBACK_TYPE] = []
+        self._cancel_notify = None
+
+    @callback
+    def async_update(
+        self, device_id: str, name: str, values: dict[str, int], available: bool
+    ) -> None:
+        row = self._rows.get(device_id)
+        if row is None:
+            row = self._rows[device_id] = len(self.devices)
+            self.devices.append(device_id)
+            self.names.append(name)
+            self.available.append(0)
+            for column in self._columns:
+                column.append(MISSING)
+        self.available[row] = available
+        for column, value in zip(self._columns, _row(values)):
+            column[row] = value
+        if self._cancel_notify is None and self._listeners:
+            self._cancel_notify = async_call_later(
+                self.hass,
+                NOTIFY_DELAY,
+                HassJob(self._async_notify, "ecovent fleet", cancel_on_shutdown=True),
+            )
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> Callable[[], None]:
+        self._listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def _async_notify(self, _now=None) -> None:
+        self._cancel_notify = None
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    def running(self) -> int:
+        return sum(
+            1
+            for up, state in zip(self.available, self.columns["state"])
+            if up and state == 1
+        )
+
+    def mean_humidity(self) -> float | None:
+        humidities = [
+            humidity
+            for up, humidity in zip(self.available, self.columns["humidity"])
+            if up and humidity != MISSING
+        ]
+        return round(sum(humidities) / len(humidities), 1) if humidities else None
+
+    def filters_due(self) -> int:
+        return sum(
+            1
+            for up, due in zip(self.available, self.columns["filter_replacement"])
+            if up and due == 1
+        )
+
+    def max_rpm_imbalance(self) -> int | None:
+        """Largest difference between the two fans of a running unit, in rpm."""
+        imbalances = [
+            abs(fan1 - fan2)
+            for up, state, fan1, fan2 in zip(
+                self.available,
+                self.columns["state"],
+                self.columns["fan1_speed"],
+                self.columns["fan2_speed"],
+            )
+            if up and state == 1 and fan1 != MISSING and fan2 != MISSING
+        ]
+        return max(imbalances) if imbalances else None
+
+    def export(self) -> dict[str, Any]:
+        """Copy of all columns as lists, MISSING where a value is unknown."""
+        result: dict[str, Any] = {
+            "devices": list(self.devices),
+            "names": list(self.names),
+            "available": [bool(up) for up in self.available],
+        }
+        for name, column in self.columns.items():
+            result[name] = column.tolist()
+        return result
@@ -0,0 +1,160 @@
+"""Local UDP gateway sharing the poll of the EcoVent fans with other consumers"""
+
+from __future__ import annotations
+import asyncio
+import logging
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import MY_DOMAIN, DATA_COORDINATORS, CONF_DEFAULT_DEVICE_ID
+from .coordinator import EcoVentCoordinator
+from .lib.pyecovent import DeviceUnavailable, EcoVentClient, RateLimitExceeded
+
+LOG = logging.getLogger(__name__)
+
+READ = int(EcoVentClient.func["read"], 16)
+WRITE = int(EcoVentClient.func["write"], 16)
+# Functions the unit answers with the changed values
+ANSWERED = {
+    int(EcoVentClient.func[name], 16) for name in ("write_return", "inc", "dec")
+}
+SCHEDULE = 0x0077
+# Parameters that reset the unit or change its network, only forwarded if allowed
+SETUP_PARAMS = frozenset(
+    number
+    for name, number in EcoVentClient.numbers.items()
+    if name == "factory_reset" or name.startswith("wifi_")
+)
+# Value of a parameter the fan has not answered yet
+_MISSING = object()
+
+
+class EcoVentGateway(asyncio.DatagramProtocol):
+    """Speaks the EcoVent protocol on a local UDP port for all ecovent fans.
+
+    Other consumers, e.g. a BMS or a monitoring agent, talk to the gateway
+    instead of the fans. Reads are answered from the values of the last poll
+    of Home Assistant, so they are as fresh as that poll. Parameters the poll
+    has not read yet are read from the fan once. Writes are forwarded to the
+    fan one at a time, together with the reads of its poll, and answered with
+    the values the fan returned. A fan that is unavailable is not answered,
+    like the fan itself would not. Writes of SETUP_PARAMS are dropped
+    unless `allow_setup_writes` is set.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, host: str, port: int, allow_setup_writes: bool = False
+    ):
+        self.hass = hass
+        self.host = host
+        self.port = port
+        self.allow_setup_writes = allow_setup_writes
+        self.transport: asyncio.DatagramTransport | None = None
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    async def async_start(self) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.create_datagram_endpoint(
+            lambda: self, local_addr=(self.host, self.port)
+        )
+        LOG.info(f"EcoVent gateway listening on {self.host}:{self.port}")
+
+    @callback
+    def async_stop(self) -> None:
+        if self.transport is not None:
+            self.transport.close()
+            self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        request = EcoVentClient.parse_request(data)
+        if request is None:
+            LOG.debug(f"Ignoring invalid datagram from {addr[0]}:{addr[1]}")
+            return
+        self.hass.async_create_background_task(
+            self._async_handle(request, addr), "ecovent gateway request"
+        )
+
+    async def _async_handle(self, request, addr) -> None:
+        device_id, password, function, params = request
+        coordinators: dict[str, EcoVentCoordinator] = self.hass.data[MY_DOMAIN].get(
+            DATA_COORDINATORS, {}
+        )
+        if device_id == CONF_DEFAULT_DEVICE_ID:
+            # A device search, answered for every fan
+            targets = list(coordinators.values())
+        else:
+            targets = [coordinators[device_id]] if device_id in coordinators else []
+        for coordinator in targets:
+            client = coordinator.client
+            if password != client.password or not client.available:
+                continue
+            if client.raw is None:
+                # Filled from now on by every poll of the fan
+                client.raw = {}
+            try:
+                packet = await self._async_answer(coordinator, function, params)
+            except (OSError, DeviceUnavailable, RateLimitExceeded) as e:
+                LOG.debug(
+                    f"Gateway request to ecovent fan '{client.host}' failed: {str(e)}"
+                )
+                continue
+            if packet is not None and self.transport is not None:
+                self.transport.sendto(packet, addr)
+
+    async def _async_answer(
+        self, coordinator: EcoVentCoordinator, function: int, params
+    ) -> bytes | None:
+        client = coordinator.client
+        lock = self._locks.setdefault(coordinator.device_id, asyncio.Lock())
+        if function == READ:
+            missing = [param for param in params if _value(client, param) is _MISSING]
+            if missing:
+                async with lock:
+                    # Read by an earlier request while waiting for the lock
+                    missing = [
+                        param for param in missing if _value(client, param) is _MISSING
+                    ]
+                    if missing:
+                        await coordinator.async_add_job(
+                            client.exchange, [client.request_frame(function, missing)]
+                        )
+        elif function == WRITE or function in ANSWERED:
+            if not self.allow_setup_writes and any(
+                param[0] in SETUP_PARAMS for param in params
+            ):
+                LOG.warning(
+                    f"Gateway dropped a write of a reset or Wi-Fi parameter to ecovent fan '{client.host}'"
+                )
+                return None
+            async with lock:
+                frame = client.request_frame(function, params)
+                if function == WRITE:
+                    # Not answered by the unit either
+                    await coordinator.async_run(client.post, [frame])
+                    return None
+                if not await coordinator.async_run(client.exchange, [frame]):
+                    return None
+        else:
+            return None
+        answers = [
+            (param[0], value)
+            for param in params
+            if (value := _value(client, param)) is not _MISSING
+        ]
+        return client.response_packet(answers) if answers else None
+
+
+def _value(client: EcoVentClient, param: tuple[int, bytes]) -> bytes | None:
+    """Last raw value of a requested parameter, None if unsupported and _MISSING if unknown."""
+    number, value = param
+    if number == SCHEDULE and len(value) >= 2:
+        # The slot selected by day and period
+        slot = client.schedule.get((value[0], value[1]))
+        if slot is None:
+            return _MISSING
+        speed, hours, minutes = slot
+        return bytes([value[0], value[1], speed, 0, minutes, hours])
+    return client.raw.get(number, _MISSING)
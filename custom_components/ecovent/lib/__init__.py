@@ -0,0 +1,2 @@
+"""Libraries shipped with the integration, importable on their own by putting this
+directory on the path"""
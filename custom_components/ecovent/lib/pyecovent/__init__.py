@@ -0,0 +1,30 @@
+"""
+Client for the Wi-Fi ventilation units of Blauberg / TwinFresh (EcoVent protocol)
+
+Only uses the standard library, so it can be imported without Home Assistant
+by putting custom_components/ecovent/lib on the path:
+
+    from pyecovent import EcoVentClient
+"""
+
+from .aio import AsyncEcoVentClient, async_discover
+from .breaker import CircuitBreaker, DeviceUnavailable
+from .cache import ParamCache
+from .client import EcoVentClient
+from .profiles import DEFAULT_PROFILE, PROFILES, UnitProfile
+from .ratelimit import RateLimiter, RateLimitExceeded, TokenBucket
+
+__all__ = [
+    "AsyncEcoVentClient",
+    "CircuitBreaker",
+    "DEFAULT_PROFILE",
+    "DeviceUnavailable",
+    "EcoVentClient",
+    "PROFILES",
+    "ParamCache",
+    "RateLimiter",
+    "RateLimitExceeded",
+    "TokenBucket",
+    "UnitProfile",
+    "async_discover",
+]
@@ -0,0 +1,248 @@
+"""Command line tool for many EcoVent units at once, prints one JSON object per line
+
+    python -m pyecovent discover
+    python -m pyecovent dump 192.168.1.200 192.168.1.201 --params firmware,filter_replacement_status
+    python -m pyecovent dump --discover
+    python -m pyecovent write --hosts-file fans.txt --set boost_time=0f --set humidity_treshold=3c
+    python -m pyecovent write 192.168.1.200 --set reset_alarms
+
+Hosts are given as IP[:PORT], values to write as the hex string sent to the unit.
+Commands like reset_alarms take no value, they are sent last and not answered.
+Results are printed as soon as a unit has answered. Parameters a unit does
+not support are listed in `unsupported`, they do not fail the unit.
+"""
+
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from .aio import AsyncEcoVentClient, async_discover
+from .breaker import CircuitBreaker
+from .client import EcoVentClient
+from .ratelimit import RateLimiter, TokenBucket
+
+
+def _print(result: dict) -> None:
+    sys.stdout.write(json.dumps(result, default=str) + "\n")
+    sys.stdout.flush()
+
+
+def _hosts(args) -> list[tuple[str, int]]:
+    hosts = list(args.hosts)
+    if args.hosts_file:
+        with open(args.hosts_file, encoding="utf-8") as file:
+            hosts += [
+                line.split("#")[0].strip()
+                for line in file
+                if line.split("#")[0].strip()
+            ]
+    result = []
+    for host in hosts:
+        address, _, port = host.partition(":")
+        result.append((address, int(port) if port else args.port))
+    return result
+
+
+def _params(names: str | None) -> list[str]:
+    known = [param[0] for param in EcoVentClient.params.values()]
+    if not names:
+        return known
+    selected = [name.strip() for name in names.split(",") if name.strip()]
+    unknown = [name for name in selected if name not in known]
+    if unknown:
+        raise SystemExit(f"Unknown parameters: {', '.join(unknown)}")
+    return selected
+
+
+def _values(assignments: list[str]) -> dict[str, str]:
+    known = [param[0] for param in EcoVentClient.params.values()]
+    known += [param[0] for param in EcoVentClient.write_only_params.values()]
+    values = {}
+    for assignment in assignments:
+        name, sep, value = assignment.partition("=")
+        if name in EcoVentClient.commands:
+            if value:
+                raise SystemExit(f"Command '{name}' takes no value")
+            values[name] = ""
+            continue
+        if not sep or name not in known:
+            raise SystemExit(f"Invalid assignment '{assignment}', expected NAME=HEX")
+        try:
+            bytes.fromhex(value)
+        except ValueError:
+            raise SystemExit(f"Invalid hex value in '{assignment}'") from None
+        values[name] = value.lower()
+    return values
+
+
+async def _clients(args, shared: TokenBucket) -> list[AsyncEcoVentClient]:
+    """Clients for the given hosts, or for the discovered units."""
+
+    def limiter():
+        return RateLimiter(
+            TokenBucket(args.device_rate, args.device_rate_burst),
+            shared=shared,
+            max_delay=args.timeout * 10,
+        )
+
+    if args.discover:
+        units = [
+            (client.host, client.port, client.id)
+            for client in await async_discover(
+                args.broadcast, args.port, args.password, args.discover_timeout
+            )
+        ]
+    else:
+        units = [(host, port, "DEFAULT_DEVICEID") for host, port in _hosts(args)]
+    return [
+        AsyncEcoVentClient(
+            host,
+            args.password,
+            fan_id,
+            port,
+            rate_limiter=limiter(),
+            # Report every unit, never skip one because of earlier failures
+            breaker=CircuitBreaker(threshold=sys.maxsize),
+            payload_limit=args.payload_limit,
+        )
+        for host, port, fan_id in units
+    ]
+
+
+async def _run(args, clients, job) -> int:
+    """Run job for all clients, at most args.concurrency at a time, returns the number of failures."""
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def run_one(client):
+        async with semaphore:
+            client.timeout = args.timeout
+            start = time.monotonic()
+            result = {"host": client.host, "port": client.port}
+            try:
+                if client.id == "DEFAULT_DEVICEID":
+                    await client.async_search()
+                result["id"] = client.id
+                result.update(await job(client))
+            except Exception as e:  # pylint: disable=broad-except
+                result["ok"] = False
+                result["error"] = f"{type(e).__name__}: {e}"
+            result["elapsed"] = round(time.monotonic() - start, 3)
+            return result
+
+    failures = 0
+    for done in asyncio.as_completed([run_one(client) for client in clients]):
+        result = await done
+        failures += not result.get("ok")
+        _print(result)
+    return failures
+
+
+async def _discover(args) -> int:
+    clients = await async_discover(
+        args.broadcast, args.port, args.password, args.discover_timeout
+    )
+    for client in clients:
+        _print({"host": client.host, "port": client.port, "id": client.id})
+    return 0
+
+
+async def _dump(args) -> int:
+    names = _params(args.params)
+
+    async def dump(client):
+        ok = await client.async_refresh(names, max_age=0)
+        # Answered as not supported by the unit, not a failure
+        unsupported = [name for name in names if not client.supported(name)]
+        values = {
+            name: client._cache.value(name) for name in names if name not in unsupported
+        }
+        return {"ok": ok, "values": values, "unsupported": unsupported}
+
+    shared = TokenBucket(args.rate, args.rate_burst)
+    return await _run(args, await _clients(args, shared), dump)
+
+
+async def _write(args) -> int:
+    values = _values(args.set)
+    if not values:
+        raise SystemExit("Nothing to write, use --set NAME=HEX")
+    commands = [name for name in values if name in EcoVentClient.commands]
+    # The unit echoes the written values, except for write only parameters
+    readable = [
+        name
+        for name in values
+        if any(param[0] == name for param in EcoVentClient.params.values())
+    ]
+    writes = {name: value for name, value in values.items() if name not in commands}
+
+    async def write(client):
+        ok = await client.async_write(writes) if writes else True
+        result = {"ok": ok, "values": {name: client._cache.value(name) for name in readable}}
+        if commands and not ok:
+            # Changing settings failed, e.g. wifi_apply_and_quit must not apply them
+            result["skipped"] = commands
+        elif commands:
+            # Not answered by the unit
+            await client.async_command(commands)
+        return result
+
+    shared = TokenBucket(args.rate, args.rate_burst)
+    return await _run(args, await _clients(args, shared), write)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m pyecovent",
+        description=__doc__.split("\n")[0],
+    )
+    parser.add_argument("--port", type=int, default=4000, help="default port of the units")
+    parser.add_argument("--password", default="1111", help="password of the units")
+    parser.add_argument("--timeout", type=float, default=4, help="seconds to wait for an answer")
+    parser.add_argument("--broadcast", default="255.255.255.255", help="address of the device search")
+    parser.add_argument(
+        "--discover-timeout", type=float, default=2, help="seconds to collect answers to the device search"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("discover", help="search units on the local network")
+
+    for name, help_text in (
+        ("dump", "read parameters of many units"),
+        ("write", "write parameters to many units"),
+    ):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("hosts", nargs="*", metavar="HOST", help="IP[:PORT] of a unit")
+        command.add_argument("--hosts-file", help="file with one IP[:PORT] per line")
+        command.add_argument("--discover", action="store_true", help="use all units that answer the device search")
+        command.add_argument("--concurrency", type=int, default=16, help="units talked to at once")
+        command.add_argument("--rate", type=float, default=20, help="requests per second to all units")
+        command.add_argument("--rate-burst", type=int, default=40)
+        command.add_argument("--device-rate", type=float, default=2, help="requests per second to one unit")
+        command.add_argument("--device-rate-burst", type=int, default=5)
+        command.add_argument("--payload-limit", type=int, default=None, help="bytes of parameters in one frame")
+        if name == "dump":
+            command.add_argument("--params", help="comma separated parameter names, all by default")
+        else:
+            command.add_argument(
+                "--set", action="append", default=[], metavar="NAME=HEX", help="parameter to write or command to send, repeatable"
+            )
+
+    args = parser.parse_args(argv)
+    if args.command != "discover" and not (args.hosts or args.hosts_file or args.discover):
+        parser.error("no units given, pass HOST, --hosts-file or --discover")
+    runner = {"discover": _discover, "dump": _dump, "write": _write}[args.command]
+    try:
+        failures = asyncio.run(runner(args))
+    except KeyboardInterrupt:
+        return 130
+    except BrokenPipeError:
+        # Output closed early, e.g. piped into head
+        return 0
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+"""asyncio API of the EcoVent client"""
+
+from __future__ import annotations
+import asyncio
+import logging
+import time
+
+from .breaker import DeviceUnavailable
+from .client import EcoVentClient
+from .ratelimit import RateLimitExceeded
+
+LOG = logging.getLogger(__name__)
+
+
+class _EcoVentProtocol(asyncio.DatagramProtocol):
+    """Queues the datagrams and errors of one exchange."""
+
+    def __init__(self):
+        self.responses: asyncio.Queue = asyncio.Queue()
+
+    def datagram_received(self, data, addr):
+        self.responses.put_nowait(data)
+
+    def error_received(self, exc):
+        self.responses.put_nowait(exc)
+
+
+class _DiscoveryProtocol(asyncio.DatagramProtocol):
+    """Collects the answers to a broadcast device search."""
+
+    def __init__(self):
+        self.answers: list[tuple[bytes, str, int]] = []
+
+    def datagram_received(self, data, addr):
+        self.answers.append((data, addr[0], addr[1]))
+
+
+class AsyncEcoVentClient(EcoVentClient):
+    """EcoVentClient whose exchanges are coroutines, for use in an event loop.
+
+    Frames, decoding, cache, rate limiter and breaker are those of
+    EcoVentClient, only the I/O differs. Create it with `await
+    AsyncEcoVentClient.create(...)` so that the device search does not block,
+    and use the async_ methods only: the inherited blocking ones would stall
+    the loop.
+    """
+
+    timeout = 4
+
+    def __init__(self, *args, **kwargs):
+        self._async_lock = asyncio.Lock()
+        super().__init__(*args, **kwargs)
+
+    @classmethod
+    async def create(cls, *args, **kwargs) -> AsyncEcoVentClient:
+        client = cls(*args, **kwargs)
+        if client.id == "DEFAULT_DEVICEID":
+            await client.async_search()
+        return client
+
+    def search(self):
+        # Done by create(), __init__ must not block the event loop
+        pass
+
+    async def async_search(self):
+        """Ask the unit at host for its ID, which is used for all further requests."""
+        try:
+            await self.async_get("device_search", max_age=0)
+            if self.device_search is None:
+                raise TimeoutError("No answer to the device search")
+            self._id = self.device_search
+        except Exception as e:
+            LOG.error(
+                f"An error occurred while establishing the ecovent IP '{str(self._host)}' - a device ID is not found."
+            )
+            raise e
+
+    async def async_exchange(self, frames):
+        """Send all frames, then decode the responses, returns True if every frame was answered."""
+        self._breaker.check()
+        answered = 0
+        loop = asyncio.get_running_loop()
+        async with self._async_lock:
+            transport = None
+            start = time.monotonic()
+            try:
+                transport, protocol = await loop.create_datagram_endpoint(
+                    _EcoVentProtocol, remote_addr=(self._host, self._port)
+                )
+                for data in frames:
+                    # Wait for a send slot first, the Wi-Fi module drops packets when spammed
+                    wait = self._rate_limiter.reserve()
+                    if wait > 0:
+                        await asyncio.sleep(wait)
+                    transport.sendto(self.packet(data))
+                for _ in frames:
+                    try:
+                        response = await asyncio.wait_for(
+                            protocol.responses.get(), self.timeout
+                        )
+                    except asyncio.TimeoutError:
+                        break
+                    if isinstance(response, Exception):
+                        raise response
+                    answered += 1
+                    self.parse_response(response)
+            except OSError:
+                self._record_failure()
+                raise
+            finally:
+                if transport is not None:
+                    transport.close()
+                if self.on_exchange is not None:
+                    self.on_exchange(time.monotonic() - start, len(frames), answered)
+        return self.exchanged(answered, len(frames))
+
+    async def async_post(self, frames):
+        """Send frames without waiting for answers, see post."""
+        self._breaker.check(probe=False)
+        loop = asyncio.get_running_loop()
+        async with self._async_lock:
+            transport = None
+            try:
+                transport, _ = await loop.create_datagram_endpoint(
+                    _EcoVentProtocol, remote_addr=(self._host, self._port)
+                )
+                for data in frames:
+                    wait = self._rate_limiter.reserve()
+                    if wait > 0:
+                        await asyncio.sleep(wait)
+                    transport.sendto(self.packet(data))
+            except OSError:
+                self._record_failure()
+                raise
+            finally:
+                if transport is not None:
+                    transport.close()
+
+    async def async_command(self, names):
+        """Send write only parameters without a value, e.g. reset_alarms."""
+        await self.async_post(self.command_frames(names))
+
+    async def async_do_func(self, func, param, value=""):
+        return await self.async_exchange([self.func_frame(func, param, value)])
+
+    async def async_refresh(self, names=None, max_age=None, fresh=()):
+        """Read all stale parameters, returns False if the fan did not answer."""
+        frames = self.read_frames(names, max_age, fresh)
+        if not frames:
+            return True
+        return await self.async_exchange(frames)
+
+    async def async_get(self, name, max_age=None):
+        """Return decoded values, only parameters older than max_age (or their TTL) are read from the fan."""
+        names = [name] if isinstance(name, str) else list(name)
+        await self.async_refresh(names, max_age)
+        if isinstance(name, str):
+            return self._cache.value(name)
+        return {n: self._cache.value(n) for n in names}
+
+    async def async_write(self, values):
+        """Write parameters by name, values are hex strings, see write."""
+        frames = self.write_frames(values)
+        return await self.async_exchange(frames) if frames else False
+
+    async def async_write_changes(self, values, max_age=None):
+        """Write only the values that differ from those of the unit, see write_changes."""
+        comparable = self.comparable(values)
+        max_age = self.write_max_age if max_age is None else max_age
+        if comparable and not await self.async_refresh(comparable, max_age):
+            return False
+        changes = self.changes(values)
+        if not changes:
+            self.skipped_round_trips += 1
+            return True
+        return await self.async_write(changes)
+
+    async def async_read_schedule(self, slots=None):
+        """Read slots of the weekly schedule, all by default, see read_schedule."""
+        frames = self.schedule_read_frames(slots)
+        if not frames:
+            return True
+        return await self.async_exchange(frames)
+
+    async def async_write_schedule(self, slots, max_age=None):
+        """Write the changed slots of the weekly schedule, see write_schedule."""
+        stale = self.stale_schedule(slots, max_age)
+        if stale and not await self.async_read_schedule(stale):
+            return None
+        changed = self.schedule_changes(slots)
+        if changed and not await self.async_exchange(self.schedule_write_frames(changed)):
+            return None
+        return len(changed)
+
+    async def async_update(self, fresh=()):
+        """Poll the fan, returns True if all stale parameters have been read."""
+        if not self._breaker.available:
+            return False
+        try:
+            return await self.async_refresh(fresh=fresh)
+        except RateLimitExceeded as e:
+            LOG.warning(f"Skipping update of ecovent fan '{self._host}': {str(e)}")
+            return False
+
+    async def async_probe(self):
+        """Single cheap read of the state, lets one request through an open breaker."""
+        self._breaker.half_open()
+        try:
+            await self.async_get("state", max_age=0)
+        except (OSError, DeviceUnavailable):
+            # Unanswered, or another request is the probe
+            pass
+        except RateLimitExceeded:
+            # No answer either way, try again after the next backoff
+            self._breaker.record_failure()
+
+
+async def async_discover(
+    broadcast="255.255.255.255", port=4000, password="1111", timeout=2.0
+) -> list[AsyncEcoVentClient]:
+    """Search units with a broadcast, returns a client for every unit that answers."""
+    search = AsyncEcoVentClient(broadcast, password, port=port)
+    packet = search.packet(search.read_frames(["device_search"], max_age=0)[0])
+    loop = asyncio.get_running_loop()
+    transport, protocol = await loop.create_datagram_endpoint(
+        _DiscoveryProtocol, local_addr=("0.0.0.0", 0), allow_broadcast=True
+    )
+    try:
+        transport.sendto(packet, (broadcast, port))
+        await asyncio.sleep(timeout)
+    finally:
+        transport.close()
+    clients = {}
+    for data, host, answer_port in protocol.answers:
+        client = AsyncEcoVentClient(host, password, port=answer_port)
+        try:
+            client.parse_response(data)
+        except (IndexError, KeyError, ValueError) as e:
+            LOG.debug(f"Ignoring invalid answer of '{host}' to the device search: {e}")
+            continue
+        if client.device_search is not None:
+            client.id = client.device_search
+            clients[host] = client
+    return list(clients.values())
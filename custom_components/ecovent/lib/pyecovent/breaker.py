@@ -0,0 +1,89 @@
+"""Circuit breaker that stops talking to EcoVent fans which do not answer"""
+
+from __future__ import annotations
+import threading
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class DeviceUnavailable(Exception):
+    """Raised instead of sending a request while the breaker of a fan is open."""
+
+
+class CircuitBreaker:
+    """Opens after `threshold` consecutive failed exchanges.
+
+    While open every request fails fast. A single probe request may be let
+    through with `half_open()`; its result either closes the breaker again or
+    re-opens it with a doubled probe delay, up to `max_backoff` seconds.
+    Until then every other request fails fast as well.
+    """
+
+    def __init__(self, threshold: int = 3, backoff: float = 10, max_backoff: float = 600):
+        self.threshold = threshold
+        self.min_backoff = backoff
+        self.max_backoff = max_backoff
+        self.backoff = backoff
+        self.failures = 0
+        self.state = CLOSED
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return self.state == CLOSED
+
+    def check(self, probe: bool = True) -> None:
+        """Raise DeviceUnavailable unless a request may be sent now.
+
+        While half open the first request becomes the probe. Requests that
+        are not answered cannot be a probe, pass probe=False for them.
+        """
+        if self.state == CLOSED:
+            return
+        with self._lock:
+            if self.state == HALF_OPEN:
+                if probe and not self._probing:
+                    self._probing = True
+                    return
+                raise DeviceUnavailable("Device is being probed")
+            if self.state == OPEN:
+                raise DeviceUnavailable(
+                    f"Device did not answer {self.failures} times, next probe in {self.backoff}s"
+                )
+
+    def half_open(self) -> None:
+        """Let the next request through as the probe.
+
+        Also re-arms a probe whose result was never recorded, e.g. because
+        the rate limiter dropped it before it was sent.
+        """
+        with self._lock:
+            if self.state != CLOSED:
+                self.state = HALF_OPEN
+                self._probing = False
+
+    def record_success(self) -> bool:
+        """Reset the breaker. Returns True if it was not closed before."""
+        with self._lock:
+            recovered = self.state != CLOSED
+            self.failures = 0
+            self.backoff = self.min_backoff
+            self.state = CLOSED
+            self._probing = False
+            return recovered
+
+    def record_failure(self) -> bool:
+        """Count a failed exchange. Returns True if the breaker has just opened."""
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == HALF_OPEN:
+                self.backoff = min(self.backoff * 2, self.max_backoff)
+                self.state = OPEN
+            elif self.state == CLOSED and self.failures >= self.threshold:
+                self.state = OPEN
+                return True
+            return False
@@ -0,0 +1,45 @@
+"""Cache of decoded EcoVent parameter values with a time to live per parameter"""
+
+from __future__ import annotations
+import math
+import time
+from typing import Any, Iterable
+
+
+class ParamCache:
+    """Last decoded value of every parameter and when it was received.
+
+    Entries are written whenever the fan answers, both for reads and for the
+    echo of `write_return`, so a write refreshes the cache as well.
+    """
+
+    def __init__(
+        self, ttls: dict[str, float], default_ttl: float, clock=time.monotonic
+    ):
+        self.ttls = ttls
+        self.default_ttl = default_ttl
+        self._clock = clock
+        self._entries: dict[str, tuple[Any, float]] = {}
+
+    def store(self, name: str, value: Any) -> None:
+        self._entries[name] = (value, self._clock())
+
+    def value(self, name: str) -> Any:
+        entry = self._entries.get(name)
+        return entry[0] if entry is not None else None
+
+    def age(self, name: str) -> float:
+        """Seconds since the value was received, infinite if it never was."""
+        entry = self._entries.get(name)
+        return self._clock() - entry[1] if entry is not None else math.inf
+
+    def stale(self, names: Iterable[str], max_age: float | None = None) -> list[str]:
+        """Names older than `max_age`, or than their own TTL if it is None."""
+        now = self._clock()
+        result = []
+        for name in names:
+            limit = max_age if max_age is not None else self.ttls.get(name, self.default_ttl)
+            entry = self._entries.get(name)
+            if entry is None or now - entry[1] >= limit:
+                result.append(name)
+        return result
@@ -0,0 +1,1443 @@
+"""Library to handle communication with Wifi ecofan from TwinFresh / Blauberg"""
+
+from __future__ import annotations
+import logging
+import socket
+import sys
+import threading
+import time
+
+from .breaker import CircuitBreaker, DeviceUnavailable
+from .cache import ParamCache
+from .profiles import DEFAULT_PROFILE, PROFILES, UnitProfile
+from .ratelimit import RateLimiter, RateLimitExceeded, TokenBucket
+
+LOG = logging.getLogger(__name__)
+
+
+class EcoVentClient:
+    """Class to communicate with the ecofan"""
+
+    HEADER = f"FDFD"
+    BUFFER_SIZE = 4096
+    # Seconds an exchange waits for the other parties of its barrier
+    SYNC_TIMEOUT = 2
+
+    func = {
+        "read": "01",
+        "write": "02",
+        "write_return": "03",
+        "inc": "04",
+        "dec": "05",
+        "resp": "06",
+    }
+    states = {0: "off", 1: "on", 2: "togle"}
+
+    speeds = {
+        0: "standby",
+        1: "low",
+        2: "medium",
+        3: "high",
+        0xFF: "manual",
+    }
+
+    timer_modes = {0: "off", 1: "night", 2: "party"}
+
+    statuses = {0: "off", 1: "on"}
+
+    airflows = {0: "ventilation", 1: "heat_recovery", 2: "air_supply"}
+
+    alarms = {0: "no", 1: "alarm", 2: "warning"}
+
+    days_of_week = {
+        0: "all days",
+        1: "Monday",
+        2: "Tuesday",
+        3: "Wednesday",
+        4: "Thursday",
+        5: "Friday",
+        6: "Saturday",
+        7: "Sunday",
+        8: "Mon-Fri",
+        9: "Sat-Sun",
+    }
+
+    filters = {0: "filter replacement not required", 1: "replace filter"}
+
+    # Periods of every day group of the weekly schedule
+    schedule_periods = (1, 2, 3, 4)
+    # Bytes of one slot of the weekly schedule: day, period, speed, reserved,
+    # minutes and hours of the end of the period
+    schedule_slot_size = 6
+
+    unit_types = {
+        0x0300: "Vento Expert A50-1/A85-1/A100-1 W V.2",
+        0x0400: "Vento Expert Duo A30-1 W V.2",
+        0x0500: "Vento Expert A30 W V.2",
+        0x9999: "Unknown Type"
+    }
+
+    wifi_operation_modes = {1: "client", 2: "ap"}
+
+    wifi_enc_types = {48: "Open", 50: "wpa-psk", 51: "wpa2_psk", 52: "wpa_wpa2_psk"}
+
+    wifi_dhcps = {0: "STATIC", 1: "DHCP", 2: "Invert"}
+
+    params = {
+        0x0001: ["state", states],
+        0x0002: ["speed", speeds],
+        0x0006: ["boost_status", statuses],
+        0x0007: ["timer_mode", timer_modes],
+        0x000B: ["timer_counter", None],
+        0x000F: ["humidity_sensor_state", states],
+        0x0014: ["relay_sensor_state", states],
+        0x0016: ["analogV_sensor_state", states],
+        0x0019: ["humidity_treshold", None],
+        0x0024: ["battery_voltage", None],
+        0x0025: ["humidity", None],
+        0x002D: ["analogV", None],
+        0x0032: ["relay_status", statuses],
+        0x0044: ["man_speed", None],
+        0x004A: ["fan1_speed", None],
+        0x004B: ["fan2_speed", None],
+        0x0064: ["filter_timer_countdown", None],
+        0x0066: ["boost_time", None],
+        0x006F: ["rtc_time", None],
+        0x0070: ["rtc_date", None],
+        0x0072: ["weekly_schedule_state", states],
+        0x0077: ["weekly_schedule_setup", None],
+        0x007C: ["device_search", None],
+        0x007D: ["device_password", None],
+        0x007E: ["machine_hours", None],
+        0x0083: ["alarm_status", alarms],
+        0x0085: ["cloud_server_state", states],
+        0x0086: ["firmware", None],
+        0x0088: ["filter_replacement_status", statuses],
+        0x0094: ["wifi_operation_mode", wifi_operation_modes],
+        0x0095: ["wifi_name", None],
+        0x0096: ["wifi_pasword", None],
+        0x0099: ["wifi_enc_type", wifi_enc_types],
+        0x009A: ["wifi_freq_chnnel", None],
+        0x009B: ["wifi_dhcp", wifi_dhcps],
+        0x009C: ["wifi_assigned_ip", None],
+        0x009D: ["wifi_assigned_netmask", None],
+        0x009E: ["wifi_main_gateway", None],
+        0x00A3: ["curent_wifi_ip", None],
+        0x00B7: ["airflow", airflows],
+        0x00B8: ["analogV_treshold", None],
+        0x00B9: ["unit_type", unit_types],
+        0x0302: ["night_mode_timer", None],
+        0x0303: ["party_mode_timer", None],
+        0x0304: ["humidity_status", statuses],
+        0x0305: ["analogV_status", statuses],
+    }
+
+    # Seconds a decoded value stays fresh, values missing here use default_ttl
+    default_ttl = 10
+    ttls = {
+        "battery_voltage": 300,
+        "filter_timer_countdown": 300,
+        "machine_hours": 300,
+        "rtc_time": 300,
+        "rtc_date": 300,
+        "weekly_schedule_setup": 300,
+        "device_search": 6 * 3600,
+        "device_password": 6 * 3600,
+        "cloud_server_state": 6 * 3600,
+        "firmware": 6 * 3600,
+        "unit_type": 6 * 3600,
+        "wifi_operation_mode": 6 * 3600,
+        "wifi_name": 6 * 3600,
+        "wifi_pasword": 6 * 3600,
+        "wifi_enc_type": 6 * 3600,
+        "wifi_freq_chnnel": 6 * 3600,
+        "wifi_dhcp": 6 * 3600,
+        "wifi_assigned_ip": 6 * 3600,
+        "wifi_assigned_netmask": 6 * 3600,
+        "wifi_main_gateway": 6 * 3600,
+        "curent_wifi_ip": 6 * 3600,
+    }
+
+    # Size in bytes of the values longer than one byte, used to keep responses
+    # within the payload limit
+    value_sizes = {
+        "timer_counter": 3,
+        "battery_voltage": 2,
+        "fan1_speed": 2,
+        "fan2_speed": 2,
+        "filter_timer_countdown": 3,
+        "rtc_time": 3,
+        "rtc_date": 4,
+        "weekly_schedule_setup": 6,
+        "device_search": 16,
+        "device_password": 8,
+        "machine_hours": 4,
+        "firmware": 6,
+        "wifi_name": 32,
+        "wifi_pasword": 32,
+        "wifi_assigned_ip": 4,
+        "wifi_assigned_netmask": 4,
+        "wifi_main_gateway": 4,
+        "curent_wifi_ip": 4,
+        "unit_type": 2,
+        "night_mode_timer": 2,
+        "party_mode_timer": 2,
+    }
+
+    # Read frames kept for the sets of stale parameters polls ask for
+    FRAMES_CACHE_SIZE = 64
+    # Seconds a cached value may be old to tell that a write would not
+    # change it, older ones are read again first
+    write_max_age = 5
+
+    write_only_params = {
+        0x0065: ["filter_timer_reset", None],
+        0x0077: ["weekly_schedule_setup", None],
+        0x0080: ["reset_alarms", None],
+        0x0087: ["factory_reset", None],
+        0x00A0: ["wifi_apply_and_quit", None],
+        0x00A2: ["wifi_discard_and_quit", None],
+    }
+
+    # Write only parameters sent without a value, the unit does not answer them
+    commands = frozenset(
+        param[0] for number, param in write_only_params.items() if number != 0x0077
+    )
+
+    # Parameter numbers by name, write only ones included
+    numbers = {param[0]: number for number, param in write_only_params.items()}
+    numbers.update((param[0], number) for number, param in params.items())
+    # Encoded read of every parameter and the bytes its answer takes, filled
+    # on first use
+    _read_items: dict[str, tuple[str, int]] = {}
+
+    def __init__(
+        self,
+        host,
+        password="1111",
+        fan_id="DEFAULT_DEVICEID",
+        port=4000,
+        rate_limiter: RateLimiter | None = None,
+        breaker: CircuitBreaker | None = None,
+        payload_limit: int | None = None,
+    ):
+        self._host = host
+        self._port = port
+        self._type = "02"
+        self._id = fan_id
+        self._pwd_size = 0
+        self._password = password
+        self._rate_limiter = rate_limiter or RateLimiter(TokenBucket(2, 5))
+        self._breaker = breaker or CircuitBreaker()
+        self._cache = ParamCache(self.ttls, self.default_ttl)
+        self._payload_limit = payload_limit
+        self.unit_type_code = None
+        # Parameter numbers the unit answered as not supported
+        self.unsupported: set[int] = set()
+        # Writes not sent because the unit would reject them
+        self.skipped_writes = 0
+        # Writes not sent because the unit already had their values
+        self.skipped_round_trips = 0
+        self._frames: dict[tuple, list[str]] = {}
+        self.socket = None
+        # Datagrams are received into this buffer and decoded in place, one
+        # exchange at a time
+        self._buffer = bytearray(self.BUFFER_SIZE)
+        self._view = memoryview(self._buffer)
+        self._lock = threading.Lock()
+        # Called from the I/O thread when the breaker opens
+        self.on_unavailable = None
+        # Called from the I/O thread after every exchange with its seconds,
+        # sent and answered frames
+        self.on_exchange = None
+
+        # Decoded values are unknown until the first poll
+        for name, _ in self.params.values():
+            setattr(self, "_" + name, None)
+        # Integer value of every parameter of up to 4 bytes, little endian
+        self.values: dict[str, int] = {}
+        # Speed, end hour and end minute of every read slot of the weekly
+        # schedule, by day group and period
+        self.schedule: dict[tuple[int, int], tuple[int, int, int]] = {}
+        # Raw value of every parameter number the unit answered, None if it
+        # does not support it. Only kept once set to a dict, e.g. by a gateway
+        self.raw: dict[int, bytes | None] | None = None
+
+        if fan_id == "DEFAULT_DEVICEID":
+            self.search()
+
+    def search(self):
+        """Ask the unit at host for its ID, which is used for all further requests."""
+        try:
+            self.get_param("device_search")
+            if self.device_search is None:
+                raise TimeoutError("No answer to the device search")
+            self._id = self.device_search
+        except Exception as e:
+            LOG.error(
+                f"An error occurred while establishing the ecovent IP '{str(self._host)}' - a device ID is not found. Try restarting HA or check your configuration."
+            )
+            raise e
+
+    @property
+    def rate_limiter(self) -> RateLimiter:
+        return self._rate_limiter
+
+    @property
+    def breaker(self) -> CircuitBreaker:
+        return self._breaker
+
+    @property
+    def available(self) -> bool:
+        return self._breaker.available
+
+    @property
+    def profile(self) -> UnitProfile:
+        """Profile of the unit type, the default one until it has been read."""
+        return PROFILES.get(self.unit_type_code, DEFAULT_PROFILE)
+
+    @property
+    def payload_limit(self) -> int:
+        """Bytes of parameters sent or expected back in one frame."""
+        if self._payload_limit is not None:
+            return self._payload_limit
+        return self.profile.payload_limit
+
+    def connect(self):
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.settimeout(4)
+        self.socket.connect((self._host, self._port))
+        return self.socket
+
+    def str2hex(self, str_msg):
+        return "".join("{:02x}".format(ord(c)) for c in str_msg)
+
+    def hex2str(self, hex_msg):
+        return "".join(
+            chr(int("0x" + hex_msg[i : (i + 2)], 16)) for i in range(0, len(hex_msg), 2)
+        )
+
+    def hexstr2tuple(self, hex_msg):
+        return [int(hex_msg[i : (i + 2)], 16) for i in range(0, len(hex_msg), 2)]
+
+    def chksum(self, hex_msg):
+        checksum = hex(sum(self.hexstr2tuple(hex_msg))).replace("0x", "").zfill(4)
+        byte_array = bytearray.fromhex(checksum)
+        chksum = hex(byte_array[1]).replace("0x", "").zfill(2) + hex(
+            byte_array[0]
+        ).replace("0x", "").zfill(2)
+        return f"{chksum}"
+
+    def get_size(self, str):
+        return hex(len(str)).replace("0x", "").zfill(2)
+
+    def get_header(self):
+        id_size = self.get_size(self._id)
+        pwd_size = self.get_size(self._password)
+        id = self.str2hex(self._id)
+        password = self.str2hex(self._password)
+        str = f"{self._type}{id_size}{id}{pwd_size}{password}"
+        return str
+
+    def get_params_index(self, value):
+        number = self.numbers.get(value)
+        return number if number in self.params else None
+
+    def get_write_only_params_index(self, value):
+        number = self.numbers.get(value)
+        return number if number in self.write_only_params else None
+
+    def supported(self, name):
+        """False for parameters the profile or the unit itself reports as not supported."""
+        number = self.numbers.get(name)
+        return number not in self.unsupported and number not in self.profile.unsupported
+
+    def writable(self, name, value):
+        """False, with a warning, for writes the unit would reject.
+
+        These are writes of unsupported parameters, values outside of the
+        range of the profile and values missing from the value map of the
+        parameter.
+        """
+        raw = bytes.fromhex(value)
+        number = self.numbers.get(name)
+        if not self.supported(name):
+            reason = "not supported"
+        elif 0 < len(raw) <= 4:
+            integer = int.from_bytes(raw, "little")
+            value_map = self.params.get(number, [None, None])[1]
+            if not self.profile.valid(name, integer) or (
+                value_map is not None and integer not in value_map
+            ):
+                reason = f"{integer} is out of range"
+            else:
+                return True
+        else:
+            return True
+        self.skipped_writes += 1
+        LOG.warning(
+            f"Not writing '{name}' to ecovent fan '{self._host}' ({self.profile.name}): {reason}"
+        )
+        return False
+
+    @classmethod
+    def param_name(cls, key):
+        """Name of a parameter given by name or number, e.g. "boost_time", 0x66 or "0x0066".
+
+        Write only parameters are included, raises ValueError for unknown ones.
+        """
+        names = {param[0] for param in cls.params.values()}
+        names |= {param[0] for param in cls.write_only_params.values()}
+        if isinstance(key, str) and key in names:
+            return key
+        try:
+            number = key if isinstance(key, int) else int(key, 16)
+        except ValueError:
+            number = None
+        param = cls.params.get(number) or cls.write_only_params.get(number)
+        if param is None:
+            raise ValueError(f"Unknown ecovent parameter '{key}'")
+        return param[0]
+
+    def get_params_values(self, idx, value):
+        index = self.get_params_index(idx)
+        if index != None:
+            if self.params[index][1] != None:
+                for i in self.params[index][1]:
+                    if self.params[index][1][i] == value:
+                        return [index, i]
+            return [index, None]
+        else:
+            return [None, None]
+
+    def packet(self, data):
+        """Complete datagram for data, the function followed by its parameters."""
+        payload = self.get_header() + data
+        return bytes.fromhex(self.HEADER + payload + self.chksum(payload))
+
+    def send(self, data):
+        # Wait for a send slot first, the Wi-Fi module drops packets when spammed
+        self._rate_limiter.acquire()
+        return self.socket.sendall(self.packet(data))
+
+    def receive(self):
+        """Receive one datagram into the buffer of the client, returns a view of it."""
+        try:
+            size = self.socket.recv_into(self._buffer)
+            return self._view[:size]
+        except socket.timeout:
+            return None
+
+    def encode(self, param, value=""):
+        """Encode one parameter number, given as 4 hex digits, with its value."""
+        if param == "0077" and value == "":
+            value = "0101"
+        out = ""
+        if param[:2] != "00":
+            out = "ff" + param[:2]
+        val_bytes = int(len(value) / 2)
+        if val_bytes > 1:
+            out += "fe" + hex(val_bytes).replace("0x", "").zfill(2) + param[2:4]
+        else:
+            out += param[2:4]
+        return out + value
+
+    def frames(self, func, items):
+        """Split encoded parameters into frames within the payload limit.
+
+        items are pairs of an encoded parameter and the bytes its answer takes.
+        """
+        frames = []
+        data = ""
+        size = 1
+        for encoded, response_size in items:
+            if data and size + response_size > self.payload_limit:
+                frames.append(func + data)
+                data = ""
+                size = 1
+            data += encoded
+            size += response_size
+        if data:
+            frames.append(func + data)
+        return frames
+
+    def do_func(self, func, param, value=""):
+        return self.exchange([self.func_frame(func, param, value)])
+
+    def func_frame(self, func, param, value=""):
+        """Frame of func for parameter numbers given as 4 hex digits each, all with value."""
+        return func + "".join(
+            self.encode(param[i : (i + 4)], value) for i in range(0, len(param), 4)
+        )
+
+    def exchange(self, frames, barrier=None):
+        """Send all frames, then decode the responses, returns True if every frame was answered.
+
+        With a threading.Barrier the frames are sent once every party is
+        connected and may send, to change several units at the same time. A broken or
+        timed out barrier does not stop the exchange.
+        """
+        self._breaker.check()
+        answered = 0
+        # A response is only valid until the next one reuses the buffer
+        with self._lock:
+            start = time.monotonic()
+            try:
+                self.socket = self.connect()
+                if barrier is None:
+                    for data in frames:
+                        self.send(data)
+                else:
+                    # Wait for the send slots of all frames before the barrier,
+                    # waiting after it would delay this unit against the others
+                    time.sleep(max((self._rate_limiter.reserve() for _ in frames), default=0))
+                    try:
+                        barrier.wait(self.SYNC_TIMEOUT)
+                    except threading.BrokenBarrierError:
+                        pass
+                    for data in frames:
+                        self.socket.sendall(self.packet(data))
+                for _ in frames:
+                    response = self.receive()
+                    if not response:
+                        break
+                    answered += 1
+                    self.parse_response(response)
+            except OSError:
+                self._record_failure()
+                raise
+            finally:
+                if self.socket is not None:
+                    self.socket.close()
+                if self.on_exchange is not None:
+                    self.on_exchange(time.monotonic() - start, len(frames), answered)
+        return self.exchanged(answered, len(frames))
+
+    def post(self, frames):
+        """Send frames without waiting for answers, for plain writes the unit does not answer."""
+        self._breaker.check(probe=False)
+        with self._lock:
+            try:
+                self.socket = self.connect()
+                for data in frames:
+                    self.send(data)
+            except OSError:
+                self._record_failure()
+                raise
+            finally:
+                if self.socket is not None:
+                    self.socket.close()
+
+    def exchanged(self, answered, sent):
+        """Record the outcome of an exchange, returns True if every frame was answered."""
+        if answered:
+            if self._breaker.record_success():
+                LOG.info(f"EcoVent fan '{self._host}' is available again")
+            if answered < sent:
+                LOG.debug(
+                    f"EcoVent fan '{self._host}' answered {answered} of {sent} frames"
+                )
+        else:
+            self._record_failure()
+        return answered == sent
+
+    def _record_failure(self):
+        if self._breaker.record_failure():
+            LOG.warning(
+                f"EcoVent fan '{self._host}' did not answer {self._breaker.failures} times, marking it unavailable"
+            )
+            if self.on_unavailable is not None:
+                self.on_unavailable()
+
+    def probe(self):
+        """Single cheap read of the state, lets one request through an open breaker."""
+        self._breaker.half_open()
+        try:
+            self.get_param("state")
+        except (OSError, DeviceUnavailable):
+            # Unanswered, or another request is the probe
+            pass
+        except RateLimitExceeded:
+            # No answer either way, try again after the next backoff
+            self._breaker.record_failure()
+
+    def update(self, fresh=()):
+        """Poll the fan, returns True if all stale parameters have been read."""
+        if not self._breaker.available:
+            # Offline fans are probed in the background instead of polled
+            return False
+        try:
+            return self.refresh(fresh=fresh)
+        except RateLimitExceeded as e:
+            LOG.warning(f"Skipping update of ecovent fan '{self._host}': {str(e)}")
+            return False
+
+    def set_param(self, param, value):
+        valpar = self.get_params_values(param, value)
+        if valpar[0] != None:
+            if valpar[1] != None:
+                value = hex(valpar[1]).replace("0x", "").zfill(2)
+            # Checked against the profile of the unit, skipped if unchanged
+            self.write_changes({param: value})
+
+    def get_param(self, param):
+        if self.get_params_index(param) != None:
+            self.get(param, max_age=0)
+
+    def refresh(self, names=None, max_age=None, fresh=()):
+        """Read all stale parameters in one frame, returns False if the fan did not answer.
+
+        Parameters in `fresh` are read regardless of their age.
+        """
+        frames = self.read_frames(names, max_age, fresh)
+        if not frames:
+            return True
+        return self.exchange(frames)
+
+    def read_frames(self, names=None, max_age=None, fresh=()):
+        """Read frames for the stale supported parameters in names and all of fresh.
+
+        Frames are kept for every set of parameters, polls mostly ask for the
+        same few sets.
+        """
+        if names is None:
+            names = [param[0] for param in self.params.values()]
+        stale = self._cache.stale(names, max_age)
+        stale += [name for name in fresh if name not in stale]
+        key = (tuple(name for name in stale if self.supported(name)), self.payload_limit)
+        frames = self._frames.get(key)
+        if frames is None:
+            if len(self._frames) >= self.FRAMES_CACHE_SIZE:
+                self._frames.clear()
+            frames = self._frames[key] = self.frames(
+                self.func["read"], [self.read_item(name) for name in key[0]]
+            )
+        return list(frames)
+
+    def read_item(self, name):
+        """Encoded read of a parameter and the bytes its answer takes."""
+        item = self._read_items.get(name)
+        if item is None:
+            encoded = self.encode(f"{self.numbers[name]:04x}")
+            size = self.value_sizes.get(name, 1)
+            # the answer adds the value and, for long values, its size
+            item = (encoded, len(encoded) // 2 + size + (2 if size > 1 else 0))
+            self._read_items[name] = item
+        return item
+
+    def write(self, values):
+        """Write parameters by name, values are hex strings, in as few frames as the payload limit allows.
+
+        Returns False if the fan did not answer or nothing could be written.
+        """
+        frames = self.write_frames(values)
+        return self.exchange(frames) if frames else False
+
+    def write_frames(self, values):
+        """Write frames for values, a dict of hex strings by parameter name, without those the unit would reject."""
+        items = []
+        for name, value in values.items():
+            index = self.numbers.get(name)
+            if index is None:
+                raise ValueError(f"Unknown ecovent parameter '{name}'")
+            if not self.writable(name, value):
+                continue
+            encoded = self.encode(hex(index).replace("0x", "").zfill(4), value)
+            # the unit answers with the written values
+            items.append((encoded, len(encoded) // 2))
+        return self.frames(self.func["write_return"], items)
+
+    def write_changes(self, values, max_age=None):
+        """Write only the values that differ from those of the unit.
+
+        Cached values older than max_age, write_max_age by default, are read
+        again first in one frame, so a stale value neither swallows a write
+        nor causes one. Returns True if nothing had to be written or the fan
+        answered the write, False if it did not answer the read.
+        """
+        comparable = self.comparable(values)
+        max_age = self.write_max_age if max_age is None else max_age
+        if comparable and not self.refresh(comparable, max_age):
+            # A write would not be answered either
+            return False
+        changes = self.changes(values)
+        if not changes:
+            self.skipped_round_trips += 1
+            return True
+        return self.write(changes)
+
+    def comparable(self, values):
+        """Names of values whose effect can be told from the cached value.
+
+        These are readable parameters of up to 4 bytes, except for toggling
+        the state.
+        """
+        return [
+            name
+            for name, value in values.items()
+            if self.get_params_index(name) is not None
+            and self.supported(name)
+            and 0 < len(value) <= 8
+            and not (name == "state" and value == "02")
+        ]
+
+    def changes(self, values):
+        """Values that differ from the cached ones, including all that cannot be compared."""
+        comparable = self.comparable(values)
+        return {
+            name: value
+            for name, value in values.items()
+            if name not in comparable
+            or self.values.get(name) != int.from_bytes(bytes.fromhex(value), "little")
+        }
+
+    def command(self, names):
+        """Send write only parameters without a value, e.g. reset_alarms."""
+        self.post(self.command_frames(names))
+
+    def command_frames(self, names):
+        """Plain write frames for write only parameters, the unit does not answer them."""
+        items = []
+        for name in names:
+            index = self.get_write_only_params_index(name)
+            if index is None:
+                raise ValueError(f"Unknown ecovent command '{name}'")
+            if not self.writable(name, ""):
+                continue
+            encoded = self.encode(hex(index).replace("0x", "").zfill(4))
+            items.append((encoded, len(encoded) // 2))
+        return self.frames(self.func["write"], items)
+
+    def read_schedule(self, slots=None):
+        """Read slots of the weekly schedule, all by default, in as few frames as possible.
+
+        Returns True if every frame was answered, the slots are in `schedule`.
+        """
+        frames = self.schedule_read_frames(slots)
+        if not frames:
+            return True
+        return self.exchange(frames)
+
+    def schedule_read_frames(self, slots=None):
+        """Read frames for (day, period) slots of the weekly schedule, all by default."""
+        if slots is None:
+            slots = [
+                (day, period)
+                for day in self.days_of_week
+                for period in self.schedule_periods
+            ]
+        items = []
+        for day, period in slots:
+            encoded = self.encode("0077", f"{day:02x}{period:02x}")
+            # the answer holds the whole slot instead of the selector
+            items.append((encoded, len(encoded) // 2 + self.schedule_slot_size - 2))
+        return self.frames(self.func["read"], items)
+
+    def write_schedule(self, slots, max_age=None):
+        """Write slots of the weekly schedule, only those that differ from the unit.
+
+        slots maps (day, period) to (speed, end hour, end minute). Slots that
+        are unknown or older than max_age, write_max_age by default, are read
+        again first in one batched read. Returns the number of written slots,
+        or None if the unit did not answer.
+        """
+        stale = self.stale_schedule(slots, max_age)
+        if stale and not self.read_schedule(stale):
+            return None
+        changed = self.schedule_changes(slots)
+        if changed and not self.exchange(self.schedule_write_frames(changed)):
+            return None
+        return len(changed)
+
+    def stale_schedule(self, slots, max_age=None):
+        """Slots not read or written within max_age seconds, write_max_age by default."""
+        max_age = self.write_max_age if max_age is None else max_age
+        keys = {self._schedule_key(*slot): slot for slot in slots}
+        return [keys[key] for key in self._cache.stale(keys, max_age)]
+
+    @staticmethod
+    def _schedule_key(day, period):
+        # Cache entry of one slot, the parameter itself holds the last slot decoded
+        return f"weekly_schedule_setup/{day}/{period}"
+
+    def schedule_changes(self, slots):
+        """Slots whose value differs from the last one read or written."""
+        return {
+            slot: value for slot, value in slots.items() if self.schedule.get(slot) != value
+        }
+
+    def schedule_write_frames(self, slots):
+        """Write frames for slots of the weekly schedule, see write_schedule."""
+        items = []
+        for (day, period), (speed, hours, minutes) in slots.items():
+            encoded = self.encode(
+                "0077", f"{day:02x}{period:02x}{speed:02x}00{minutes:02x}{hours:02x}"
+            )
+            # the unit answers with the written slot
+            items.append((encoded, len(encoded) // 2))
+        return self.frames(self.func["write_return"], items)
+
+    def get(self, name, max_age=None):
+        """Return decoded values, only parameters older than max_age (or their TTL) are read from the fan."""
+        names = [name] if isinstance(name, str) else list(name)
+        self.refresh(names, max_age)
+        if isinstance(name, str):
+            return self._cache.value(name)
+        return {n: self._cache.value(n) for n in names}
+
+    # def set_state_on(self):
+    def turn_on_ventilation(self):
+        self.write_changes({"state": "01"})
+
+    # def set_state_off(self):
+    def turn_off_ventilation(self):
+        self.write_changes({"state": "00"})
+
+    def set_speed(self, speed: int):
+        if speed in self.profile.speed_percentages:
+            self.write_changes({"speed": f"{speed:02x}"})
+
+    def set_man_speed_percent(self, speed: int, turn_on: bool = False):
+        if speed >= 2 and speed <= 100:
+            self.set_man_speed(self.profile.man_speed(speed), turn_on)
+
+    def set_man_speed(self, speed, turn_on: bool = False):
+        """Run at a raw manual speed, in one frame together with the switch to manual and optionally turning on."""
+        if self.profile.valid("man_speed", speed):
+            values = {"man_speed": f"{speed:02x}", "speed": "ff"}
+            if turn_on:
+                values["state"] = "01"
+            self.write_changes(values)
+
+    def set_airflow(self, val):
+        if val >= 0 and val <= 2:
+            self.write_changes({"airflow": f"{val:02x}"})
+
+    @classmethod
+    def parse_request(cls, data):
+        """Split a datagram sent to a unit into device ID, password, function and parameters.
+
+        Parameters are pairs of the parameter number and its value, empty for
+        reads without one. Returns None if data is not a valid frame.
+        """
+        view = memoryview(data)
+        if len(view) < 8 or view[:2] != bytes.fromhex(cls.HEADER):
+            return None
+        if int.from_bytes(view[-2:], "little") != sum(view[2:-2]) & 0xFFFF:
+            return None
+        try:
+            # header, type, then size and value of the id and of the password
+            pointer = 4 + view[3]
+            device_id = str(view[4:pointer], "latin-1")
+            password = str(view[pointer + 1 : pointer + 1 + view[pointer]], "latin-1")
+            pointer += 1 + view[pointer]
+            function = view[pointer]
+        except IndexError:
+            return None
+        pointer += 1
+        length = len(view) - 2
+        # only reads may omit the value, e.g. every read but a schedule slot
+        default_size = 0 if function == int(cls.func["read"], 16) else 1
+        params = []
+        high_byte_value = 0
+        value_size = default_size
+        while pointer < length:
+            p = view[pointer]
+            pointer += 1
+            if p == 0xFF:
+                high_byte_value = view[pointer]
+                pointer += 1
+            elif p == 0xFE:
+                value_size = view[pointer]
+                pointer += 1
+            else:
+                params.append(
+                    (high_byte_value << 8 | p, bytes(view[pointer : pointer + value_size]))
+                )
+                pointer += value_size
+                high_byte_value = 0
+                value_size = default_size
+        if pointer != length:
+            return None
+        return device_id, password, function, params
+
+    def request_frame(self, function, params):
+        """Frame of a function given as number for (number, value) pairs as returned by parse_request."""
+        return f"{function:02x}" + "".join(
+            self.encode(f"{number:04x}", value.hex()) for number, value in params
+        )
+
+    def response_packet(self, params):
+        """Datagram the unit would answer with for (number, value) pairs, None for unsupported ones."""
+        data = self.func["resp"]
+        for number, value in params:
+            if value is None:
+                data += (f"ff{number >> 8:02x}" if number > 0xFF else "") + f"fd{number & 0xFF:02x}"
+            else:
+                data += self.encode(f"{number:04x}", value.hex())
+        return self.packet(data)
+
+    def parse_response(self, data):
+        """Decode the parameters of a response, values are passed to the setters as views of data."""
+        view = memoryview(data)
+        # header, type, then size and value of the id and of the password
+        pointer = 4 + view[3]
+        pointer += 1 + view[pointer]
+        function = view[pointer]
+        pointer += 1
+        # from here parsing of parameters begin, the checksum ends the frame
+        length = len(view) - 2
+        high_byte_value = 0
+        value_size = 1
+        while pointer < length:
+            p = view[pointer]
+            pointer += 1
+            if p == 0xFF:
+                high_byte_value = view[pointer]
+                pointer += 1
+            elif p == 0xFE:
+                value_size = view[pointer]
+                pointer += 1
+            elif p == 0xFD:
+                # parameter not supported by the unit, no value follows
+                number = high_byte_value << 8 | view[pointer]
+                self.unsupported.add(number)
+                if self.raw is not None:
+                    self.raw[number] = None
+                pointer += 1
+                high_byte_value = 0
+                value_size = 1
+            else:
+                value = view[pointer : pointer + value_size]
+                pointer += value_size
+                number = high_byte_value << 8 | p
+                if self.raw is not None:
+                    self.raw[number] = bytes(value)
+                param = self.params.get(number)
+                high_byte_value = 0
+                value_size = 1
+                if param is None:
+                    continue
+                name = param[0]
+                setattr(self, name, value)
+                if len(value) <= 4:
+                    self.values[name] = int.from_bytes(value, "little")
+                self._cache.store(name, getattr(self, name))
+
+    @property
+    def host(self):
+        return self._host
+
+    @host.setter
+    def host(self, ip):
+        try:
+            socket.inet_aton(ip)
+            self._host = ip
+        except socket.error:
+            sys.exit()
+
+    @property
+    def id(self):
+        return self._id
+
+    @id.setter
+    def id(self, id):
+        self._id = id
+
+    @property
+    def password(self):
+        return self._password
+
+    @password.setter
+    def password(self, pwd):
+        self._password = pwd
+
+    @property
+    def port(self):
+        return self._port
+
+    @property
+    def state(self):
+        return self._state
+
+    @state.setter
+    def state(self, val):
+        self._state = self.states[int.from_bytes(val, "big")]
+
+    @property
+    def speed(self):
+        return self._speed
+
+    @speed.setter
+    def speed(self, input):
+        val = int.from_bytes(input, "big")
+        self._speed = self.speeds[val]
+
+    @property
+    def boost_status(self):
+        return self._boost_status
+
+    @boost_status.setter
+    def boost_status(self, input):
+        val = int.from_bytes(input, "big")
+        self._boost_status = self.statuses[val]
+
+    @property
+    def timer_mode(self):
+        return self._timer_mode
+
+    @timer_mode.setter
+    def timer_mode(self, input):
+        val = int.from_bytes(input, "big")
+        self._timer_mode = self.timer_modes[val]
+
+    @property
+    def timer_counter(self):
+        return self._timer_counter
+
+    @timer_counter.setter
+    def timer_counter(self, input):
+        val = int.from_bytes(input, "big").to_bytes(3, "big")
+        self._timer_counter = (
+            str(val[2]) + "h " + str(val[1]) + "m " + str(val[0]) + "s "
+        )
+
+    @property
+    def humidity_sensor_state(self):
+        return self._humidity_sensor_state
+
+    @humidity_sensor_state.setter
+    def humidity_sensor_state(self, input):
+        val = int.from_bytes(input, "big")
+        self._humidity_sensor_state = self.states[val]
+
+    @property
+    def relay_sensor_state(self):
+        return self._relay_sensor_state
+
+    @relay_sensor_state.setter
+    def relay_sensor_state(self, input):
+        val = int.from_bytes(input, "big")
+        self._relay_sensor_state = self.states[val]
+
+    @property
+    def analogV_sensor_state(self):
+        return self._analogV_sensor_state
+
+    @analogV_sensor_state.setter
+    def analogV_sensor_state(self, input):
+        val = int.from_bytes(input, "big")
+        self._analogV_sensor_state = self.states[val]
+
+    @property
+    def humidity_treshold(self):
+        return self._humidity_treshold
+
+    @humidity_treshold.setter
+    def humidity_treshold(self, input):
+        val = int.from_bytes(input, "big")
+        self._humidity_treshold = str(val) + " %"
+
+    @property
+    def battery_voltage(self):
+        return self._battery_voltage
+
+    @battery_voltage.setter
+    def battery_voltage(self, input):
+        val = int.from_bytes(input, byteorder="little", signed=False)
+        self._battery_voltage = str(val) + " mV"
+
+    @property
+    def humidity(self):
+        return self._humidity
+
+    @humidity.setter
+    def humidity(self, input):
+        val = int.from_bytes(input, "big")
+        self._humidity = str(val) + " %"
+
+    @property
+    def analogV(self):
+        return self._analogV
+
+    @analogV.setter
+    def analogV(self, input):
+        val = int.from_bytes(input, "big")
+        self._analogV = str(val)
+
+    @property
+    def relay_status(self):
+        return self._relay_status
+
+    @relay_status.setter
+    def relay_status(self, input):
+        val = int.from_bytes(input, "big")
+        self._relay_status = self.statuses[val]
+
+    @property
+    def man_speed(self):
+        return self._man_speed
+
+    @man_speed.setter
+    def man_speed(self, input):
+        val = int.from_bytes(input, "big")
+        self._man_speed = str(self.profile.man_speed_percentage(val)) + " %"
+
+    @property
+    def fan1_speed(self):
+        return self._fan1_speed
+
+    @fan1_speed.setter
+    def fan1_speed(self, input):
+        val = int.from_bytes(input, byteorder="little", signed=False)
+        self._fan1_speed = str(val) + " rpm"
+
+    @property
+    def fan2_speed(self):
+        return self._fan2_speed
+
+    @fan2_speed.setter
+    def fan2_speed(self, input):
+        val = int.from_bytes(input, byteorder="little", signed=False)
+        self._fan2_speed = str(val) + " rpm"
+
+    @property
+    def filter_timer_countdown(self):
+        return self._filter_timer_countdown
+
+    @filter_timer_countdown.setter
+    def filter_timer_countdown(self, input):
+        result = ""
+        try:
+            val = int.from_bytes(input, "big").to_bytes(3, "big")
+            result = str(val[2]) + "d " + str(val[1]) + "h " + str(val[0]) + "m "
+        except Exception as e:
+            LOG.error(
+                f"Cannot parse filter_timer_countdown value '{input.hex()}': '{str(e)}'"
+            )
+            result = "Unknown value"
+
+        self._filter_timer_countdown = result
+
+    @property
+    def boost_time(self):
+        return self._boost_time
+
+    @boost_time.setter
+    def boost_time(self, input):
+        val = int.from_bytes(input, "big")
+        self._boost_time = str(val) + " m"
+
+    @property
+    def rtc_time(self):
+        return self._rtc_time
+
+    @rtc_time.setter
+    def rtc_time(self, input):
+        val = int.from_bytes(input, "big").to_bytes(3, "big")
+
+        self._rtc_time = str(val[2]) + "h " + str(val[1]) + "m " + str(val[0]) + "s "
+
+    @property
+    def rtc_date(self):
+        return self._rtc_date
+
+    @rtc_date.setter
+    def rtc_date(self, input):
+        val = int.from_bytes(input, "big").to_bytes(4, "big")
+        self._rtc_date = (
+            str(val[1])
+            + " 20"
+            + str(val[3])
+            + "-"
+            + str(val[2]).zfill(2)
+            + "-"
+            + str(val[0]).zfill(2)
+        )
+
+    @property
+    def weekly_schedule_state(self):
+        return self._weekly_schedule_state
+
+    @weekly_schedule_state.setter
+    def weekly_schedule_state(self, val):
+        self._weekly_schedule_state = self.states[int.from_bytes(val, "big")]
+
+    @property
+    def weekly_schedule_setup(self):
+        return self._weekly_schedule_setup
+
+    @weekly_schedule_setup.setter
+    def weekly_schedule_setup(self, input):
+        val = int.from_bytes(input, "big").to_bytes(6, "big")
+        self.schedule[(val[0], val[1])] = (val[2], val[5], val[4])
+        self._cache.store(self._schedule_key(val[0], val[1]), self.schedule[(val[0], val[1])])
+        self._weekly_schedule_setup = (
+            self.days_of_week[val[0]]
+            + "/"
+            + str(val[1])
+            + ": to "
+            + str(val[5])
+            + "h "
+            + str(val[4])
+            + "m "
+            + self.speeds[val[2]]
+        )
+
+    @property
+    def device_search(self):
+        return self._device_search
+
+    @device_search.setter
+    def device_search(self, val):
+        self._device_search = str(val, "latin-1")
+
+    @property
+    def device_password(self):
+        return self._device_password
+
+    @device_password.setter
+    def device_password(self, val):
+        self._device_password = str(val, "latin-1")
+
+    @property
+    def machine_hours(self):
+        return self._machine_hours
+
+    @machine_hours.setter
+    def machine_hours(self, input):
+        result = ""
+        try:
+            val = int.from_bytes(input, "big").to_bytes(4, "big")
+            result = (
+                str(int.from_bytes(val[2:3], "big"))
+                + "d "
+                + str(val[1])
+                + "h "
+                + str(val[0])
+                + "m "
+            )
+        except Exception as e:
+            LOG.error(f"Cannot parse machine_hours value '{input.hex()}': '{str(e)}'")
+            result = "Unknown value"
+
+        self._machine_hours = result
+
+    @property
+    def alarm_status(self):
+        return self._alarm_status
+
+    @alarm_status.setter
+    def alarm_status(self, input):
+        val = int.from_bytes(input, "big")
+        self._alarm_status = self.alarms[val]
+
+    @property
+    def cloud_server_state(self):
+        return self._cloud_server_state
+
+    @cloud_server_state.setter
+    def cloud_server_state(self, input):
+        val = int.from_bytes(input, "big")
+        self._cloud_server_state = self.states[val]
+
+    @property
+    def firmware(self):
+        return self._firmware
+
+    @firmware.setter
+    def firmware(self, input):
+        val = int.from_bytes(input, "big").to_bytes(6, "big")
+        self._firmware = (
+            str(val[0])
+            + "."
+            + str(val[1])
+            + " "
+            + str(int.from_bytes(val[4:6], byteorder="little", signed=False))
+            + "-"
+            + str(val[3]).zfill(2)
+            + "-"
+            + str(val[2]).zfill(2)
+        )
+
+    @property
+    def filter_replacement_status(self):
+        return self._filter_replacement_status
+
+    @filter_replacement_status.setter
+    def filter_replacement_status(self, input):
+        val = int.from_bytes(input, "big")
+        self._filter_replacement_status = self.statuses[val]
+
+    @property
+    def wifi_operation_mode(self):
+        return self._wifi_operation_mode
+
+    @wifi_operation_mode.setter
+    def wifi_operation_mode(self, input):
+        val = int.from_bytes(input, "big")
+        self._wifi_operation_mode = self.wifi_operation_modes[val]
+
+    @property
+    def wifi_name(self):
+        return self._wifi_name
+
+    @wifi_name.setter
+    def wifi_name(self, input):
+        self._wifi_name = str(input, "latin-1")
+
+    @property
+    def wifi_pasword(self):
+        return self._wifi_pasword
+
+    @wifi_pasword.setter
+    def wifi_pasword(self, input):
+        self._wifi_pasword = str(input, "latin-1")
+
+    @property
+    def wifi_enc_type(self):
+        return self._wifi_enc_type
+
+    @wifi_enc_type.setter
+    def wifi_enc_type(self, input):
+        val = int.from_bytes(input, "big")
+        self._wifi_enc_type = self.wifi_enc_types[val]
+
+    @property
+    def wifi_freq_chnnel(self):
+        return self._wifi_freq_chnnel
+
+    @wifi_freq_chnnel.setter
+    def wifi_freq_chnnel(self, input):
+        val = int.from_bytes(input, "big")
+        self._wifi_freq_chnnel = str(val)
+
+    @property
+    def wifi_dhcp(self):
+        return self._wifi_dhcp
+
+    @wifi_dhcp.setter
+    def wifi_dhcp(self, input):
+        val = int.from_bytes(input, "big")
+        self._wifi_dhcp = self.wifi_dhcps[val]
+
+    @property
+    def wifi_assigned_ip(self):
+        return self._wifi_assigned_ip
+
+    @wifi_assigned_ip.setter
+    def wifi_assigned_ip(self, input):
+        val = int.from_bytes(input, "big").to_bytes(4, "big")
+        self._wifi_assigned_ip = (
+            str(val[0]) + "." + str(val[1]) + "." + str(val[2]) + "." + str(val[3])
+        )
+
+    @property
+    def wifi_assigned_netmask(self):
+        return self._wifi_assigned_netmask
+
+    @wifi_assigned_netmask.setter
+    def wifi_assigned_netmask(self, input):
+        val = int.from_bytes(input, "big").to_bytes(4, "big")
+        self._wifi_assigned_netmask = (
+            str(val[0]) + "." + str(val[1]) + "." + str(val[2]) + "." + str(val[3])
+        )
+
+    @property
+    def wifi_main_gateway(self):
+        return self._wifi_main_gateway
+
+    @wifi_main_gateway.setter
+    def wifi_main_gateway(self, input):
+        val = int.from_bytes(input, "big").to_bytes(4, "big")
+        self._wifi_main_gateway = (
+            str(val[0]) + "." + str(val[1]) + "." + str(val[2]) + "." + str(val[3])
+        )
+
+    @property
+    def curent_wifi_ip(self):
+        return self._curent_wifi_ip
+
+    @curent_wifi_ip.setter
+    def curent_wifi_ip(self, input):
+        val = int.from_bytes(input, "big").to_bytes(4, "big")
+        self._curent_wifi_ip = (
+            str(val[0]) + "." + str(val[1]) + "." + str(val[2]) + "." + str(val[3])
+        )
+
+    @property
+    def airflow(self):
+        return self._airflow
+
+    @airflow.setter
+    def airflow(self, input):
+        val = int.from_bytes(input, "big")
+        self._airflow = self.airflows[val]
+
+    @property
+    def analogV_treshold(self):
+        return self._analogV_treshold
+
+    @analogV_treshold.setter
+    def analogV_treshold(self, input):
+        val = int.from_bytes(input, "big")
+        self._analogV_treshold = str(val) + " %"
+
+    @property
+    def unit_type(self):
+        return self._unit_type
+
+    @unit_type.setter
+    def unit_type(self, input):
+        try:
+            val = int.from_bytes(input, "big")
+            changed = val != self.unit_type_code
+            self.unit_type_code = val
+            if changed and self.values.get("man_speed") is not None:
+                # Decoded earlier in the same frame with the previous profile
+                self.man_speed = self.values["man_speed"].to_bytes(1, "big")
+                self._cache.store("man_speed", self._man_speed)
+            self._unit_type = self.unit_types[val]
+        except Exception as e:
+            LOG.info(f"Cannot parse unit_type value '{input.hex()}': '{str(e)}'")
+            self._unit_type = self.unit_types[0x9999]
+
+    @property
+    def night_mode_timer(self):
+        return self._night_mode_timer
+
+    @night_mode_timer.setter
+    def night_mode_timer(self, input):
+        val = int.from_bytes(input, "big").to_bytes(2, "big")
+        self._night_mode_timer = (
+            str(val[1]).zfill(2) + "h " + str(val[0]).zfill(2) + "m"
+        )
+
+    @property
+    def party_mode_timer(self):
+        return self._party_mode_timer
+
+    @party_mode_timer.setter
+    def party_mode_timer(self, input):
+        val = int.from_bytes(input, "big").to_bytes(2, "big")
+        self._party_mode_timer = (
+            str(val[1]).zfill(2) + "h " + str(val[0]).zfill(2) + "m"
+        )
+
+    @property
+    def humidity_status(self):
+        return self._humidity_status
+
+    @humidity_status.setter
+    def humidity_status(self, input):
+        val = int.from_bytes(input, "big")
+        self._humidity_status = self.statuses[val]
+
+    @property
+    def analogV_status(self):
+        return self._analogV_status
+
+    @analogV_status.setter
+    def analogV_status(self, input):
+        val = int.from_bytes(input, "big")
+        self._analogV_status = self.statuses[val]
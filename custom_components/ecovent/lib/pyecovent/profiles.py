@@ -0,0 +1,65 @@
+"""What each EcoVent unit type accepts: parameters, value ranges, speeds and payload limit"""
+
+from __future__ import annotations
+from dataclasses import dataclass, field
+import math
+from typing import Mapping
+
+# Raw values every known unit accepts for its settings, both ends included
+DEFAULT_RANGES: Mapping[str, tuple[int, int]] = {
+    "man_speed": (14, 255),
+    "humidity_treshold": (40, 80),
+    "boost_time": (0, 60),
+    "analogV_treshold": (5, 100),
+}
+
+# Percentage shown for the preset speeds low, medium and high
+DEFAULT_SPEED_PERCENTAGES: Mapping[int, int] = {1: 33, 2: 66, 3: 100}
+
+
+@dataclass(frozen=True)
+class UnitProfile:
+    """Settings of one unit type, selected by the decoded unit_type.
+
+    Parameters in `unsupported` are left out of read and write frames.
+    Writes outside of `ranges` are not sent. The manual speed runs from
+    the lower end of its range up to the upper end at 100 %.
+    """
+
+    name: str
+    unsupported: frozenset[int] = frozenset()
+    ranges: Mapping[str, tuple[int, int]] = field(
+        default_factory=lambda: dict(DEFAULT_RANGES)
+    )
+    speed_percentages: Mapping[int, int] = field(
+        default_factory=lambda: dict(DEFAULT_SPEED_PERCENTAGES)
+    )
+    # Bytes of parameters in one frame, leaves room for the header and
+    # checksum in the 256 bytes a unit receives at once
+    payload_limit: int = 200
+
+    def valid(self, name: str, value: int) -> bool:
+        """True if value may be written to the parameter."""
+        low, high = self.ranges.get(name, (0, math.inf))
+        return low <= value <= high
+
+    def man_speed(self, percentage: int) -> int:
+        """Raw manual speed for a percentage, at least the lowest one the unit runs with."""
+        low, high = self.ranges["man_speed"]
+        return max(low, min(high, math.ceil(high / 100 * percentage)))
+
+    def man_speed_percentage(self, value: int) -> int:
+        """Percentage of a raw manual speed, rounded down."""
+        return int(value / self.ranges["man_speed"][1] * 100)
+
+    def percentage(self, speed: int) -> int | None:
+        """Percentage of a preset speed, None for others."""
+        return self.speed_percentages.get(speed)
+
+
+# Profile of units whose type is not known yet or not listed in PROFILES
+DEFAULT_PROFILE = UnitProfile("Unknown Type")
+
+# Profiles by unit type code. No differences between the unit types are
+# known yet, so all of them use DEFAULT_PROFILE until one is found to differ.
+PROFILES: dict[int, UnitProfile] = {}
@@ -0,0 +1,91 @@
+"""Token bucket rate limiting for requests sent to the EcoVent Wi-Fi modules"""
+
+from __future__ import annotations
+import threading
+import time
+
+# One lock for all buckets, so a device bucket and the shared bucket are
+# always reserved together.
+_LOCK = threading.Lock()
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a request would have to wait too long for a send slot."""
+
+
+class TokenBucket:
+    """Token bucket refilled at `rate` tokens per second, holding at most `burst`.
+
+    Tokens may go negative: every reservation takes a token immediately and
+    the caller waits until the bucket would have refilled, so concurrent
+    callers queue up in order instead of racing for the next token.
+    """
+
+    def __init__(self, rate: float, burst: int, clock=time.monotonic):
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._clock = clock
+        self._tokens = float(self.burst)
+        self._stamp = clock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def delay(self, now: float) -> float:
+        """Seconds until a token is available (0 if one is available now)."""
+        self._refill(now)
+        if self._tokens >= 1:
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    def take(self) -> None:
+        self._tokens -= 1
+
+
+class RateLimiter:
+    """Reserves send slots from a per-device bucket and an optional shared one.
+
+    A request waits for the slower of both buckets. If that wait is longer
+    than `max_delay` the request is dropped instead of queued, so a burst
+    degrades into bounded latency rather than an ever growing backlog.
+    """
+
+    def __init__(
+        self,
+        bucket: TokenBucket,
+        shared: TokenBucket | None = None,
+        max_delay: float = 5.0,
+    ):
+        self.bucket = bucket
+        self.shared = shared
+        self.max_delay = max_delay
+        self.sent = 0
+        self.deferred = 0
+        self.dropped = 0
+
+    def reserve(self) -> float:
+        """Reserve a slot and return how long the caller must wait before sending."""
+        with _LOCK:
+            now = self.bucket._clock()
+            wait = self.bucket.delay(now)
+            if self.shared is not None:
+                wait = max(wait, self.shared.delay(now))
+            if wait > self.max_delay:
+                self.dropped += 1
+                raise RateLimitExceeded(
+                    f"Send slot not available within {self.max_delay}s (needs {wait:.2f}s)"
+                )
+            self.bucket.take()
+            if self.shared is not None:
+                self.shared.take()
+            self.sent += 1
+            if wait > 0:
+                self.deferred += 1
+            return wait
+
+    def acquire(self) -> None:
+        """Block until a send slot is available or raise RateLimitExceeded."""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
@@ -0,0 +1,182 @@
+"""Maintenance actions run on many EcoVent fans at once"""
+
+from __future__ import annotations
+import asyncio
+import logging
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .coordinator import EcoVentCoordinator
+from .lib.pyecovent import DeviceUnavailable, EcoVentClient, RateLimitExceeded
+
+LOG = logging.getLogger(__name__)
+
+ACTION_SYNC_CLOCK = "sync_clock"
+ACTION_RESET_FILTER_TIMER = "reset_filter_timer"
+ACTION_RESET_ALARMS = "reset_alarms"
+ACTION_SET_WIFI = "set_wifi"
+ACTIONS = (
+    ACTION_SYNC_CLOCK,
+    ACTION_RESET_FILTER_TIMER,
+    ACTION_RESET_ALARMS,
+    ACTION_SET_WIFI,
+)
+
+# Seconds the clock of a fan may differ after a sync
+CLOCK_TOLERANCE = 10
+# Seconds before the first retry, doubled for every further one
+RETRY_DELAY = 1
+
+
+class MaintenanceJob:
+    """Runs one action on many fans, at most `concurrency` at a time.
+
+    Every action is verified by reading the changed values back from the
+    fan. Failed or unverified fans are retried up to `retries` times. The
+    report has the outcome, attempts and time of every fan.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        action: str,
+        options: dict[str, Any] | None = None,
+        concurrency: int = 4,
+        retries: int = 2,
+    ):
+        self.hass = hass
+        self.action = action
+        self.options = options or {}
+        self.concurrency = concurrency
+        self.retries = retries
+
+    async def async_run(
+        self, coordinators: dict[str, EcoVentCoordinator | None]
+    ) -> dict[str, Any]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        devices: dict[str, dict[str, Any]] = {}
+
+        async def run_one(entity_id: str, coordinator: EcoVentCoordinator | None):
+            if coordinator is None:
+                devices[entity_id] = {"ok": False, "attempts": 0, "error": "not an ecovent fan"}
+                return
+            async with semaphore:
+                devices[entity_id] = await self._async_run_one(coordinator)
+
+        await asyncio.gather(*(run_one(*item) for item in coordinators.items()))
+        succeeded = sum(result["ok"] for result in devices.values())
+        return {
+            "action": self.action,
+            "succeeded": succeeded,
+            "failed": len(devices) - succeeded,
+            "devices": devices,
+        }
+
+    async def _async_run_one(self, coordinator: EcoVentCoordinator) -> dict[str, Any]:
+        start = time.monotonic()
+        result: dict[str, Any] = {"ok": False}
+        for attempt in range(1, self.retries + 2):
+            result["attempts"] = attempt
+            try:
+                result["ok"] = await coordinator.async_run(self._apply, coordinator.client)
+                if result["ok"]:
+                    result.pop("error", None)
+                    break
+                result["error"] = "not verified"
+            except (OSError, DeviceUnavailable, RateLimitExceeded) as e:
+                result["error"] = str(e) or type(e).__name__
+            except Exception as e:  # pylint: disable=broad-except
+                # Not retried, but the other fans go on
+                LOG.exception(
+                    f"Unexpected error in maintenance '{self.action}' of ecovent fan '{coordinator.client.host}'"
+                )
+                result["error"] = f"{type(e).__name__}: {e}"
+                break
+            if attempt <= self.retries:
+                await asyncio.sleep(RETRY_DELAY * 2 ** (attempt - 1))
+        if not result["ok"]:
+            LOG.warning(
+                f"Maintenance '{self.action}' of ecovent fan '{coordinator.client.host}' failed: {result['error']}"
+            )
+        result["elapsed"] = round(time.monotonic() - start, 3)
+        return result
+
+    def _apply(self, client: EcoVentClient) -> bool:
+        """Run the action on one fan and read the result back, blocks."""
+        if self.action == ACTION_SYNC_CLOCK:
+            return self._sync_clock(client)
+        if self.action == ACTION_RESET_FILTER_TIMER:
+            client.command(["filter_timer_reset"])
+            return client.refresh(["filter_replacement_status"], max_age=0) and (
+                client.filter_replacement_status == "off"
+            )
+        if self.action == ACTION_RESET_ALARMS:
+            client.command(["reset_alarms"])
+            return client.refresh(["alarm_status"], max_age=0) and (
+                client.alarm_status == "no"
+            )
+        if self.action == ACTION_SET_WIFI:
+            return self._set_wifi(client)
+        raise ValueError(f"Unknown maintenance action '{self.action}'")
+
+    def _sync_clock(self, client: EcoVentClient) -> bool:
+        now = dt_util.now()
+        client.write(
+            {
+                # seconds, minutes, hours
+                "rtc_time": bytes([now.second, now.minute, now.hour]).hex(),
+                # day, day of the week from 1 for Monday, month, year
+                "rtc_date": bytes(
+                    [now.day, now.isoweekday(), now.month, now.year % 100]
+                ).hex(),
+            }
+        )
+        if not client.refresh(["rtc_time", "rtc_date"], max_age=0):
+            return False
+        now = dt_util.now()
+        second, minute, hour = client.values["rtc_time"].to_bytes(3, "little")
+        day, _, month, year = client.values["rtc_date"].to_bytes(4, "little")
+        try:
+            clock = now.replace(
+                year=now.year // 100 * 100 + year,
+                month=month,
+                day=day,
+                hour=hour,
+                minute=minute,
+                second=second,
+                microsecond=0,
+            )
+        except ValueError:
+            # Not a valid date
+            return False
+        # Date and time together, the date may have changed since the write
+        return abs((clock - now).total_seconds()) <= CLOCK_TOLERANCE
+
+    def _set_wifi(self, client: EcoVentClient) -> bool:
+        values = {}
+        if (name := self.options.get("wifi_name")) is not None:
+            values["wifi_name"] = name.encode("latin-1").hex()
+        if (password := self.options.get("wifi_password")) is not None:
+            values["wifi_pasword"] = password.encode("latin-1").hex()
+        if (encryption := self.options.get("wifi_encryption")) is not None:
+            number = next(
+                number
+                for number, enc_type in client.wifi_enc_types.items()
+                if enc_type == encryption
+            )
+            values["wifi_enc_type"] = bytes([number]).hex()
+        client.write(values)
+        # Verified before applying, the Wi-Fi module restarts afterwards
+        if not client.refresh(list(values), max_age=0):
+            return False
+        if name is not None and client.wifi_name != name:
+            return False
+        if password is not None and client.wifi_pasword != password:
+            return False
+        if encryption is not None and client.wifi_enc_type != encryption:
+            return False
+        client.command(["wifi_apply_and_quit"])
+        return True
@@ -0,0 +1,88 @@
+"""Settings of EcoVent fans"""
+
+from __future__ import annotations
+
+from homeassistant.components.number import NumberEntity, NumberEntityDescription
+from homeassistant.const import (
+    CONF_DEVICE_ID,
+    PERCENTAGE,
+    EntityCategory,
+    UnitOfTime,
+)
+
+from .const import MY_DOMAIN, DATA_COORDINATORS
+from .entity import EcoVentEntity
+
+
+# Settings stored in one single byte parameter of the fan, the key is its name
+NUMBERS: tuple[NumberEntityDescription, ...] = (
+    NumberEntityDescription(
+        key="humidity_treshold",
+        name="Humidity treshold",
+        icon="mdi:water-percent",
+        native_min_value=40,
+        native_max_value=80,
+        native_step=1,
+        native_unit_of_measurement=PERCENTAGE,
+        entity_category=EntityCategory.CONFIG,
+    ),
+    NumberEntityDescription(
+        key="boost_time",
+        name="Boost time",
+        icon="mdi:timer-outline",
+        native_min_value=0,
+        native_max_value=60,
+        native_step=1,
+        native_unit_of_measurement=UnitOfTime.MINUTES,
+        entity_category=EntityCategory.CONFIG,
+    ),
+)
+
+
+# pylint: disable=unused-argument
+async def async_setup_platform(hass, config, async_add_entities, discovery_info=None):
+    """Set up the numbers of a fan loaded by the fan platform."""
+    if discovery_info is None:
+        return
+    coordinator = hass.data[MY_DOMAIN][DATA_COORDINATORS][discovery_info[CONF_DEVICE_ID]]
+    async_add_entities(
+        EcoVentNumber(coordinator, description) for description in NUMBERS
+    )
+
+
+class EcoVentNumber(EcoVentEntity, NumberEntity):
+    """Setting of one EcoVent unit"""
+
+    entity_description: NumberEntityDescription
+
+    def __init__(self, coordinator, description: NumberEntityDescription):
+        super().__init__(coordinator, description.key, description.name)
+        self.entity_description = description
+
+    @property
+    def native_min_value(self) -> float:
+        low, _ = self.client.profile.ranges.get(
+            self.entity_description.key, (self.entity_description.native_min_value, None)
+        )
+        return low
+
+    @property
+    def native_max_value(self) -> float:
+        _, high = self.client.profile.ranges.get(
+            self.entity_description.key, (None, self.entity_description.native_max_value)
+        )
+        return high
+
+    @property
+    def native_value(self) -> float | None:
+        return self.client.values.get(self.entity_description.key)
+
+    def visible_values(self):
+        return (self.available, self.native_value)
+
+    async def async_set_native_value(self, value: float) -> None:
+        await self.coordinator.async_run(
+            self.client.set_param,
+            self.entity_description.key,
+            hex(int(value)).replace("0x", "").zfill(2),
+        )
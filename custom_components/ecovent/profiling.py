@@ -0,0 +1,158 @@
+"""Time-boxed profiling of the polls and commands of EcoVent fans"""
+
+from __future__ import annotations
+import cProfile
+import io
+import logging
+import os
+import pstats
+import threading
+import tracemalloc
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util import dt as dt_util
+
+from .coordinator import EcoVentCoordinator
+
+LOG = logging.getLogger(__name__)
+
+# Frames kept for every allocation traced by tracemalloc
+TRACEMALLOC_FRAMES = 10
+# Lines of the text report for functions and allocations
+REPORT_LINES = 30
+
+
+class EcoVentProfiler:
+    """Profiles every executor job of the given fans for `duration` seconds.
+
+    Each job runs under its own cProfile profile, they are merged when the
+    time is up. Allocations of the integration are sampled with tracemalloc
+    and exchanges slower than `slow_exchange` seconds are logged. The
+    merged profile is written to `<path>.prof`, a readable report to
+    `<path>.txt`, and both are linked from the fans.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinators: list[EcoVentCoordinator],
+        duration: float,
+        slow_exchange: float,
+        path: str,
+    ):
+        self.hass = hass
+        self.coordinators = coordinators
+        self.duration = duration
+        self.slow_exchange = slow_exchange
+        self.path = path
+        self._lock = threading.Lock()
+        self._profiles: list[cProfile.Profile] = []
+        self._slow: list[tuple[str, float, int, int]] = []
+        self._jobs = 0
+        self._unprofiled = 0
+        self._started_tracemalloc = False
+        self._cancel = None
+
+    @property
+    def report_path(self) -> str:
+        return self.path + ".txt"
+
+    @property
+    def running(self) -> bool:
+        return self._cancel is not None
+
+    @callback
+    def async_start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            self._started_tracemalloc = True
+        for coordinator in self.coordinators:
+            coordinator.profiler = self
+            coordinator.slow_exchanges = 0
+            coordinator.client.on_exchange = self._exchange_hook(coordinator)
+        self._cancel = async_call_later(self.hass, self.duration, self._async_stop)
+        LOG.info(f"Profiling {len(self.coordinators)} ecovent fans for {self.duration}s")
+
+    def runcall(self, target, *args):
+        """Run target under a profile of its own, in the executor."""
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Since Python 3.12 only one profile can be active at a time, it
+            # sees all threads. Jobs running next to it are not profiled.
+            with self._lock:
+                self._jobs += 1
+                self._unprofiled += 1
+            return target(*args)
+        try:
+            return target(*args)
+        finally:
+            profile.disable()
+            with self._lock:
+                self._profiles.append(profile)
+                self._jobs += 1
+
+    def _exchange_hook(self, coordinator: EcoVentCoordinator):
+        host = coordinator.client.host
+
+        def on_exchange(seconds: float, sent: int, answered: int) -> None:
+            if seconds < self.slow_exchange:
+                return
+            LOG.warning(
+                f"Slow exchange with ecovent fan '{host}': {seconds * 1000:.0f} ms for {sent} frames, {answered} answered"
+            )
+            with self._lock:
+                self._slow.append((host, seconds, sent, answered))
+                coordinator.slow_exchanges += 1
+
+        return on_exchange
+
+    async def _async_stop(self, _now=None) -> None:
+        self._cancel = None
+        for coordinator in self.coordinators:
+            coordinator.profiler = None
+            coordinator.client.on_exchange = None
+        await self.hass.async_add_executor_job(self._write)
+        for coordinator in self.coordinators:
+            coordinator.profile_path = self.report_path
+            coordinator.async_update_listeners()
+        LOG.info(f"Profile of ecovent fans written to '{self.report_path}'")
+
+    def _write(self) -> None:
+        """Merge the profiles and write the results, blocks."""
+        snapshot = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+        out = io.StringIO()
+        out.write(
+            f"EcoVent profile of {len(self.coordinators)} fans, {self.duration:.0f}s until {dt_util.now().isoformat(timespec='seconds')}\n"
+            f"{self._jobs} jobs ({self._unprofiled} overlapping ones not profiled), {len(self._slow)} exchanges slower than {self.slow_exchange * 1000:.0f} ms\n\n"
+        )
+        for host, seconds, sent, answered in self._slow:
+            out.write(f"  {host}: {seconds * 1000:.0f} ms, {sent} frames, {answered} answered\n")
+
+        if self._profiles:
+            stats = pstats.Stats(*self._profiles, stream=out)
+            stats.dump_stats(self.path + ".prof")
+            out.write("\nFunctions by cumulative time\n")
+            stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(REPORT_LINES)
+
+        if snapshot is not None:
+            # Only allocations made by the code of this integration
+            snapshot = snapshot.filter_traces(
+                [tracemalloc.Filter(True, os.path.dirname(__file__) + os.sep + "*")]
+            )
+            out.write("\nAllocations by line\n")
+            for stat in snapshot.statistics("lineno")[:REPORT_LINES]:
+                out.write(f"  {stat}\n")
+
+        with open(self.report_path, "w", encoding="utf-8") as file:
+            file.write(out.getvalue())
+
+
+def profile_path(hass: HomeAssistant) -> str:
+    """Path of new results, without the extension."""
+    stamp = dt_util.now().strftime("%Y%m%d-%H%M%S")
+    return hass.config.path(f"ecovent_profile_{stamp}")
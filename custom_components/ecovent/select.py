@@ -0,0 +1,41 @@
+"""Airflow mode select of EcoVent fans"""
+
+from __future__ import annotations
+
+from homeassistant.components.select import SelectEntity
+from homeassistant.const import CONF_DEVICE_ID
+
+from .const import MY_DOMAIN, DATA_COORDINATORS
+from .entity import EcoVentEntity
+from .lib.pyecovent import EcoVentClient
+
+
+# pylint: disable=unused-argument
+async def async_setup_platform(hass, config, async_add_entities, discovery_info=None):
+    """Set up the selects of a fan loaded by the fan platform."""
+    if discovery_info is None:
+        return
+    coordinator = hass.data[MY_DOMAIN][DATA_COORDINATORS][discovery_info[CONF_DEVICE_ID]]
+    async_add_entities([EcoVentAirflowSelect(coordinator)])
+
+
+class EcoVentAirflowSelect(EcoVentEntity, SelectEntity):
+    """Airflow mode of one EcoVent unit"""
+
+    _attr_icon = "mdi:air-filter"
+    _attr_options = list(EcoVentClient.airflows.values())
+
+    def __init__(self, coordinator):
+        super().__init__(coordinator, "airflow", "Airflow")
+
+    @property
+    def current_option(self) -> str | None:
+        return self.client.airflow
+
+    def visible_values(self):
+        return (self.available, self.current_option)
+
+    async def async_select_option(self, option: str) -> None:
+        await self.coordinator.async_run(
+            self.client.set_airflow, self._attr_options.index(option)
+        )
@@ -0,0 +1,278 @@
+"""Sensors of EcoVent fans, read from the shared poll of the fan platform"""
+
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.const import (
+    CONF_DEVICE_ID,
+    PERCENTAGE,
+    REVOLUTIONS_PER_MINUTE,
+    EntityCategory,
+    UnitOfElectricPotential,
+    UnitOfTime,
+)
+
+from homeassistant.core import callback
+
+from .const import MY_DOMAIN, CONF_FLEET, DATA_COORDINATORS, DATA_FLEET
+from .coordinator import EcoVentCoordinator
+from .entity import EcoVentEntity
+from .fleet import FleetSnapshot
+
+
+def _filter_days_left(coordinator: EcoVentCoordinator) -> int | None:
+    # minutes, hours and days, one byte each
+    value = coordinator.client.values.get("filter_timer_countdown")
+    return value >> 16 if value is not None else None
+
+
+def _machine_hours(coordinator: EcoVentCoordinator) -> int | None:
+    # minutes, hours and a two byte day counter
+    value = coordinator.client.values.get("machine_hours")
+    return (value >> 16) * 24 + (value >> 8 & 0xFF) if value is not None else None
+
+
+@dataclass(frozen=True, kw_only=True)
+class EcoVentSensorEntityDescription(SensorEntityDescription):
+    """Sensor reading one decoded value of the fan."""
+
+    value_fn: Callable[[EcoVentCoordinator], Any]
+    # Counts the polls themselves, its changes do not count as changed states
+    poll_counter: bool = False
+
+
+# Humidity and fan speeds have no state class, their long-term statistics
+# are aggregated from every poll by EcoVentStatistics instead
+SENSORS: tuple[EcoVentSensorEntityDescription, ...] = (
+    EcoVentSensorEntityDescription(
+        key="humidity",
+        name="Humidity",
+        device_class=SensorDeviceClass.HUMIDITY,
+        native_unit_of_measurement=PERCENTAGE,
+        value_fn=lambda coordinator: coordinator.client.values.get("humidity"),
+    ),
+    EcoVentSensorEntityDescription(
+        key="fan1_speed",
+        name="Fan 1 speed",
+        icon="mdi:fan",
+        native_unit_of_measurement=REVOLUTIONS_PER_MINUTE,
+        value_fn=lambda coordinator: coordinator.client.values.get("fan1_speed"),
+    ),
+    EcoVentSensorEntityDescription(
+        key="fan2_speed",
+        name="Fan 2 speed",
+        icon="mdi:fan",
+        native_unit_of_measurement=REVOLUTIONS_PER_MINUTE,
+        value_fn=lambda coordinator: coordinator.client.values.get("fan2_speed"),
+    ),
+    EcoVentSensorEntityDescription(
+        key="battery_voltage",
+        name="Battery voltage",
+        device_class=SensorDeviceClass.VOLTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfElectricPotential.MILLIVOLT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda coordinator: coordinator.client.values.get("battery_voltage"),
+    ),
+    EcoVentSensorEntityDescription(
+        key="filter_days_left",
+        name="Filter days left",
+        icon="mdi:air-filter",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.DAYS,
+        value_fn=_filter_days_left,
+    ),
+    EcoVentSensorEntityDescription(
+        key="machine_hours",
+        name="Machine hours",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        native_unit_of_measurement=UnitOfTime.HOURS,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=_machine_hours,
+    ),
+    EcoVentSensorEntityDescription(
+        key="poll_interval",
+        name="Poll interval",
+        icon="mdi:timer-sync-outline",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda coordinator: coordinator.interval.total_seconds(),
+    ),
+    EcoVentSensorEntityDescription(
+        key="suppressed_writes",
+        name="Suppressed writes",
+        icon="mdi:counter",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        poll_counter=True,
+        value_fn=lambda coordinator: coordinator.suppressed_writes,
+    ),
+    EcoVentSensorEntityDescription(
+        key="skipped_round_trips",
+        name="Skipped round trips",
+        icon="mdi:counter",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda coordinator: coordinator.client.skipped_round_trips,
+    ),
+)
+
+# Metrics of the humidity_boost controller, only for fans that have one
+CONTROLLER_SENSORS: tuple[EcoVentSensorEntityDescription, ...] = (
+    EcoVentSensorEntityDescription(
+        key="humidity_boost_latency",
+        name="Humidity boost latency",
+        icon="mdi:timer-outline",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda coordinator: (
+            round(coordinator.controller.last_latency * 1000)
+            if coordinator.controller.last_latency is not None
+            else None
+        ),
+    ),
+    EcoVentSensorEntityDescription(
+        key="humidity_boost_writes",
+        name="Humidity boost writes",
+        icon="mdi:counter",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda coordinator: coordinator.controller.writes,
+    ),
+)
+
+# Only while the export of the polls is configured
+EXPORT_SENSORS: tuple[EcoVentSensorEntityDescription, ...] = (
+    EcoVentSensorEntityDescription(
+        key="export_dropped",
+        name="Export dropped",
+        icon="mdi:file-alert-outline",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda coordinator: coordinator.export_dropped,
+    ),
+)
+
+
+@dataclass(frozen=True, kw_only=True)
+class EcoVentFleetSensorEntityDescription(SensorEntityDescription):
+    """Sensor aggregating one value over all fans."""
+
+    value_fn: Callable[[FleetSnapshot], Any]
+
+
+FLEET_SENSORS: tuple[EcoVentFleetSensorEntityDescription, ...] = (
+    EcoVentFleetSensorEntityDescription(
+        key="running",
+        name="EcoVent fans running",
+        icon="mdi:fan",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda fleet: fleet.running(),
+    ),
+    EcoVentFleetSensorEntityDescription(
+        key="mean_humidity",
+        name="EcoVent average humidity",
+        device_class=SensorDeviceClass.HUMIDITY,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=PERCENTAGE,
+        value_fn=lambda fleet: fleet.mean_humidity(),
+    ),
+    EcoVentFleetSensorEntityDescription(
+        key="filters_due",
+        name="EcoVent filters due",
+        icon="mdi:air-filter",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda fleet: fleet.filters_due(),
+    ),
+    EcoVentFleetSensorEntityDescription(
+        key="max_rpm_imbalance",
+        name="EcoVent max RPM imbalance",
+        icon="mdi:scale-unbalanced",
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=REVOLUTIONS_PER_MINUTE,
+        value_fn=lambda fleet: fleet.max_rpm_imbalance(),
+    ),
+)
+
+
+# pylint: disable=unused-argument
+async def async_setup_platform(hass, config, async_add_entities, discovery_info=None):
+    """Set up the sensors of a fan loaded by the fan platform, or those of all fans."""
+    if discovery_info is None:
+        return
+    if discovery_info.get(CONF_FLEET):
+        fleet = hass.data[MY_DOMAIN][DATA_FLEET]
+        async_add_entities(
+            EcoVentFleetSensor(fleet, description) for description in FLEET_SENSORS
+        )
+        return
+    coordinator = hass.data[MY_DOMAIN][DATA_COORDINATORS][discovery_info[CONF_DEVICE_ID]]
+    descriptions = SENSORS
+    if coordinator.controller is not None:
+        descriptions += CONTROLLER_SENSORS
+    if coordinator.exporter is not None:
+        descriptions += EXPORT_SENSORS
+    async_add_entities(
+        EcoVentSensor(coordinator, description) for description in descriptions
+    )
+
+
+class EcoVentSensor(EcoVentEntity, SensorEntity):
+    """Sensor of one EcoVent unit"""
+
+    entity_description: EcoVentSensorEntityDescription
+
+    def __init__(self, coordinator, description: EcoVentSensorEntityDescription):
+        super().__init__(coordinator, description.key, description.name)
+        self.entity_description = description
+        self._poll_counter = description.poll_counter
+
+    @property
+    def native_value(self):
+        return self.entity_description.value_fn(self.coordinator)
+
+    def visible_values(self):
+        return (self.available, self.native_value)
+
+
+class EcoVentFleetSensor(SensorEntity):
+    """Sensor aggregating the snapshot of all EcoVent units"""
+
+    _attr_should_poll = False
+    entity_description: EcoVentFleetSensorEntityDescription
+
+    def __init__(self, fleet: FleetSnapshot, description: EcoVentFleetSensorEntityDescription):
+        self.fleet = fleet
+        self.entity_description = description
+        self._attr_unique_id = f"{MY_DOMAIN}_fleet_{description.key}"
+        self._attr_name = description.name
+        self._value = None
+
+    @property
+    def native_value(self):
+        return self._value
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self._value = self.entity_description.value_fn(self.fleet)
+        self.async_on_remove(self.fleet.async_add_listener(self._handle_fleet_update))
+
+    @callback
+    def _handle_fleet_update(self) -> None:
+        """Write the state only if the aggregate has changed."""
+        value = self.entity_description.value_fn(self.fleet)
+        if value == self._value:
+            return
+        self._value = value
+        self.async_write_ha_state()
@@ -0,0 +1,134 @@
+"""Long-term statistics of EcoVent fans, aggregated from every poll"""
+
+from __future__ import annotations
+from array import array
+from datetime import datetime, timezone
+import math
+
+from homeassistant.const import PERCENTAGE, REVOLUTIONS_PER_MINUTE
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import slugify
+
+from .const import MY_DOMAIN
+
+# Values of client.values with statistics, their name and unit
+STATISTICS = {
+    "humidity": ("Humidity", PERCENTAGE),
+    "fan1_speed": ("Fan 1 speed", REVOLUTIONS_PER_MINUTE),
+    "fan2_speed": ("Fan 2 speed", REVOLUTIONS_PER_MINUTE),
+}
+FIELDS = tuple(STATISTICS)
+
+# Seconds of the periods polls are aggregated into, long-term statistics are
+# stored per hour by the recorder
+SHORT_PERIOD = 300
+LONG_PERIOD = 3600
+
+
+class Aggregate:
+    """Count, sum, minimum and maximum of every field in one period."""
+
+    def __init__(self):
+        self.start = None
+        self.counts = array("I", [0]) * len(FIELDS)
+        self.sums = array("d", [0.0]) * len(FIELDS)
+        self.mins = array("d", [math.inf]) * len(FIELDS)
+        self.maxs = array("d", [-math.inf]) * len(FIELDS)
+
+    def reset(self, start: float) -> None:
+        self.start = start
+        for i in range(len(FIELDS)):
+            self.counts[i] = 0
+            self.sums[i] = 0.0
+            self.mins[i] = math.inf
+            self.maxs[i] = -math.inf
+
+    def add(self, i: int, count: int, total: float, low: float, high: float) -> None:
+        self.counts[i] += count
+        self.sums[i] += total
+        self.mins[i] = min(self.mins[i], low)
+        self.maxs[i] = max(self.maxs[i], high)
+
+    def merge(self, other: Aggregate) -> None:
+        for i in range(len(FIELDS)):
+            if other.counts[i]:
+                self.add(i, other.counts[i], other.sums[i], other.mins[i], other.maxs[i])
+
+    def mean(self, i: int) -> float | None:
+        return self.sums[i] / self.counts[i] if self.counts[i] else None
+
+
+class EcoVentStatistics:
+    """Aggregates the polls of one fan into 5 minute mean, minimum and maximum.
+
+    The 5 minute aggregates of an hour are merged and published as external
+    long-term statistics `ecovent:<device id>_<value>` when the hour is over,
+    independent of how often the entity states are written.
+    """
+
+    def __init__(self, hass: HomeAssistant, device_id: str, name: str):
+        self.hass = hass
+        self.name = name
+        self.statistic_ids = {
+            field: f"{MY_DOMAIN}:{slugify(device_id)}_{field}" for field in FIELDS
+        }
+        self._closed = Aggregate()
+        self._short = Aggregate()
+        self._long = Aggregate()
+
+    @callback
+    def async_add(self, stamp: float, values: dict[str, int]) -> None:
+        start = stamp // SHORT_PERIOD * SHORT_PERIOD
+        if self._short.start is None:
+            self._short.reset(start)
+            self._long.reset(stamp // LONG_PERIOD * LONG_PERIOD)
+        elif start != self._short.start:
+            self._close_short(start)
+        for i, field in enumerate(FIELDS):
+            value = values.get(field)
+            if value is not None:
+                self._short.add(i, 1, value, value, value)
+
+    def _close_short(self, start: float) -> None:
+        self._closed, self._short = self._short, self._closed
+        self._short.reset(start)
+        self._long.merge(self._closed)
+        hour = start // LONG_PERIOD * LONG_PERIOD
+        if hour != self._long.start:
+            self._async_publish(self._long)
+            self._long.reset(hour)
+
+    @callback
+    def _async_publish(self, aggregate: Aggregate) -> None:
+        if "recorder" not in self.hass.config.components:
+            return
+        # pylint: disable-next=import-outside-toplevel
+        from homeassistant.components.recorder.models import (
+            StatisticData,
+            StatisticMetaData,
+        )
+        # pylint: disable-next=import-outside-toplevel
+        from homeassistant.components.recorder.statistics import (
+            async_add_external_statistics,
+        )
+
+        start = datetime.fromtimestamp(aggregate.start, timezone.utc)
+        for i, field in enumerate(FIELDS):
+            if not aggregate.counts[i]:
+                continue
+            name, unit = STATISTICS[field]
+            metadata = StatisticMetaData(
+                has_mean=True,
+                has_sum=False,
+                name=f"{self.name} {name}",
+                source=MY_DOMAIN,
+                statistic_id=self.statistic_ids[field],
+                unit_of_measurement=unit,
+            )
+            statistic = StatisticData(
+                start=start,
+                mean=aggregate.mean(i),
+                min=aggregate.mins[i],
+                max=aggregate.maxs[i],
+            )
+            async_add_external_statistics(self.hass, metadata, [statistic])
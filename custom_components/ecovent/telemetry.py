@@ -0,0 +1,134 @@
+"""Recent values of an EcoVent fan kept in memory, downsampled to minutes and hours"""
+
+from __future__ import annotations
+from array import array
+import math
+
+# Raw values of client.values kept for every poll
+FIELDS = ("humidity", "fan1_speed", "fan2_speed", "man_speed", "state")
+# Marks a value the fan did not report in a raw sample
+MISSING = 0xFFFF
+
+RESOLUTIONS = ("raw", "minute", "hour")
+
+
+def _value(value):
+    if value == MISSING or value != value:
+        return None
+    if isinstance(value, float):
+        return round(value, 2)
+    return value
+
+
+class Ring:
+    """Columns of fixed length, the oldest row is overwritten when full."""
+
+    def __init__(self, size: int, typecode: str):
+        empty = MISSING if typecode == "H" else math.nan
+        self.size = size
+        self.count = 0
+        self._next = 0
+        self.times = array("d", [0.0]) * size
+        self.columns = [array(typecode, [empty]) * size for _ in FIELDS]
+
+    def append(self, stamp: float, values) -> None:
+        row = self._next
+        self.times[row] = stamp
+        for column, value in zip(self.columns, values):
+            column[row] = value
+        self._next = (row + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+
+    @property
+    def oldest(self) -> float | None:
+        if not self.count:
+            return None
+        return self.times[(self._next - self.count) % self.size]
+
+    def window(self, start: float, end: float) -> dict[str, list]:
+        """Rows from start to end, oldest first, as one list per column."""
+        first = self._next - self.count
+        rows = [
+            row
+            for row in ((first + n) % self.size for n in range(self.count))
+            if start <= self.times[row] <= end
+        ]
+        result = {"time": [int(self.times[row]) for row in rows]}
+        for field, column in zip(FIELDS, self.columns):
+            result[field] = [_value(column[row]) for row in rows]
+        return result
+
+
+class Bucket:
+    """Sums of the values of the current period, closed into means."""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.start = None
+        self._sums = array("d", [0.0]) * len(FIELDS)
+        self._counts = array("I", [0]) * len(FIELDS)
+
+    def add(self, stamp: float, values) -> tuple[float, list[float]] | None:
+        """Add values, returns start and means of the period they close, if any."""
+        start = stamp // self.period * self.period
+        closed = None
+        if self.start is not None and start != self.start:
+            closed = (self.start, self.means())
+            for i in range(len(FIELDS)):
+                self._sums[i] = 0.0
+                self._counts[i] = 0
+        self.start = start
+        for i, value in enumerate(values):
+            if value is not None and value == value and value != MISSING:
+                self._sums[i] += value
+                self._counts[i] += 1
+        return closed
+
+    def means(self) -> list[float]:
+        return [
+            self._sums[i] / self._counts[i] if self._counts[i] else math.nan
+            for i in range(len(FIELDS))
+        ]
+
+
+class Telemetry:
+    """Raw samples of the last polls, minute means of a day and hour means of a month.
+
+    Minute and hour rows are written when their period has ended, the means
+    of the state column are the share of the period the fan was on.
+    """
+
+    def __init__(self, raw_size: int = 720, minute_size: int = 1440, hour_size: int = 720):
+        self.tiers = {
+            "raw": Ring(raw_size, "H"),
+            "minute": Ring(minute_size, "f"),
+            "hour": Ring(hour_size, "f"),
+        }
+        self._minute = Bucket(60)
+        self._hour = Bucket(3600)
+
+    def add(self, stamp: float, values: dict[str, int]) -> None:
+        sample = [values.get(field) for field in FIELDS]
+        self.tiers["raw"].append(
+            stamp, [MISSING if v is None else min(v, MISSING - 1) for v in sample]
+        )
+        closed = self._minute.add(stamp, sample)
+        if closed is not None:
+            self.tiers["minute"].append(*closed)
+            closed = self._hour.add(*closed)
+            if closed is not None:
+                self.tiers["hour"].append(*closed)
+
+    def resolution(self, start: float) -> str:
+        """Finest resolution that still covers start."""
+        for resolution in RESOLUTIONS[:-1]:
+            ring = self.tiers[resolution]
+            # A ring that is not full yet holds everything since startup
+            if ring.count < ring.size or ring.oldest <= start:
+                return resolution
+        return RESOLUTIONS[-1]
+
+    def window(self, start: float, end: float, resolution: str | None = None) -> dict:
+        """Values from start to end as columns, times in seconds since the epoch."""
+        resolution = resolution or self.resolution(start)
+        return {"resolution": resolution, **self.tiers[resolution].window(start, end)}
@@ -0,0 +1,133 @@
+"""Zones of EcoVent fans that change speed and airflow together"""
+
+from __future__ import annotations
+import asyncio
+import logging
+import threading
+import time
+
+from homeassistant.core import HomeAssistant
+
+from .coordinator import EcoVentCoordinator, async_get_coordinators
+from .lib.pyecovent import (
+    DEFAULT_PROFILE,
+    DeviceUnavailable,
+    EcoVentClient,
+    RateLimitExceeded,
+    UnitProfile,
+)
+
+LOG = logging.getLogger(__name__)
+
+
+def zone_values(
+    percentage: int | None = None,
+    airflow: str | None = None,
+    profile: UnitProfile = DEFAULT_PROFILE,
+) -> dict[str, str]:
+    """Parameters written to a member of the given profile, in the order the unit expects them."""
+    values = {}
+    if airflow is not None:
+        index = list(EcoVentClient.airflows.values()).index(airflow)
+        values["airflow"] = hex(index).replace("0x", "").zfill(2)
+    if percentage is not None:
+        if percentage < 2:
+            values["state"] = "00"
+        else:
+            values["man_speed"] = f"{profile.man_speed(percentage):02x}"
+            values["speed"] = "ff"
+            values["state"] = "01"
+    return values
+
+
+class _Start:
+    """Barrier of one member, records when its frames are sent."""
+
+    def __init__(self, barrier: threading.Barrier):
+        self.barrier = barrier
+        self.time = None
+
+    def wait(self, timeout: float) -> None:
+        try:
+            self.barrier.wait(timeout)
+        finally:
+            self.time = time.monotonic()
+
+    def skip(self, timeout: float) -> None:
+        """Pass the barrier without sending, so the others still start together."""
+        try:
+            self.barrier.wait(timeout)
+        except threading.BrokenBarrierError:
+            pass
+
+
+class EcoVentZone:
+    """Fans, given by entity ID, that are written to at the same time.
+
+    Every member gets all parameters in one batched exchange. The exchanges
+    run in parallel executor jobs that wait for each other once connected,
+    so the datagrams of all members leave within milliseconds.
+    """
+
+    def __init__(self, hass: HomeAssistant, name: str, entity_ids: list[str]):
+        self.hass = hass
+        self.name = name
+        self.entity_ids = entity_ids
+
+    async def async_write(
+        self, percentage: int | None = None, airflow: str | None = None
+    ) -> dict[str, dict]:
+        """Set speed and airflow of all members, returns success and timing per member."""
+        results = {}
+        members = {}
+        for entity_id, coordinator in async_get_coordinators(
+            self.hass, self.entity_ids
+        ).items():
+            if coordinator is None:
+                results[entity_id] = {"ok": False, "error": "not an ecovent fan"}
+            elif not coordinator.available:
+                results[entity_id] = {"ok": False, "error": "unavailable"}
+            else:
+                values = zone_values(percentage, airflow, coordinator.client.profile)
+                frames = coordinator.client.write_frames(values)
+                if frames:
+                    members[entity_id] = (coordinator, frames)
+                else:
+                    # Nothing the unit would accept, it does not take part
+                    results[entity_id] = {"ok": False, "error": "nothing to write"}
+        if not members:
+            return results
+
+        barrier = threading.Barrier(len(members))
+        starts = {entity_id: _Start(barrier) for entity_id in members}
+
+        async def write(
+            entity_id: str, member: tuple[EcoVentCoordinator, list[str]]
+        ) -> None:
+            coordinator, frames = member
+            start = starts[entity_id]
+            result = results[entity_id] = {"ok": False}
+            try:
+                result["ok"] = await coordinator.async_write(frames, start)
+                if not result["ok"]:
+                    result["error"] = "no answer"
+            except (OSError, DeviceUnavailable, RateLimitExceeded) as e:
+                result["error"] = str(e)
+                LOG.warning(f"Zone '{self.name}' failed to write to '{entity_id}': {str(e)}")
+                if start.time is None:
+                    # Failed before the barrier, the others still start together
+                    await self.hass.async_add_executor_job(
+                        start.skip, EcoVentClient.SYNC_TIMEOUT
+                    )
+            finished = time.monotonic()
+            if start.time is not None:
+                result["latency"] = round((finished - start.time) * 1000, 1)
+
+        await asyncio.gather(*(write(*member) for member in members.items()))
+
+        # Time from the first member that sent to every other member
+        sent = [start.time for start in starts.values() if start.time is not None]
+        for entity_id, start in starts.items():
+            if start.time is not None:
+                results[entity_id]["skew"] = round((start.time - min(sent)) * 1000, 1)
+        return results
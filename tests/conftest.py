@@ -0,0 +1,96 @@
+"""pyecovent only needs the standard library, the tests import it from lib.
+
+Tests of the integration itself import custom_components.ecovent from the
+root of the repository and are skipped without Home Assistant.
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.join(ROOT, "custom_components", "ecovent", "lib"))
+sys.path.insert(1, ROOT)
+
+from pyecovent import EcoVentClient  # noqa: E402
+
+DEVICE_ID = "0123456789ABCDEF"
+
+
+@pytest.fixture
+def client():
+    """Client of a unit with a known ID, so that it does not search for it."""
+    return EcoVentClient("127.0.0.1", fan_id=DEVICE_ID)
+
+
+class Clock:
+    """Monotonic clock that only moves when a test sets `now`."""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    """Clock for the buckets and caches, starting at 100 s."""
+    return Clock()
+
+
+class FakeUnit:
+    """Answers the frames of a client like a unit, instead of its exchange.
+
+    `values` holds the raw value of every parameter number the unit
+    supports, `slots` the weekly schedule by day and period.
+    """
+
+    READ = int(EcoVentClient.func["read"], 16)
+    SCHEDULE = 0x0077
+
+    def __init__(self, client, values):
+        self.client = client
+        self.values = values
+        self.slots = {}
+        self.frames = []
+        self.answer = True
+        client.exchange = self.exchange
+
+    def exchange(self, frames, barrier=None):
+        self.frames += frames
+        if not self.answer:
+            return self.client.exchanged(0, len(frames))
+        for frame in frames:
+            _, _, function, params = EcoVentClient.parse_request(self.client.packet(frame))
+            answer = []
+            for number, value in params:
+                if number == self.SCHEDULE:
+                    slot = value[:2]
+                    if function != self.READ:
+                        self.slots[slot] = value
+                    answer.append((number, self.slots.get(slot, slot + bytes(4))))
+                    continue
+                if function != self.READ and number in self.values:
+                    self.values[number] = value
+                answer.append((number, self.values.get(number)))
+            self.client.parse_response(self.client.response_packet(answer))
+        return self.client.exchanged(len(frames), len(frames))
+
+
+@pytest.fixture
+def unit(client):
+    """Unit that is on at manual speed, with heat recovery and 45 % humidity."""
+    return FakeUnit(
+        client,
+        {
+            0x0001: b"\x01",
+            0x0002: b"\xff",
+            0x0019: b"\x3c",
+            0x0025: b"\x2d",
+            0x0044: b"\x80",
+            0x0066: b"\x0a",
+            0x00B7: b"\x01",
+        },
+    )
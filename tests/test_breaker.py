@@ -0,0 +1,94 @@
+"""Circuit breaker of units that stop answering"""
+
+import pytest
+
+from pyecovent import CircuitBreaker, DeviceUnavailable
+from pyecovent.breaker import CLOSED, HALF_OPEN, OPEN
+
+
+def test_opens_after_threshold_failures():
+    breaker = CircuitBreaker(threshold=3)
+    assert not breaker.record_failure()
+    assert not breaker.record_failure()
+    breaker.check()
+    # Only the failure that opens the breaker reports it
+    assert breaker.record_failure()
+    assert not breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.available
+    with pytest.raises(DeviceUnavailable):
+        breaker.check()
+
+
+def test_success_resets_failures():
+    breaker = CircuitBreaker(threshold=2)
+    breaker.record_failure()
+    assert not breaker.record_success()
+    assert not breaker.record_failure()
+    assert breaker.state == CLOSED
+
+
+def test_failed_probe_doubles_backoff_up_to_max():
+    breaker = CircuitBreaker(threshold=1, backoff=10, max_backoff=30)
+    breaker.record_failure()
+    for backoff in (20, 30, 30):
+        breaker.half_open()
+        assert breaker.state == HALF_OPEN
+        # The probe is let through
+        breaker.check()
+        breaker.record_failure()
+        assert breaker.state == OPEN and breaker.backoff == backoff
+
+
+def test_successful_probe_closes_and_resets_backoff():
+    breaker = CircuitBreaker(threshold=1, backoff=10)
+    breaker.record_failure()
+    breaker.half_open()
+    breaker.record_failure()
+    breaker.half_open()
+    assert breaker.record_success()
+    assert breaker.available and breaker.backoff == 10 and breaker.failures == 0
+
+
+def test_single_probe_while_half_open():
+    breaker = CircuitBreaker(threshold=1)
+    breaker.record_failure()
+    breaker.half_open()
+    breaker.check()
+    # Every other request fails fast until the probe has a result
+    with pytest.raises(DeviceUnavailable):
+        breaker.check()
+    breaker.record_failure()
+    breaker.half_open()
+    # Unanswered posts cannot be the probe
+    with pytest.raises(DeviceUnavailable):
+        breaker.check(probe=False)
+    breaker.check()
+    assert breaker.record_success()
+    breaker.check()
+    breaker.check(probe=False)
+
+
+def test_half_open_rearms_a_lost_probe():
+    breaker = CircuitBreaker(threshold=1)
+    breaker.record_failure()
+    breaker.half_open()
+    breaker.check()
+    # Never recorded, e.g. dropped by the rate limiter
+    breaker.half_open()
+    breaker.check()
+
+
+def test_half_open_only_from_open():
+    breaker = CircuitBreaker()
+    breaker.half_open()
+    assert breaker.state == CLOSED
+
+
+def test_unanswered_exchanges_mark_the_client_unavailable(client):
+    opened = []
+    client.on_unavailable = lambda: opened.append(True)
+    for _ in range(client.breaker.threshold):
+        assert not client.exchanged(0, 1)
+    assert opened == [True] and not client.available
+    assert client.exchanged(1, 1)
+    assert client.available
@@ -0,0 +1,59 @@
+"""Cache of decoded values with a time to live per parameter"""
+
+import math
+
+from pyecovent import ParamCache
+
+
+def test_value_and_age(clock):
+    cache = ParamCache({}, 30, clock=clock)
+    assert cache.value("humidity") is None
+    assert cache.age("humidity") == math.inf
+    cache.store("humidity", "45 %")
+    clock.now += 12
+    assert cache.value("humidity") == "45 %"
+    assert cache.age("humidity") == 12
+
+
+def test_stale_by_ttl_of_each_parameter(clock):
+    cache = ParamCache({"firmware": 3600}, 30, clock=clock)
+    cache.store("firmware", "0.9")
+    cache.store("humidity", "45 %")
+    clock.now += 30
+    assert cache.stale(["firmware", "humidity", "state"]) == ["humidity", "state"]
+    clock.now += 3600
+    assert cache.stale(["firmware"]) == ["firmware"]
+
+
+def test_stale_by_max_age(clock):
+    cache = ParamCache({"firmware": 3600}, 30, clock=clock)
+    cache.store("firmware", "0.9")
+    clock.now += 5
+    assert cache.stale(["firmware"], max_age=10) == []
+    assert cache.stale(["firmware"], max_age=0) == ["firmware"]
+
+
+def test_client_only_reads_stale_parameters(client, clock):
+    client._cache = ParamCache(client.ttls, client.default_ttl, clock=clock)
+    client.parse_response(
+        client.response_packet([(0x0001, b"\x01"), (0x0025, b"\x2d")])
+    )
+    assert client.get(["state", "humidity"]) == {"state": "on", "humidity": "45 %"}
+
+    sent = []
+    client.exchange = lambda frames, barrier=None: sent.append(frames) or True
+    assert client.refresh(["state", "humidity", "firmware"])
+    assert sent == [client.read_frames(["firmware"], max_age=0)]
+
+    # Parameters in fresh are read whatever their age
+    sent.clear()
+    client.refresh(["state", "humidity"], fresh=["humidity"])
+    assert sent == [client.read_frames(["humidity"], max_age=0)]
+
+    # Nothing stale, nothing sent
+    sent.clear()
+    assert client.refresh(["state", "humidity"])
+    assert sent == []
+    clock.now += client.default_ttl
+    client.refresh(["state", "humidity"])
+    assert sent == [client.read_frames(["state", "humidity"], max_age=0)]
@@ -0,0 +1,72 @@
+"""Humidity boost decided on every poll"""
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.ecovent.controller import HumidityBoostController  # noqa: E402
+from pyecovent import DEFAULT_PROFILE  # noqa: E402
+
+# Fan on at manual speed 0x80
+VALUES = {"state": 1, "speed": 0xFF, "man_speed": 0x80}
+
+
+def polls(controller, humidities, start=0.0, interval=30.0):
+    """Results of update() for a poll every interval seconds."""
+    return [
+        controller.update(start + n * interval, {**VALUES, "humidity": humidity}, DEFAULT_PROFILE)
+        for n, humidity in enumerate(humidities)
+    ]
+
+
+def test_fast_rise_boosts_until_back_within_hysteresis():
+    controller = HumidityBoostController(rate_of_rise=2.0, hysteresis=3.0)
+    # 4 % within a minute
+    assert polls(controller, [50, 52, 54]) == [None, None, {"boost_status": "01"}]
+    assert controller.active and controller.baseline == 50 and controller.triggers == 1
+
+    # Held while the humidity is more than 3 % above where the rise started
+    assert polls(controller, [60, 58, 54], start=90) == [None, None, None]
+    assert polls(controller, [53], start=180) == [{"boost_status": "00"}]
+    assert not controller.active
+
+
+def test_slow_or_small_rise_does_not_boost():
+    controller = HumidityBoostController(rate_of_rise=2.0, hysteresis=3.0, window=600)
+    # 4 % in 5 minutes
+    assert polls(controller, [50, 51, 52, 53, 54], interval=75) == [None] * 5
+    controller = HumidityBoostController(rate_of_rise=2.0, hysteresis=3.0)
+    # Fast, but less than the hysteresis
+    assert polls(controller, [50, 52]) == [None, None]
+    assert not controller.active
+
+
+def test_polls_without_humidity_are_ignored():
+    controller = HumidityBoostController()
+    assert controller.update(0, VALUES) is None
+    assert not controller.active
+
+
+def test_speed_instead_of_boost_restores_the_previous_values():
+    controller = HumidityBoostController(speed=60)
+    trigger = polls(controller, [50, 55])[-1]
+    # One frame that turns the fan on at 60 %
+    assert trigger == {"state": "01", "man_speed": "99", "speed": "ff"}
+
+    assert polls(controller, [52], start=60) == [{"state": "01", "speed": "ff", "man_speed": "80"}]
+
+
+def test_failed_write_is_retried_with_the_next_poll():
+    controller = HumidityBoostController()
+    assert polls(controller, [50, 55])[-1] == {"boost_status": "01"}
+    controller.written(False, 0.2)
+    assert not controller.active and controller.failed_writes == 1
+    assert polls(controller, [56], start=60) == [{"boost_status": "01"}]
+    controller.written(True, 0.05)
+    assert controller.active and controller.writes == 1 and controller.last_latency == 0.05
+
+    # A failed release keeps the boost and releases again
+    assert polls(controller, [50], start=90) == [{"boost_status": "00"}]
+    controller.written(False, 0.2)
+    assert controller.active
+    assert polls(controller, [50], start=120) == [{"boost_status": "00"}]
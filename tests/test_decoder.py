@@ -0,0 +1,149 @@
+"""Decoding of responses from the receive buffer of the client"""
+
+import gc
+import socket
+import tracemalloc
+
+import pytest
+
+from pyecovent import EcoVentClient
+import pyecovent.cache
+import pyecovent.client
+
+from conftest import DEVICE_ID
+
+# A poll answer with short, long, extended and unsupported parameters
+ANSWER = [
+    (0x0001, b"\x01"),
+    (0x0002, b"\xff"),
+    (0x0025, b"\x2d"),
+    (0x0044, b"\x80"),
+    (0x004A, b"\x10\x04"),
+    (0x004B, b"\x20\x04"),
+    (0x0064, b"\x05\x0c\x1e"),
+    (0x0083, b"\x00"),
+    (0x0088, b"\x01"),
+    (0x00A3, b"\x04\x03\x02\x01"),
+    (0x00B7, b"\x01"),
+    (0x00B9, b"\x03\x00"),
+    (0x0024, None),
+    (0x0302, b"\x00\x08"),
+]
+FRAMES = 200
+
+
+def blocks(snapshot):
+    """Number of memory blocks allocated by the traced lines and still alive."""
+    return sum(stat.count for stat in snapshot.statistics("lineno"))
+
+
+def reference_decode(data):
+    """(number, value) pairs of a response, decoded byte by byte like the first version of the client."""
+    pointer = 4 + data[3]
+    pointer += 2 + data[pointer]
+    params = []
+    high_byte_value = 0
+    value_size = 1
+    payload = data[pointer:-2]
+    i = 0
+    while i < len(payload):
+        p = payload[i]
+        if p == 0xFF:
+            high_byte_value = payload[i + 1]
+            i += 2
+        elif p == 0xFE:
+            value_size = payload[i + 1]
+            i += 2
+        elif p == 0xFD:
+            i += 2
+            high_byte_value = 0
+        else:
+            number = high_byte_value << 8 | p
+            params.append((number, bytes(payload[i + 1 : i + 1 + value_size])))
+            i += 1 + value_size
+            high_byte_value = 0
+            value_size = 1
+    return params
+
+
+def test_decoder_matches_reference(client):
+    packet = client.response_packet(ANSWER)
+    client.parse_response(packet)
+
+    reference = EcoVentClient("127.0.0.1", fan_id=DEVICE_ID)
+    for number, value in reference_decode(packet):
+        setattr(reference, EcoVentClient.params[number][0], value)
+
+    for name, _ in EcoVentClient.params.values():
+        assert getattr(client, name) == getattr(reference, name), name
+    assert client.unsupported == {0x0024}
+    assert client.values["fan1_speed"] == 0x0410
+    assert client.speed == "manual"
+
+
+def test_decoder_reads_views_of_the_buffer(client):
+    """Values passed to the setters are views, not copies of the datagram."""
+    seen = []
+
+    class Recording(EcoVentClient):
+        @EcoVentClient.humidity.setter
+        def humidity(self, input):
+            seen.append(input)
+            EcoVentClient.humidity.fset(self, input)
+
+    recording = Recording("127.0.0.1", fan_id=DEVICE_ID)
+    recording.parse_response(client.response_packet(ANSWER))
+    assert isinstance(seen[0], memoryview)
+    assert recording.humidity == "45 %"
+
+
+@pytest.fixture
+def sockets():
+    unit = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    unit.bind(("127.0.0.1", 0))
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.bind(("127.0.0.1", 0))
+    receiver.settimeout(1)
+    yield unit, receiver
+    unit.close()
+    receiver.close()
+
+
+def test_allocations_per_decoded_frame(client, sockets):
+    unit, receiver = sockets
+    client.socket = receiver
+    address = receiver.getsockname()
+    packet = client.response_packet(ANSWER)
+
+    def receive_and_decode():
+        unit.sendto(packet, address)
+        client.parse_response(client.receive())
+
+    # Fill the cache and the decoded values first
+    for _ in range(10):
+        receive_and_decode()
+    gc.collect()
+
+    files = [
+        tracemalloc.Filter(True, pyecovent.client.__file__),
+        tracemalloc.Filter(True, pyecovent.cache.__file__),
+    ]
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot().filter_traces(files)
+        peak = 0
+        for _ in range(FRAMES):
+            unit.sendto(packet, address)
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            client.parse_response(client.receive())
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - current)
+        after = tracemalloc.take_snapshot().filter_traces(files)
+    finally:
+        tracemalloc.stop()
+
+    per_frame = (blocks(after) - blocks(before)) / FRAMES
+    # Decoded values replace the previous ones, nothing piles up per frame
+    assert per_frame < 0.1
+    # Neither the datagram nor its parameters are copied into new buffers
+    assert peak < EcoVentClient.BUFFER_SIZE
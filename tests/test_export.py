@@ -0,0 +1,101 @@
+"""Export of every poll to rotating files by a background thread"""
+
+import csv
+import json
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.ecovent import export  # noqa: E402
+from custom_components.ecovent.export import COLUMNS, EcoVentExporter  # noqa: E402
+
+from conftest import DEVICE_ID  # noqa: E402
+
+# 2023-11-14T22:13:20+00:00
+STAMP = 1_700_000_000
+VALUES = {"state": 1, "humidity": 45, "fan1_speed": 1200}
+
+
+def test_full_queue_drops_records(tmp_path):
+    exporter = EcoVentExporter(str(tmp_path / "polls.jsonl"), queue_size=2)
+    assert exporter.add(STAMP, DEVICE_ID, "Kitchen", VALUES)
+    assert exporter.add(STAMP + 1, DEVICE_ID, "Kitchen", VALUES)
+    assert not exporter.add(STAMP + 2, DEVICE_ID, "Kitchen", VALUES)
+    assert exporter.dropped == 1
+
+    # The queued records are still written
+    exporter.start()
+    exporter.stop()
+    lines = (tmp_path / "polls.jsonl").read_text().splitlines()
+    assert [json.loads(line)["time"] for line in lines] == [
+        "2023-11-14T22:13:20+00:00",
+        "2023-11-14T22:13:21+00:00",
+    ]
+    assert exporter.written == 2
+
+
+def test_queued_records_are_written_in_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(export, "BATCH_SIZE", 2)
+    exporter = EcoVentExporter(str(tmp_path / "polls.jsonl"))
+    batches = []
+    write = exporter._write
+    exporter._write = lambda batch: batches.append(len(batch)) or write(batch)
+    for n in range(5):
+        exporter.add(STAMP + n, DEVICE_ID, "Kitchen", {**VALUES, "humidity": 40 + n})
+    exporter.start()
+    exporter.stop()
+    assert batches == [2, 2, 1]
+    records = [json.loads(line) for line in (tmp_path / "polls.jsonl").read_text().splitlines()]
+    assert [record["humidity"] for record in records] == [40, 41, 42, 43, 44]
+    assert records[0] == {
+        "time": "2023-11-14T22:13:20+00:00",
+        "device_id": DEVICE_ID,
+        "name": "Kitchen",
+        **VALUES,
+        "humidity": 40,
+    }
+
+
+def test_csv_has_one_header(tmp_path):
+    path = tmp_path / "polls.csv"
+    exporter = EcoVentExporter(str(path), file_format="csv")
+    exporter._write([(STAMP, DEVICE_ID, "Kitchen", VALUES)])
+    exporter._write([(STAMP + 1, DEVICE_ID, "Kitchen", {**VALUES, "unknown": 1})])
+    with open(path, newline="", encoding="utf-8") as file:
+        rows = list(csv.reader(file))
+    assert rows[0] == COLUMNS and len(rows) == 3
+    assert rows[2][COLUMNS.index("humidity")] == "45"
+
+
+def test_files_are_rotated(tmp_path):
+    path = tmp_path / "polls.jsonl"
+    exporter = EcoVentExporter(str(path), max_bytes=1, backups=2)
+    for n in range(4):
+        exporter._write([(STAMP + n, DEVICE_ID, "Kitchen", VALUES)])
+    assert sorted(file.name for file in tmp_path.iterdir()) == [
+        "polls.jsonl",
+        "polls.jsonl.1",
+        "polls.jsonl.2",
+    ]
+    # Newest in the file itself, older ones with higher numbers
+    for name, n in (("polls.jsonl", 3), ("polls.jsonl.1", 2), ("polls.jsonl.2", 1)):
+        assert json.loads((tmp_path / name).read_text())["time"].endswith(f":2{n}+00:00")
+
+
+def test_rotation_without_backups(tmp_path):
+    path = tmp_path / "polls.jsonl"
+    exporter = EcoVentExporter(str(path), max_bytes=1, backups=0)
+    exporter._write([(STAMP, DEVICE_ID, "Kitchen", VALUES)])
+    exporter._write([(STAMP + 1, DEVICE_ID, "Kitchen", VALUES)])
+    assert [file.name for file in tmp_path.iterdir()] == ["polls.jsonl"]
+    assert len(path.read_text().splitlines()) == 1
+
+
+def test_failed_writes_are_counted(tmp_path):
+    # A directory cannot be opened for appending
+    exporter = EcoVentExporter(str(tmp_path))
+    exporter.add(STAMP, DEVICE_ID, "Kitchen", VALUES)
+    exporter.start()
+    exporter.stop()
+    assert exporter.failed == 1 and exporter.written == 0
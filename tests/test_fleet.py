@@ -0,0 +1,109 @@
+"""Latest values of all fans in columns"""
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.ecovent import fleet as fleet_module  # noqa: E402
+from custom_components.ecovent.fleet import MISSING, FleetSnapshot  # noqa: E402
+
+
+def values(state=1, humidity=45, fan1=1200, fan2=1150, due=0, **extra):
+    return {
+        "state": state,
+        "speed": 0xFF,
+        "man_speed": 0x80,
+        "humidity": humidity,
+        "fan1_speed": fan1,
+        "fan2_speed": fan2,
+        # 12 days, 5 hours and 30 minutes
+        "filter_timer_countdown": 12 << 16 | 5 << 8 | 30,
+        "filter_replacement_status": due,
+        "alarm_status": 0,
+        **extra,
+    }
+
+
+@pytest.fixture
+def fleet():
+    # Without listeners nothing is scheduled on hass
+    return FleetSnapshot(None)
+
+
+def test_rows_are_updated_in_place(fleet):
+    fleet.async_update("A", "Kitchen", values(), True)
+    fleet.async_update("B", "Bath", {"state": 0}, True)
+    columns = fleet.columns["humidity"], fleet.columns["state"]
+    fleet.async_update("A", "Kitchen", values(humidity=60), True)
+    assert fleet.devices == ["A", "B"] and fleet.names == ["Kitchen", "Bath"]
+    # Same arrays, one row per fan
+    assert fleet.columns["humidity"] is columns[0] and fleet.columns["state"] is columns[1]
+    assert fleet.columns["humidity"].tolist() == [60, MISSING]
+    assert fleet.columns["filter_days_left"].tolist() == [12, MISSING]
+    assert fleet.export() == {
+        "devices": ["A", "B"],
+        "names": ["Kitchen", "Bath"],
+        "available": [True, True],
+        "state": [1, 0],
+        "speed": [0xFF, MISSING],
+        "man_speed": [0x80, MISSING],
+        "humidity": [60, MISSING],
+        "fan1_speed": [1200, MISSING],
+        "fan2_speed": [1150, MISSING],
+        "filter_days_left": [12, MISSING],
+        "filter_replacement": [0, MISSING],
+        "alarm": [0, MISSING],
+    }
+
+
+def test_aggregates(fleet):
+    assert fleet.running() == 0 and fleet.filters_due() == 0
+    assert fleet.mean_humidity() is None and fleet.max_rpm_imbalance() is None
+
+    fleet.async_update("A", "Kitchen", values(humidity=40, fan1=1200, fan2=1100), True)
+    fleet.async_update("B", "Bath", values(humidity=55, fan1=900, fan2=1000, due=1), True)
+    # Off, its imbalance does not count
+    fleet.async_update("C", "Bedroom", values(state=0, humidity=50, fan1=0, fan2=800), True)
+    fleet.async_update("D", "Attic", {"state": 1}, True)
+    assert fleet.running() == 3
+    assert fleet.mean_humidity() == 48.3
+    assert fleet.filters_due() == 1
+    assert fleet.max_rpm_imbalance() == 100
+
+
+def test_unavailable_fans_are_left_out(fleet):
+    fleet.async_update("A", "Kitchen", values(humidity=40, fan1=1200, fan2=1100), True)
+    fleet.async_update("B", "Bath", values(humidity=60, fan1=900, fan2=1300, due=1), True)
+    fleet.async_update("B", "Bath", values(humidity=60, fan1=900, fan2=1300, due=1), False)
+    # The row is kept with its last values
+    assert fleet.export()["available"] == [True, False]
+    assert fleet.columns["humidity"].tolist() == [40, 60]
+    assert fleet.running() == 1
+    assert fleet.mean_humidity() == 40
+    assert fleet.filters_due() == 0
+    assert fleet.max_rpm_imbalance() == 100
+
+    fleet.async_update("B", "Bath", values(humidity=50), True)
+    assert fleet.running() == 2 and fleet.mean_humidity() == 45
+
+
+def test_listeners_are_notified_once_per_delay(fleet, monkeypatch):
+    scheduled = []
+    monkeypatch.setattr(
+        fleet_module,
+        "async_call_later",
+        lambda hass, delay, job: scheduled.append(job) or (lambda: None),
+    )
+    notified = []
+    remove = fleet.async_add_listener(lambda: notified.append(fleet.running()))
+    fleet.async_update("A", "Kitchen", values(), True)
+    fleet.async_update("B", "Bath", values(), True)
+    assert len(scheduled) == 1 and notified == []
+    scheduled[0].target()
+    assert notified == [2]
+
+    fleet.async_update("A", "Kitchen", values(state=0), True)
+    assert len(scheduled) == 2
+    remove()
+    scheduled[1].target()
+    assert notified == [2]
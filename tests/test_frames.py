@@ -0,0 +1,66 @@
+"""Splitting of reads and writes into frames within the payload limit"""
+
+from pyecovent import EcoVentClient
+
+from conftest import DEVICE_ID
+
+READ = int(EcoVentClient.func["read"], 16)
+WRITE_RETURN = int(EcoVentClient.func["write_return"], 16)
+ALL = [param[0] for param in EcoVentClient.params.values()]
+
+
+def params_of(client, frames, function):
+    """(number, value) pairs of all frames, checked to be of function."""
+    params = []
+    for frame in frames:
+        request = EcoVentClient.parse_request(client.packet(frame))
+        assert request[:3] == (DEVICE_ID, "1111", function)
+        params += request[3]
+    return params
+
+
+def test_items_are_split_at_the_limit():
+    client = EcoVentClient("127.0.0.1", fan_id=DEVICE_ID, payload_limit=10)
+    items = [("01", 4), ("02", 4), ("25", 4), ("44", 4)]
+    # One byte of every frame is taken by the function
+    assert client.frames("01", items) == ["010102", "012544"]
+
+
+def test_oversized_item_gets_a_frame_of_its_own():
+    client = EcoVentClient("127.0.0.1", fan_id=DEVICE_ID, payload_limit=10)
+    assert client.frames("01", [("01", 2), ("fe20a3", 40), ("02", 2)]) == [
+        "0101",
+        "01fe20a3",
+        "0102",
+    ]
+
+
+def test_read_of_all_parameters_within_limit():
+    client = EcoVentClient("127.0.0.1", fan_id=DEVICE_ID, payload_limit=60)
+    frames = client.read_frames(max_age=0)
+    assert len(frames) > 1
+    for frame in frames:
+        # Expected answer of every frame fits into the limit
+        items = params_of(client, [frame], READ)
+        names = [EcoVentClient.param_name(number) for number, _ in items]
+        assert 1 + sum(client.read_item(name)[1] for name in names) <= 60 or len(names) == 1
+    numbers = [number for number, _ in params_of(client, frames, READ)]
+    assert numbers == [client.numbers[name] for name in ALL]
+
+
+def test_read_frames_are_reused_for_the_same_parameters(client):
+    first = client.read_frames(["state", "humidity"], max_age=0)
+    assert client.read_frames(["state", "humidity"], max_age=0) == first
+    # Callers get a copy, changing it does not change the next read
+    first.clear()
+    assert client.read_frames(["state", "humidity"], max_age=0) != first
+
+
+def test_write_frames_keep_all_values_in_order():
+    client = EcoVentClient("127.0.0.1", fan_id=DEVICE_ID, payload_limit=8)
+    values = {"boost_time": "0f", "humidity_treshold": "3c", "state": "01", "speed": "02"}
+    frames = client.write_frames(values)
+    assert len(frames) == 2
+    assert params_of(client, frames, WRITE_RETURN) == [
+        (client.numbers[name], bytes.fromhex(value)) for name, value in values.items()
+    ]
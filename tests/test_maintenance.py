@@ -0,0 +1,92 @@
+"""Maintenance actions run on many fans"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+import voluptuous as vol  # noqa: E402
+
+from custom_components.ecovent import RUN_MAINTENANCE_SCHEMA, maintenance  # noqa: E402
+from custom_components.ecovent.maintenance import (  # noqa: E402
+    ACTION_SYNC_CLOCK,
+    MaintenanceJob,
+)
+
+
+def clock_job(monkeypatch, *times):
+    """Sync of the clock that sees the given times, one per call of now()."""
+    times = iter(times)
+    monkeypatch.setattr(maintenance.dt_util, "now", lambda: next(times))
+    return MaintenanceJob(None, ACTION_SYNC_CLOCK)
+
+
+@pytest.fixture
+def rtc(unit):
+    unit.values[0x006F] = bytes(3)
+    unit.values[0x0070] = bytes(4)
+    return unit
+
+
+def test_sync_clock(monkeypatch, client, rtc):
+    written = datetime(2024, 3, 5, 14, 30, 15, 400000, timezone.utc)
+    job = clock_job(monkeypatch, written, written + timedelta(seconds=2))
+    assert job._apply(client)
+    # seconds, minutes, hours and day, day of the week, month, year
+    assert rtc.values[0x006F] == bytes([15, 30, 14])
+    assert rtc.values[0x0070] == bytes([5, 2, 3, 24])
+
+
+def test_sync_clock_across_midnight(monkeypatch, client, rtc):
+    written = datetime(2023, 12, 31, 23, 59, 59, 600000, timezone.utc)
+    job = clock_job(monkeypatch, written, written + timedelta(seconds=1))
+    assert job._apply(client)
+
+
+def test_sync_clock_not_verified(monkeypatch, client, rtc):
+    written = datetime(2024, 3, 5, 14, 30, 15, tzinfo=timezone.utc)
+    # A day later, same time
+    job = clock_job(monkeypatch, written, written + timedelta(days=1))
+    assert not job._apply(client)
+
+    # The unit did not take the date
+    job = clock_job(monkeypatch, written, written)
+    client.write = lambda values: True
+    rtc.values[0x0070] = bytes([31, 1, 2, 24])
+    assert not job._apply(client)
+
+
+class Coordinator:
+    def __init__(self, client, error):
+        self.client = client
+        self.error = error
+        self.calls = 0
+
+    async def async_run(self, target, *args):
+        self.calls += 1
+        raise self.error
+
+
+def test_unexpected_errors_end_up_in_the_report(monkeypatch, client):
+    monkeypatch.setattr(maintenance, "RETRY_DELAY", 0)
+    job = MaintenanceJob(None, ACTION_SYNC_CLOCK, retries=2)
+    failing = Coordinator(client, KeyError("rtc_time"))
+    unanswered = Coordinator(client, OSError("timed out"))
+    report = asyncio.run(job.async_run({"fan.a": failing, "fan.b": unanswered, "fan.c": None}))
+    assert (report["succeeded"], report["failed"]) == (0, 3)
+    devices = report["devices"]
+    # Not retried, unlike a fan that did not answer
+    assert devices["fan.a"]["error"] == "KeyError: 'rtc_time'"
+    assert devices["fan.a"]["attempts"] == failing.calls == 1
+    assert devices["fan.b"]["error"] == "timed out" and unanswered.calls == 3
+    assert devices["fan.c"]["error"] == "not an ecovent fan"
+
+
+def test_wifi_settings_fit_into_the_unit():
+    data = {"action": "set_wifi", "wifi_name": "n" * 32, "wifi_password": "p" * 32}
+    assert RUN_MAINTENANCE_SCHEMA(data)["wifi_password"] == "p" * 32
+    for option in ("wifi_name", "wifi_password"):
+        with pytest.raises(vol.Invalid):
+            RUN_MAINTENANCE_SCHEMA({**data, option: "x" * 33})
@@ -0,0 +1,69 @@
+"""Requests and responses as built and parsed by the gateway"""
+
+import pytest
+
+from pyecovent import EcoVentClient
+
+from conftest import DEVICE_ID
+
+READ = int(EcoVentClient.func["read"], 16)
+WRITE_RETURN = int(EcoVentClient.func["write_return"], 16)
+RESPONSE = int(EcoVentClient.func["resp"], 16)
+
+PARAMS = [
+    (0x0001, b"\x01"),
+    (0x004A, b"\x10\x04"),
+    (0x0077, b"\x01\x02\x03\x00\x1e\x07"),
+    (0x0302, b"\x00\x08"),
+]
+
+
+@pytest.mark.parametrize(
+    "function, params",
+    [
+        (READ, [(0x0001, b""), (0x0025, b""), (0x0077, b"\x01\x02"), (0x0302, b"")]),
+        (WRITE_RETURN, PARAMS),
+    ],
+)
+def test_request_round_trip(client, function, params):
+    packet = client.packet(client.request_frame(function, params))
+    assert EcoVentClient.parse_request(packet) == (DEVICE_ID, "1111", function, params)
+
+
+def test_response_round_trip(client):
+    packet = client.response_packet(PARAMS + [(0x0024, None), (0x0305, None)])
+    device_id, password, function, params = EcoVentClient.parse_request(packet)
+    assert (device_id, password, function) == (DEVICE_ID, "1111", RESPONSE)
+    # parse_request does not know about unsupported parameters, but the unit
+    # never sends them in requests
+    assert params[: len(PARAMS)] == PARAMS
+
+    client.raw = {}
+    client.parse_response(packet)
+    assert client.raw == {**dict(PARAMS), 0x0024: None, 0x0305: None}
+    assert client.unsupported == {0x0024, 0x0305}
+    assert client.schedule[(1, 2)] == (3, 7, 30)
+
+
+@pytest.mark.parametrize(
+    "packet",
+    [
+        b"",
+        b"\xfd\xfd\x02",
+        # wrong header
+        b"\xfe\xfd" + bytes(10),
+    ],
+)
+def test_invalid_datagrams(packet):
+    assert EcoVentClient.parse_request(packet) is None
+
+
+def test_corrupted_datagrams(client):
+    packet = bytearray(client.packet(client.request_frame(READ, [(0x0001, b"")])))
+    packet[-3] ^= 1
+    assert EcoVentClient.parse_request(bytes(packet)) is None
+    # Checksum fixed, but the frame ends within a parameter
+    truncated = client.packet(client.request_frame(WRITE_RETURN, PARAMS[:2]))[:-3]
+    payload = truncated[2:]
+    packet = truncated + (sum(payload) & 0xFFFF).to_bytes(2, "little")
+    assert EcoVentClient.parse_request(packet) is None
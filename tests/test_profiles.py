@@ -0,0 +1,77 @@
+"""Profiles of the unit types that writes are checked against"""
+
+import pytest
+
+from pyecovent import DEFAULT_PROFILE, PROFILES, EcoVentClient, UnitProfile
+
+# Man speed, then the unit type it has to be decoded with, in one response
+ANSWER = [(0x0044, b"\x80"), (0x00B9, b"\x03\x00")]
+
+
+def test_man_speed_percentage_is_rounded_down():
+    assert DEFAULT_PROFILE.man_speed_percentage(0x80) == 50
+    assert DEFAULT_PROFILE.man_speed_percentage(0xFF) == 100
+    assert DEFAULT_PROFILE.man_speed(50) == 0x80
+    # Never below the lowest speed of the unit
+    assert DEFAULT_PROFILE.man_speed(1) == 14
+
+
+@pytest.mark.parametrize(
+    "name, value, writable",
+    [
+        ("boost_time", "3c", True),
+        ("boost_time", "3d", False),
+        ("man_speed", "0e", True),
+        ("man_speed", "0d", False),
+        # Not in the value map of the parameter
+        ("airflow", "02", True),
+        ("airflow", "03", False),
+        # Longer values are not checked
+        ("wifi_name", "41" * 32, True),
+    ],
+)
+def test_writable(client, name, value, writable):
+    assert client.writable(name, value) is writable
+    assert client.skipped_writes == (0 if writable else 1)
+
+
+def test_unsupported_parameters_are_not_writable(client, monkeypatch):
+    client.unsupported = {0x0025}
+    assert not client.writable("humidity", "2d")
+    monkeypatch.setitem(PROFILES, 0x0300, UnitProfile("Test", unsupported=frozenset({0x0066})))
+    client.unit_type_code = 0x0300
+    assert not client.writable("boost_time", "0f")
+    assert client.writable("airflow", "01")
+    assert client.skipped_writes == 2
+
+
+def test_rejected_writes_are_skipped(client, unit):
+    client.unsupported = {0x0066}
+    assert not client.write({"boost_time": "0f", "humidity_treshold": "5a"})
+    assert unit.frames == [] and client.skipped_writes == 2
+
+    # The rest is still written
+    assert client.write({"humidity_treshold": "5a", "airflow": "00"})
+    assert unit.values[0x00B7] == b"\x00" and client.skipped_writes == 3
+    assert EcoVentClient.parse_request(client.packet(unit.frames[0]))[3] == [(0x00B7, b"\x00")]
+
+
+def test_unit_type_decodes_man_speed_again(client, monkeypatch):
+    monkeypatch.setitem(
+        PROFILES, 0x0300, UnitProfile("Test", ranges={"man_speed": (14, 200)})
+    )
+    client.parse_response(client.response_packet(ANSWER))
+    assert client.profile.name == "Test"
+    # 0x80 of 200, not of 255
+    assert client.man_speed == "64 %"
+    assert client.get("man_speed") == "64 %"
+
+    # Unchanged unit type, decoded once
+    client.parse_response(client.response_packet([(0x0044, b"\xc8"), (0x00B9, b"\x03\x00")]))
+    assert client.man_speed == "100 %"
+
+
+def test_unknown_unit_types_use_the_default_profile(client):
+    client.parse_response(client.response_packet(ANSWER))
+    assert client.profile is DEFAULT_PROFILE
+    assert client.man_speed == "50 %"
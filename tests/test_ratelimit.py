@@ -0,0 +1,80 @@
+"""Token buckets limiting the requests sent to the units"""
+
+import threading
+
+import pytest
+
+from pyecovent import RateLimiter, RateLimitExceeded, TokenBucket
+
+
+def test_bucket_allows_burst_then_refills(clock):
+    bucket = TokenBucket(2, 3, clock=clock)
+    for _ in range(3):
+        assert bucket.delay(clock.now) == 0
+        bucket.take()
+    assert bucket.delay(clock.now) == pytest.approx(0.5)
+    clock.now += 0.5
+    assert bucket.delay(clock.now) == 0
+
+
+def test_bucket_never_holds_more_than_burst(clock):
+    bucket = TokenBucket(10, 2, clock=clock)
+    clock.now += 60
+    for _ in range(2):
+        assert bucket.delay(clock.now) == 0
+        bucket.take()
+    assert bucket.delay(clock.now) > 0
+
+
+def test_limiter_queues_callers_in_order(clock):
+    limiter = RateLimiter(TokenBucket(2, 1, clock=clock), max_delay=5)
+    assert limiter.reserve() == 0
+    # Tokens go negative, every caller waits for its own slot
+    assert limiter.reserve() == pytest.approx(0.5)
+    assert limiter.reserve() == pytest.approx(1.0)
+    assert (limiter.sent, limiter.deferred, limiter.dropped) == (3, 2, 0)
+
+
+def test_limiter_drops_requests_that_would_wait_too_long(clock):
+    limiter = RateLimiter(TokenBucket(1, 1, clock=clock), max_delay=1.5)
+    limiter.reserve()
+    limiter.reserve()
+    with pytest.raises(RateLimitExceeded):
+        limiter.reserve()
+    assert (limiter.sent, limiter.dropped) == (2, 1)
+    # A dropped request does not take a token
+    clock.now += 1
+    assert limiter.reserve() == pytest.approx(1.0)
+
+
+def test_limiter_waits_for_the_slower_bucket(clock):
+    shared = TokenBucket(1, 1, clock=clock)
+    first = RateLimiter(TokenBucket(10, 5, clock=clock), shared=shared)
+    second = RateLimiter(TokenBucket(10, 5, clock=clock), shared=shared)
+    assert first.reserve() == 0
+    assert second.reserve() == pytest.approx(1.0)
+
+
+def test_tokens_are_taken_before_the_barrier(client):
+    """A member waiting for a send slot is still in sync with the others."""
+    barrier = threading.Barrier(1)
+    events = []
+    limiter = client.rate_limiter
+    limiter.reserve = lambda: events.append("reserve") or 0
+    barrier_wait = barrier.wait
+    barrier.wait = lambda timeout: events.append("barrier") or barrier_wait(timeout)
+
+    class Socket:
+        def sendall(self, data):
+            events.append("send")
+
+        def recv_into(self, buffer):
+            raise OSError("closed")
+
+        def close(self):
+            pass
+
+    client.connect = lambda: Socket()
+    with pytest.raises(OSError):
+        client.exchange(client.write_frames({"state": "01", "airflow": "00"}), barrier)
+    assert events == ["reserve", "barrier", "send"]
@@ -0,0 +1,70 @@
+"""Reading and writing the weekly schedule in batched frames"""
+
+from pyecovent import EcoVentClient, ParamCache
+
+from conftest import DEVICE_ID
+
+ALL_SLOTS = len(EcoVentClient.days_of_week) * len(EcoVentClient.schedule_periods)
+
+
+def test_read_of_all_slots_within_limit():
+    client = EcoVentClient("127.0.0.1", fan_id=DEVICE_ID, payload_limit=100)
+    frames = client.schedule_read_frames()
+    assert len(frames) > 1
+    selectors = []
+    for frame in frames:
+        _, _, _, params = EcoVentClient.parse_request(client.packet(frame))
+        # Every slot is answered with 6 bytes, after 0xfe, its size and 0x77
+        assert 1 + len(params) * 9 <= 100
+        selectors += [value for _, value in params]
+    assert len(selectors) == ALL_SLOTS == len(set(selectors))
+
+
+def test_read_schedule_fills_all_slots(client, unit):
+    unit.slots[b"\x01\x02"] = bytes([1, 2, 3, 0, 30, 7])
+    assert client.read_schedule()
+    assert len(client.schedule) == ALL_SLOTS
+    # speed, hours and minutes
+    assert client.schedule[(1, 2)] == (3, 7, 30)
+    assert client.schedule[(9, 4)] == (0, 0, 0)
+
+
+def test_write_schedule_only_writes_changed_slots(client, unit):
+    unit.slots[b"\x01\x01"] = bytes([1, 1, 1, 0, 0, 8])
+    slots = {(1, 1): (1, 8, 0), (1, 2): (2, 17, 30)}
+    # Unknown slots are read first
+    assert client.write_schedule(slots) == 1
+    assert unit.slots[b"\x01\x02"] == bytes([1, 2, 2, 0, 30, 17])
+    assert len(unit.frames) == 2
+    assert client.write_schedule(slots) == 0
+    assert len(unit.frames) == 2
+
+
+def test_write_schedule_without_answer(client, unit):
+    unit.answer = False
+    assert client.write_schedule({(1, 1): (1, 8, 0)}) is None
+    assert len(unit.frames) == 1
+
+
+def test_stale_slots_are_read_again_before_deciding(client, unit, clock):
+    client._cache = ParamCache(client.ttls, client.default_ttl, clock=clock)
+    unit.slots[b"\x01\x01"] = bytes([1, 1, 1, 0, 0, 8])
+    assert client.read_schedule([(1, 1), (1, 2)])
+    unit.frames.clear()
+    # Fresh slots are trusted
+    assert client.write_schedule({(1, 1): (1, 8, 0)}) == 0
+    assert unit.frames == []
+
+    # Changed at the unit itself since then
+    unit.slots[b"\x01\x01"] = bytes([1, 1, 2, 0, 0, 8])
+    clock.now += client.write_max_age
+    assert client.stale_schedule([(1, 1), (1, 2), (2, 1)]) == [(1, 1), (1, 2), (2, 1)]
+    assert client.write_schedule({(1, 1): (1, 8, 0), (1, 2): (0, 0, 0)}) == 1
+    # Both targeted slots in one read, then the one that differs
+    assert len(unit.frames) == 2
+    _, _, _, params = EcoVentClient.parse_request(client.packet(unit.frames[0]))
+    assert [value for _, value in params] == [b"\x01\x01", b"\x01\x02"]
+    assert unit.slots[b"\x01\x01"] == bytes([1, 1, 1, 0, 0, 8])
+
+    # Written slots are fresh again
+    assert client.stale_schedule([(1, 1), (1, 2)]) == []
@@ -0,0 +1,102 @@
+"""Recent values of the polls kept in memory and downsampled"""
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.ecovent.telemetry import MISSING, Ring, Telemetry  # noqa: E402
+
+# Start of an hour
+T = 1_700_000_000 // 3600 * 3600
+
+
+def poll(humidity, state=1, **values):
+    return {
+        "humidity": humidity,
+        "fan1_speed": 1200,
+        "fan2_speed": 1100,
+        "man_speed": 128,
+        "state": state,
+        **values,
+    }
+
+
+def test_ring_overwrites_the_oldest_rows():
+    ring = Ring(3, "H")
+    for n in range(5):
+        ring.append(T + n, [n] * 5)
+    assert ring.count == 3 and ring.oldest == T + 2
+    window = ring.window(T, T + 10)
+    assert window["time"] == [T + 2, T + 3, T + 4]
+    assert window["humidity"] == [2, 3, 4]
+    # Only the rows within the window, still oldest first
+    assert ring.window(T + 3, T + 3)["time"] == [T + 3]
+
+
+def test_empty_ring():
+    ring = Ring(3, "f")
+    assert ring.oldest is None
+    assert ring.window(T, T + 10)["humidity"] == []
+
+
+def test_missing_values():
+    telemetry = Telemetry()
+    values = poll(45)
+    del values["fan2_speed"]
+    telemetry.add(T, values)
+    # Larger values than the column holds are capped instead of marked missing
+    telemetry.add(T + 10, poll(45, fan1_speed=70000))
+    raw = telemetry.window(T, T + 10, "raw")
+    assert raw["fan2_speed"] == [None, 1100]
+    assert raw["fan1_speed"] == [1200, MISSING - 1]
+
+    # A minute without any value of a field has no mean
+    telemetry = Telemetry()
+    telemetry.add(T, values)
+    telemetry.add(T + 60, poll(45))
+    minute = telemetry.window(T, T + 60, "minute")
+    assert minute["fan2_speed"] == [None] and minute["humidity"] == [45]
+
+
+def test_minute_means():
+    telemetry = Telemetry()
+    telemetry.add(T, poll(40, state=1))
+    telemetry.add(T + 20, poll(50, state=0))
+    telemetry.add(T + 40, poll(51, state=0))
+    # Written when the minute has ended
+    assert telemetry.tiers["minute"].count == 0
+    telemetry.add(T + 60, poll(60))
+    minute = telemetry.window(T, T + 60, "minute")
+    assert minute["time"] == [T]
+    assert minute["humidity"] == [47]
+    # Share of the minute the fan was on
+    assert minute["state"] == [pytest.approx(0.33)]
+
+
+def test_hour_means_of_the_minutes():
+    telemetry = Telemetry()
+    for minute in range(61):
+        telemetry.add(T + minute * 60, poll(40 if minute < 30 else 50))
+    assert telemetry.tiers["hour"].count == 0
+    # Closing the first minute of the next hour closes the hour
+    telemetry.add(T + 3660, poll(50))
+    hour = telemetry.window(T, T, "hour")
+    assert hour["time"] == [T] and hour["humidity"] == [45]
+    assert telemetry.tiers["minute"].count == 61
+
+
+def test_resolution_of_the_window():
+    telemetry = Telemetry(raw_size=3, minute_size=2, hour_size=2)
+    # Rings that are not full hold everything since startup
+    telemetry.add(T, poll(40))
+    assert telemetry.resolution(T - 86400) == "raw"
+
+    for n in range(1, 4):
+        telemetry.add(T + n * 60, poll(40))
+    raw, minute = telemetry.tiers["raw"], telemetry.tiers["minute"]
+    assert raw.oldest == T + 60 and minute.count == 2 and minute.oldest == T + 60
+    assert telemetry.resolution(T + 60) == "raw"
+    assert telemetry.resolution(T + 59) == "hour"
+
+    window = telemetry.window(T + 120, T + 180)
+    assert window["resolution"] == "raw" and window["time"] == [T + 120, T + 180]
@@ -0,0 +1,76 @@
+"""Writes that are skipped when the unit already has the values"""
+
+from pyecovent import EcoVentClient
+
+READ = int(EcoVentClient.func["read"], 16)
+WRITE_RETURN = int(EcoVentClient.func["write_return"], 16)
+
+
+def sent(client, unit):
+    """Function and parameter numbers of every frame the unit got."""
+    result = []
+    for frame in unit.frames:
+        _, _, function, params = EcoVentClient.parse_request(client.packet(frame))
+        result.append((function, [number for number, _ in params]))
+    return result
+
+
+def test_unchanged_values_are_not_written(client, unit):
+    assert client.write_changes({"state": "01", "airflow": "01"})
+    # Read once, as nothing was known yet
+    assert sent(client, unit) == [(READ, [0x0001, 0x00B7])]
+    assert client.skipped_round_trips == 1
+
+    assert client.write_changes({"state": "01"})
+    assert len(unit.frames) == 1
+    assert client.skipped_round_trips == 2
+
+
+def test_only_changed_values_are_written(client, unit):
+    client.refresh(["state", "airflow", "boost_time"], max_age=0)
+    unit.frames.clear()
+    assert client.write_changes({"state": "01", "airflow": "00", "boost_time": "0f"})
+    assert sent(client, unit) == [(WRITE_RETURN, [0x00B7, 0x0066])]
+    assert unit.values[0x00B7] == b"\x00" and client.airflow == "ventilation"
+    assert client.skipped_round_trips == 0
+
+
+def test_stale_values_are_read_again_before_deciding(client, unit):
+    client.refresh(["state"], max_age=0)
+    # Turned off at the unit itself since then
+    unit.values[0x0001] = b"\x00"
+    unit.frames.clear()
+    assert client.write_changes({"state": "01"}, max_age=0)
+    assert sent(client, unit) == [(READ, [0x0001]), (WRITE_RETURN, [0x0001])]
+    assert unit.values[0x0001] == b"\x01"
+
+
+def test_no_write_when_the_read_is_not_answered(client, unit):
+    unit.answer = False
+    assert not client.write_changes({"state": "00"})
+    assert sent(client, unit) == [(READ, [0x0001])]
+    assert client.breaker.failures == 1
+
+
+def test_toggle_is_always_written(client, unit):
+    client.refresh(["state"], max_age=0)
+    unit.frames.clear()
+    assert client.write_changes({"state": "02"})
+    assert sent(client, unit) == [(WRITE_RETURN, [0x0001])]
+
+
+def test_changes_of_cached_values(client, unit):
+    client.refresh(["state", "man_speed"], max_age=0)
+    assert client.comparable({"state": "02", "man_speed": "80", "wifi_name": "41" * 32}) == [
+        "man_speed"
+    ]
+    assert client.changes({"state": "01", "man_speed": "80", "speed": "ff"}) == {
+        "speed": "ff"
+    }
+
+
+def test_percentage_turns_on_in_the_same_frame(client, unit):
+    unit.values[0x0001] = b"\x00"
+    client.set_man_speed_percent(60, turn_on=True)
+    assert sent(client, unit)[-1] == (WRITE_RETURN, [0x0044, 0x0001])
+    assert unit.values[0x0001] == b"\x01" and unit.values[0x0044] == bytes([153])
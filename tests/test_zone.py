@@ -0,0 +1,127 @@
+"""Zones of fans written to at the same time"""
+
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.ecovent import zone  # noqa: E402
+from custom_components.ecovent.zone import EcoVentZone, zone_values  # noqa: E402
+# The classes the integration itself uses, not those of the lib on sys.path
+from custom_components.ecovent.lib.pyecovent import (  # noqa: E402
+    DEFAULT_PROFILE,
+    EcoVentClient,
+    RateLimitExceeded,
+    UnitProfile,
+)
+
+from conftest import DEVICE_ID  # noqa: E402
+
+
+def test_zone_values():
+    assert zone_values() == {}
+    assert zone_values(airflow="heat_recovery") == {"airflow": "01"}
+    assert zone_values(60, "ventilation") == {
+        "airflow": "00",
+        "man_speed": "99",
+        "speed": "ff",
+        "state": "01",
+    }
+    # Below 2 % the fan is turned off instead
+    assert zone_values(1) == {"state": "00"}
+
+
+def test_zone_values_of_the_profile():
+    slow = UnitProfile("Slow", ranges={"man_speed": (50, 200)})
+    assert zone_values(10, profile=slow)["man_speed"] == f"{50:02x}"
+    assert zone_values(100, profile=slow)["man_speed"] == f"{200:02x}"
+    assert zone_values(100, profile=DEFAULT_PROFILE)["man_speed"] == "ff"
+
+
+class Hass:
+    async def async_add_executor_job(self, target, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, target, *args)
+
+
+class Member:
+    """Coordinator of a fan whose exchange waits at the barrier like the client."""
+
+    def __init__(self, error=None, answer=True):
+        self.client = EcoVentClient("127.0.0.1", fan_id=DEVICE_ID)
+        self.available = True
+        self.error = error
+        self.answer = answer
+        self.barriers = []
+        self.frames = None
+
+    async def async_write(self, frames, barrier=None):
+        return await Hass().async_add_executor_job(self.exchange, frames, barrier)
+
+    def exchange(self, frames, barrier):
+        self.barriers.append(barrier.barrier)
+        if self.error is not None:
+            raise self.error
+        barrier.wait(EcoVentClient.SYNC_TIMEOUT)
+        self.frames = frames
+        return self.answer
+
+
+def write(monkeypatch, members, **kwargs):
+    monkeypatch.setattr(zone, "async_get_coordinators", lambda hass, entity_ids: members)
+    return asyncio.run(EcoVentZone(Hass(), "Upstairs", list(members)).async_write(**kwargs))
+
+
+def test_members_are_written_together(monkeypatch):
+    members = {"fan.a": Member(), "fan.b": Member(answer=False), "fan.c": None}
+    results = write(monkeypatch, members, percentage=60)
+    assert results["fan.a"]["ok"] and results["fan.b"] == {
+        "ok": False,
+        "error": "no answer",
+        "latency": results["fan.b"]["latency"],
+        "skew": results["fan.b"]["skew"],
+    }
+    assert results["fan.c"] == {"ok": False, "error": "not an ecovent fan"}
+    # Both passed the same barrier, the first one to send has no skew
+    assert members["fan.a"].barriers == members["fan.b"].barriers
+    assert min(results[entity_id]["skew"] for entity_id in ("fan.a", "fan.b")) == 0
+    assert all(results[entity_id]["latency"] >= 0 for entity_id in ("fan.a", "fan.b"))
+    assert members["fan.a"].frames == members["fan.a"].client.write_frames(zone_values(60))
+
+
+def test_members_without_frames_do_not_take_part(monkeypatch):
+    members = {"fan.a": Member(), "fan.b": Member()}
+    # Airflow is not supported by the second fan
+    members["fan.b"].client.unsupported = {0x00B7}
+    started = time.monotonic()
+    results = write(monkeypatch, members, airflow="ventilation")
+    assert time.monotonic() - started < EcoVentClient.SYNC_TIMEOUT
+    assert results["fan.b"] == {"ok": False, "error": "nothing to write"}
+    assert results["fan.a"]["ok"] and results["fan.a"]["skew"] == 0
+    assert members["fan.a"].barriers[0].parties == 1
+
+
+def test_failing_member_does_not_break_the_barrier(monkeypatch):
+    members = {
+        "fan.a": Member(),
+        "fan.b": Member(error=RateLimitExceeded("No send slot")),
+        "fan.c": Member(),
+    }
+    started = time.monotonic()
+    results = write(monkeypatch, members, percentage=40)
+    assert time.monotonic() - started < EcoVentClient.SYNC_TIMEOUT
+    assert results["fan.b"] == {"ok": False, "error": "No send slot"}
+    barrier = members["fan.a"].barriers[0]
+    assert barrier.parties == 3 and not barrier.broken
+    assert results["fan.a"]["ok"] and results["fan.c"]["ok"]
+    assert "skew" in results["fan.a"] and "skew" in results["fan.c"]
+
+
+def test_unavailable_members_are_left_out(monkeypatch):
+    members = {"fan.a": Member()}
+    members["fan.a"].available = False
+    assert write(monkeypatch, members, percentage=40) == {
+        "fan.a": {"ok": False, "error": "unavailable"}
+    }
+